@@ -5,29 +5,11 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import config
-import json
 from points_logger import log_points_added, log_points_removed, log_points_set, log_points_reset, log_user_deleted
 from tickets import join_cooldowns, leave_cooldowns
-
-
-def is_admin_or_staff(interaction: discord.Interaction) -> bool:
-    """Check if user has admin or staff role"""
-    member = interaction.user
-    return any(
-        member.get_role(rid) 
-        for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF")] 
-        if rid
-    )
-
-
-def is_admin_staff_or_officer(interaction: discord.Interaction) -> bool:
-    """Check if user has admin, staff, or officer role"""
-    member = interaction.user
-    return any(
-        member.get_role(rid) 
-        for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF"), config.ROLE_IDS.get("OFFICER")] 
-        if rid
-    )
+from ticket_threads import revoke_ticket_access
+import ticket_events
+from capabilities import can
 
 
 class ConfirmResetView(discord.ui.View):
@@ -98,7 +80,7 @@ async def setup_admin(bot):
         amount: app_commands.Range[int, 1, 100000]
     ):
         """Add points to a user"""
-        if not is_admin_or_staff(interaction):
+        if not can(interaction.user, "manage_points"):
             await interaction.response.send_message(
                 "❌ You don't have permission to use this command.",
                 ephemeral=True
@@ -131,7 +113,7 @@ async def setup_admin(bot):
         amount: app_commands.Range[int, 1, 100000]
     ):
         """Remove points from a user"""
-        if not is_admin_or_staff(interaction):
+        if not can(interaction.user, "manage_points"):
             await interaction.response.send_message(
                 "❌ You don't have permission to use this command.",
                 ephemeral=True
@@ -166,7 +148,7 @@ async def setup_admin(bot):
         amount: app_commands.Range[int, 0, 100000]
     ):
         """Set exact points for a user"""
-        if not is_admin_or_staff(interaction):
+        if not can(interaction.user, "manage_points"):
             await interaction.response.send_message(
                 "❌ You don't have permission to use this command.",
                 ephemeral=True
@@ -190,7 +172,7 @@ async def setup_admin(bot):
     @bot.tree.command(name="points_reset", description="Reset all points (Admin only)")
     async def points_reset(interaction: discord.Interaction):
         """Reset all points - requires confirmation"""
-        if interaction.user.get_role(config.ROLE_IDS.get("ADMIN")) is None:
+        if not can(interaction.user, "admin_commands"):
             await interaction.response.send_message(
                 "❌ You don't have permission to use this command.",
                 ephemeral=True
@@ -216,7 +198,7 @@ async def setup_admin(bot):
     @app_commands.describe(user_id="User ID or mention to remove from leaderboard")
     async def points_remove_user(interaction: discord.Interaction, user_id: str):
         """Remove user from leaderboard entirely - supports ID or mention"""
-        if interaction.user.get_role(config.ROLE_IDS.get("ADMIN")) is None:
+        if not can(interaction.user, "admin_commands"):
             await interaction.response.send_message(
                 "❌ You don't have permission to use this command.",
                 ephemeral=True
@@ -272,7 +254,7 @@ async def setup_admin(bot):
             return
         
         # Check permissions - OFFICER/STAFF/ADMIN ONLY (requestor CANNOT kick)
-        if not is_admin_staff_or_officer(interaction):
+        if not can(interaction.user, "kick_helper"):
             await interaction.response.send_message(
                 "❌ Only officers, staff, or admins can remove helpers.",
                 ephemeral=True
@@ -290,71 +272,32 @@ async def setup_admin(bot):
         # Remove helper
         ticket["helpers"].remove(user.id)
         await bot.db.save_ticket(ticket)
+        bot.ticket_events.record(ticket, ticket_events.KICKED, user_id=user.id, actor_id=interaction.user.id)
+        bot.matchmaker.ticket_changed(ticket)
         
         # Remove channel permissions (unless staff/admin/officer)
-        guild = interaction.guild
-        admin_role = guild.get_role(config.ROLE_IDS.get("ADMIN"))
-        staff_role = guild.get_role(config.ROLE_IDS.get("STAFF"))
-        officer_role = guild.get_role(config.ROLE_IDS.get("OFFICER"))
-        
-        is_user_staff = False
-        if admin_role and admin_role in user.roles:
-            is_user_staff = True
-        if staff_role and staff_role in user.roles:
-            is_user_staff = True
-        if officer_role and officer_role in user.roles:
-            is_user_staff = True
-        
-        if not is_user_staff:
+        if not can(user, "keep_ticket_access"):
             try:
-                await interaction.channel.set_permissions(user, overwrite=None)
+                await revoke_ticket_access(interaction.channel, user)
             except:
                 pass
         
-        # Update ticket embed
-        from tickets import create_ticket_embed
-        
-        try:
-            selected_bosses_raw = ticket.get("selected_bosses", "[]")
-            if isinstance(selected_bosses_raw, str):
-                selected_bosses = json.loads(selected_bosses_raw)
-            else:
-                selected_bosses = selected_bosses_raw or []
-        except:
-            selected_bosses = []
-        
-        selected_server = ticket.get("selected_server", "Unknown")
-        
-        embed = create_ticket_embed(
-            category=ticket["category"],
-            requestor_id=ticket["requestor_id"],
-            in_game_name=ticket.get("in_game_name", "N/A"),
-            concerns=ticket.get("concerns", "None"),
-            helpers=ticket["helpers"],
-            random_number=ticket["random_number"],
-            selected_bosses=selected_bosses,
-            selected_server=selected_server
-        )
-        
-        # Find and update the ticket message
-        try:
-            msg = await interaction.channel.fetch_message(ticket["embed_message_id"])
-            await msg.edit(embed=embed)
-        except:
-            pass
+        # Update ticket embed (edits in place, no fetch)
+        from tickets import update_ticket_embed
+        await update_ticket_embed(bot, ticket, interaction.channel)
         
         await interaction.response.send_message(
             f"✅ Removed {user.mention} from this ticket.",
             ephemeral=False
         )
         
-        await interaction.channel.send(f"👢 {user.mention} was kicked from the ticket by {interaction.user.mention}.")
+        bot.rest.send(interaction.channel, f"👢 {user.mention} was kicked from the ticket by {interaction.user.mention}.")
 
     @bot.tree.command(name="remove_cooldown", description="Remove cooldown from a user (Admin/Staff/Officer only)")
     @app_commands.describe(user="User to remove cooldown from")
     async def remove_cooldown(interaction: discord.Interaction, user: discord.Member):
         """Remove join/leave cooldown from a user"""
-        if not is_admin_staff_or_officer(interaction):
+        if not can(interaction.user, "remove_cooldown"):
             await interaction.response.send_message(
                 "❌ You don't have permission to use this command.",
                 ephemeral=True
@@ -4,7 +4,9 @@
 import discord
 from discord.ext import commands
 import config
-import asyncio
+from perf import timed
+from capabilities import can
+from ticket_threads import thread_mode_enabled, create_ticket_thread
 
 # ------------------------------
 # Persistent Panel + Button
@@ -69,45 +71,43 @@ class ApprenticeTicketModal(discord.ui.Modal):
         )
         self.add_item(self.extra)
 
+    @timed("class.submit")
     async def on_submit(self, interaction: discord.Interaction):
         """Create the private class ticket channel"""
         await interaction.response.defer(ephemeral=True)
 
         guild = interaction.guild
         category_id = config.CHANNEL_IDS.get("APPRENTICE_TICKET_CATEGORY")
-        if not category_id:
+        if not category_id and not thread_mode_enabled("APPRENTICE"):
             await interaction.followup.send("❌ Class ticket category not configured!", ephemeral=True)
             return
 
-        category = guild.get_channel(category_id)
-        if not category:
-            await interaction.followup.send("❌ Class ticket category not found!", ephemeral=True)
-            return
-
         # Create channel name
         channel_name = f"class-{interaction.user.name}".lower().replace(" ", "-")[:50]
 
         # Permissions: only teacher + apprentice + bot
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-        }
-
-        apprentice_role = guild.get_role(config.ROLE_IDS.get("APPRENTICE"))
-        if apprentice_role:
-            overwrites[apprentice_role] = discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=True
-            )
+        overwrites = interaction.client.overwrite_templates.with_opener(guild, "class", interaction.user)
 
         # Create channel and store ticket opener ID in topic
         try:
-            channel = await category.create_text_channel(
-                name=channel_name,
-                overwrites=overwrites,
-                topic=str(interaction.user.id)  # store opener ID
-            )
+            if thread_mode_enabled("APPRENTICE"):
+                # Private thread - the apprentice role ping below adds the students.
+                # Threads have no topic; the opener ID is read from the embed footer instead.
+                channel = await create_ticket_thread(guild, "APPRENTICE", channel_name, interaction.user)
+                if channel is None:
+                    await interaction.followup.send("❌ Class ticket thread parent channel not found!", ephemeral=True)
+                    return
+            else:
+                # Least-loaded class category (overflow past the 50-channel cap)
+                async with interaction.client.category_allocator.place("APPRENTICE_TICKET_CATEGORY", guild) as category:
+                    if not category:
+                        await interaction.followup.send("❌ Class ticket category not found or full!", ephemeral=True)
+                        return
+                    channel = await category.create_text_channel(
+                        name=channel_name,
+                        overwrites=overwrites,
+                        topic=str(interaction.user.id)  # store opener ID
+                    )
         except Exception as e:
             await interaction.followup.send(f"❌ Failed to create class ticket: {e}", ephemeral=True)
             return
@@ -132,6 +132,7 @@ class ApprenticeTicketModal(discord.ui.Modal):
 
         view = ApprenticeTicketActionView()
 
+        apprentice_role = guild.get_role(config.ROLE_IDS.get("APPRENTICE"))
         ping = apprentice_role.mention if apprentice_role else ""
         await channel.send(
             content=f"{ping}\n{interaction.user.mention} started a class ticket!",
@@ -160,17 +161,10 @@ class ApprenticeTicketActionView(discord.ui.View):
         custom_id="apprentice_class_close"
     )
     async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Allowed roles: ADMIN, STAFF, OFFICER
-        allowed_roles = [
-            config.ROLE_IDS.get("ADMIN"),
-            config.ROLE_IDS.get("STAFF"),
-            config.ROLE_IDS.get("OFFICER")
-        ]
-        member_roles = [role.id for role in interaction.user.roles]
-        is_staff = any(role_id in member_roles for role_id in allowed_roles)
-
-        # Ticket opener ID from channel topic
-        opener_id = int(interaction.channel.topic) if interaction.channel.topic else None
+        is_staff = can(interaction.user, "close_class")
+
+        # Ticket opener ID from channel topic (threads: from the embed footer)
+        opener_id = get_opener_id(interaction)
         is_opener = opener_id == interaction.user.id
 
         # Only teacher (opener) or allowed staff/admin/officer can close
@@ -182,13 +176,31 @@ class ApprenticeTicketActionView(discord.ui.View):
             return
 
         await interaction.response.send_message(
-            f"✅ Class ticket closed by {interaction.user.mention}. Deleting channel in 5 seconds..."
+            f"✅ Class ticket closed by {interaction.user.mention}. Deleting channel in {config.CHANNEL_DELETE_DELAY} seconds..."
         )
-        await asyncio.sleep(5)
-        try:
-            await interaction.channel.delete(reason=f"Class ticket closed by {interaction.user}")
-        except:
-            pass
+        await interaction.client.jobs.delete_channel_later(
+            interaction.channel,
+            delay=config.CHANNEL_DELETE_DELAY,
+            reason=f"Class ticket closed by {interaction.user}"
+        )
+
+
+def get_opener_id(interaction: discord.Interaction):
+    """Teacher's user ID - channel topic in channel mode, "User ID: X" footer in thread mode"""
+    topic = getattr(interaction.channel, "topic", None)
+    if topic:
+        return int(topic)
+
+    # The close button lives on the class embed, so no fetch is needed
+    message = interaction.message
+    if message and message.embeds and message.embeds[0].footer.text:
+        footer = message.embeds[0].footer.text
+        if footer.startswith("User ID: "):
+            try:
+                return int(footer[len("User ID: "):])
+            except ValueError:
+                pass
+    return None
 
 
 # ------------------------------
@@ -200,13 +212,7 @@ async def setup_apprentice_tickets(bot):
         description="Post the eternal apprentice class ticket panel"
     )
     async def apprentice_ticket_panel(interaction: discord.Interaction):
-        member = interaction.user
-        is_staff = any(
-            member.get_role(rid)
-            for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF")]
-            if rid
-        )
-        if not is_staff:
+        if not can(interaction.user, "post_panel"):
             await interaction.response.send_message(
                 "❌ You don't have permission to post the apprentice ticket panel.",
                 ephemeral=True
@@ -0,0 +1,34 @@
+# background.py
+# Fire-and-forget task helper - keeps task references alive and logs failures
+
+import asyncio
+import contextvars
+import traceback
+
+# Strong references - asyncio only keeps weak references to running tasks
+_tasks = set()
+
+
+def spawn(coro, name: str = None, detached: bool = False) -> asyncio.Task:
+    """Run a coroutine in the background without awaiting it.
+    `detached` starts it with empty context variables instead of the caller's."""
+    context = contextvars.Context() if detached else None
+    task = asyncio.create_task(coro, name=name, context=context)
+    _tasks.add(task)
+    task.add_done_callback(_on_done)
+    return task
+
+
+def pending_count() -> int:
+    """Number of background tasks still running"""
+    return len(_tasks)
+
+
+def _on_done(task: asyncio.Task):
+    _tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc:
+        print(f"❌ Background task {task.get_name()} failed: {exc}")
+        traceback.print_exception(exc)
@@ -0,0 +1,87 @@
+# capabilities.py
+# Named permissions granted by roles (config.CAPABILITY_ROLES), memoized per member
+
+import discord
+from typing import Dict, Tuple
+import config
+
+# Capability name -> bit, in policy order
+BITS = {name: 1 << i for i, name in enumerate(config.CAPABILITY_ROLES)}
+
+
+def _compile_grants() -> Dict[int, int]:
+    """role id -> OR of the capability bits the role grants"""
+    grants = {}
+    for name, role_keys in config.CAPABILITY_ROLES.items():
+        for key in role_keys:
+            rid = config.ROLE_IDS.get(key)
+            if rid:
+                grants[rid] = grants.get(rid, 0) | BITS[name]
+    return grants
+
+
+class Capabilities:
+    """Member -> capability bitset cache.
+
+    A member's bitset is the OR of the grants of each of their roles,
+    computed on the first check and cached per (guild, member), so every
+    later check is a dict hit plus one bit test. Role changes arrive as
+    `on_member_update` (the members intent is enabled in main.py), which
+    drops the entry; deleting a role clears the whole cache."""
+    def __init__(self):
+        self.grants = _compile_grants()
+        self.cache: Dict[Tuple[int, int], int] = {}  # (guild, member) -> bits
+        self.hits = 0
+        self.misses = 0
+
+    def bits(self, member) -> int:
+        if not isinstance(member, discord.Member):
+            return 0  # a plain User (DMs) holds no roles
+        key = (member.guild.id, member.id)
+        bits = self.cache.get(key)
+        if bits is not None:
+            self.hits += 1
+            return bits
+
+        self.misses += 1
+        bits = 0
+        for role in member.roles:
+            bits |= self.grants.get(role.id, 0)
+        if len(self.cache) >= config.CAPABILITY_CACHE_MAX:
+            self.cache.clear()
+        self.cache[key] = bits
+        return bits
+
+    def can(self, member, capability: str) -> bool:
+        return bool(self.bits(member) & BITS[capability])
+
+    def invalidate(self, member):
+        self.cache.pop((member.guild.id, member.id), None)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.invalidate(after)
+
+    async def on_member_remove(self, member: discord.Member):
+        self.invalidate(member)
+
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.cache.clear()
+
+
+capabilities = Capabilities()
+
+
+def can(member, capability: str) -> bool:
+    """Does `member` hold the named capability (see config.CAPABILITY_ROLES)"""
+    return capabilities.can(member, capability)
+
+
+async def setup_capabilities(bot):
+    """Drop cached capabilities when roles change (guarded - on_ready can run more than once)"""
+    for event, listener in (
+        ("on_member_update", capabilities.on_member_update),
+        ("on_member_remove", capabilities.on_member_remove),
+        ("on_guild_role_delete", capabilities.on_guild_role_delete),
+    ):
+        if listener not in bot.extra_events.get(event, []):
+            bot.add_listener(listener, event)
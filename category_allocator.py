@@ -0,0 +1,88 @@
+# category_allocator.py
+# Spreads ticket channels over overflow categories (Discord caps a category at 50 channels)
+
+import discord
+import asyncio
+import contextlib
+from typing import List, Optional
+import config
+
+
+class CategoryAllocator:
+    """Places new channels in the least-loaded category of a group.
+
+    A group is a CHANNEL_IDS key (e.g. "TICKETS_CATEGORY") plus the overflow
+    categories listed for it in config.CATEGORY_OVERFLOW. When every category
+    is full and CATEGORY_AUTO_CREATE is on, a copy of the primary category is
+    created and remembered in the "overflow_categories" config entry."""
+    def __init__(self, bot):
+        self.bot = bot
+        self.auto_created = None  # {group: [category_id, ...]}, loaded lazily
+        self.reserved = {}  # {category_id: channels being created right now}
+        self._lock = asyncio.Lock()
+
+    async def _load(self):
+        if self.auto_created is None:
+            data = await self.bot.db.load_config("overflow_categories") or {}
+            self.auto_created = {key: [int(cid) for cid in ids] for key, ids in data.items()}
+
+    def categories(self, group: str, guild: discord.Guild) -> List[discord.CategoryChannel]:
+        """All existing categories in a group, primary first"""
+        ids = [config.CHANNEL_IDS.get(group)]
+        ids += config.CATEGORY_OVERFLOW.get(group, [])
+        ids += (self.auto_created or {}).get(group, [])
+
+        categories = []
+        for category_id in ids:
+            category = guild.get_channel(category_id) if category_id else None
+            if isinstance(category, discord.CategoryChannel) and category not in categories:
+                categories.append(category)
+        return categories
+
+    def load_of(self, category: discord.CategoryChannel) -> int:
+        """Live channel count, including channels currently being created"""
+        return len(category.channels) + self.reserved.get(category.id, 0)
+
+    async def allocate(self, group: str, guild: discord.Guild) -> Optional[discord.CategoryChannel]:
+        """Least-loaded category with room left, creating a new one if allowed"""
+        await self._load()
+
+        async with self._lock:
+            categories = self.categories(group, guild)
+            open_categories = [c for c in categories if self.load_of(c) < config.CATEGORY_CHANNEL_LIMIT]
+            if open_categories:
+                return min(open_categories, key=self.load_of)
+
+            if not categories or not config.CATEGORY_AUTO_CREATE:
+                return None
+
+            return await self._create_overflow(group, categories[0], len(categories) + 1)
+
+    @contextlib.asynccontextmanager
+    async def place(self, group: str, guild: discord.Guild):
+        """Allocate a category and hold a slot in it while the channel is created"""
+        category = await self.allocate(group, guild)
+        if category:
+            self.reserved[category.id] = self.reserved.get(category.id, 0) + 1
+        try:
+            yield category
+        finally:
+            if category:
+                self.reserved[category.id] -= 1
+
+    async def _create_overflow(self, group: str, primary: discord.CategoryChannel, number: int):
+        try:
+            category = await primary.guild.create_category(
+                name=f"{primary.name} {number}",
+                overwrites=primary.overwrites,
+                position=primary.position + number - 1,
+                reason=f"{group} is full - adding overflow category"
+            )
+        except discord.HTTPException as e:
+            print(f"❌ Failed to create overflow category for {group}: {e}")
+            return None
+
+        self.auto_created.setdefault(group, []).append(category.id)
+        await self.bot.db.save_config("overflow_categories", self.auto_created)
+        print(f"✅ Created overflow category {category.name} for {group}")
+        return category
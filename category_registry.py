@@ -0,0 +1,286 @@
+# category_registry.py
+# Ticket categories loaded from the `categories` table and compiled into lookup tables
+
+import discord
+from discord import app_commands
+from types import MappingProxyType
+from typing import List, Mapping, NamedTuple, Optional, Tuple
+import config
+from capabilities import can
+
+DEFAULT_SLOTS = 3
+DEFAULT_POINTS = 0
+
+
+class CategorySpec(NamedTuple):
+    """One compiled, read-only ticket category"""
+    name: str
+    label: str                          # panel button label
+    description: str
+    prefix: str                         # channel name prefix
+    slots: int
+    points: int
+    bosses: Tuple[str, ...]             # selectable bosses, in /join order
+    select_options: Tuple[Tuple[str, str], ...]  # (label, value) for the boss dropdown
+    embed_names: Mapping[str, str]      # boss -> merged name shown in the ticket embed
+    join_templates: Tuple[Tuple[Optional[str], str], ...]  # (boss or None, "/join map-{room}")
+
+
+def spec_from_config(name: str, order: int) -> dict:
+    """Build a stored category spec from the config lists (used to seed the table)"""
+    metadata = config.CATEGORY_METADATA.get(name, {})
+    return {
+        "order": order,
+        "description": metadata.get("description", "Ticket"),
+        "prefix": metadata.get("prefix", "ticket"),
+        "bosses": [
+            {"name": boss, **config.BOSS_NAMES.get(boss, {})}
+            for boss in config.CATEGORY_BOSSES.get(name, [])
+        ],
+        "join": list(config.CATEGORY_JOIN_COMMANDS.get(name, [])),
+    }
+
+
+def compile_category(name: str, spec: dict, points: int, slots: int) -> CategorySpec:
+    bosses = spec.get("bosses") or []
+    boss_names = tuple(boss["name"] for boss in bosses)
+
+    # Per-boss maps (only for the selected bosses), then the plain maps every ticket gets -
+    # a category keeps its plain maps when its first boss is added
+    join_templates = tuple(
+        (boss["name"], f"```/join {boss.get('join') or boss['name'].lower().replace(' ', '')}-{{room}}```")
+        for boss in bosses
+    ) + tuple((None, f"```/join {join}-{{room}}```") for join in spec.get("join") or [])
+
+    return CategorySpec(
+        name=name,
+        label=name.replace(" Express", ""),
+        description=spec.get("description") or "Ticket",
+        prefix=spec.get("prefix") or "ticket",
+        slots=slots if slots is not None else DEFAULT_SLOTS,
+        points=points if points is not None else DEFAULT_POINTS,
+        bosses=boss_names,
+        select_options=tuple((boss.get("select") or boss["name"], boss["name"]) for boss in bosses),
+        embed_names=MappingProxyType({
+            boss["name"]: boss.get("embed") or boss["name"].lower().replace(" ", "")
+            for boss in bosses
+        }),
+        join_templates=join_templates,
+    )
+
+
+class CategoryRegistry:
+    """Read-only view of the ticket categories.
+
+    Rows of the `categories` table hold points and slots in their own columns
+    and the rest of the category (description, prefix, bosses with their
+    select/embed/join names, plain join maps) as a JSON spec in `questions`.
+    `load` compiles everything into immutable tables and swaps them in at
+    once, so a reload never exposes a half-built registry. Until the first
+    load the registry is compiled straight from config."""
+    def __init__(self):
+        self._categories: Mapping[str, CategorySpec] = MappingProxyType({})
+        self._embed_names: Mapping[str, str] = MappingProxyType({})
+        self._compile([
+            (name, spec_from_config(name, i), config.POINT_VALUES.get(name), config.HELPER_SLOTS.get(name))
+            for i, name in enumerate(config.CATEGORIES)
+        ])
+
+    def _compile(self, rows: List[tuple]):
+        rows = sorted(rows, key=lambda row: row[1].get("order", 0))
+        categories = {name: compile_category(name, spec, points, slots) for name, spec, points, slots in rows}
+
+        embed_names = {}
+        for category in categories.values():
+            embed_names.update(category.embed_names)
+
+        self._categories = MappingProxyType(categories)
+        self._embed_names = MappingProxyType(embed_names)
+
+    async def seed(self, db):
+        """Write the config categories into the database (overwrites same-named rows)"""
+        for i, name in enumerate(config.CATEGORIES):
+            await db.add_category(
+                name,
+                spec_from_config(name, i),
+                config.POINT_VALUES.get(name, DEFAULT_POINTS),
+                config.HELPER_SLOTS.get(name, DEFAULT_SLOTS)
+            )
+
+    async def load(self, db):
+        """(Re)compile from the database, seeding it from config on first run"""
+        rows = await db.get_categories()
+        if not rows:
+            await self.seed(db)
+            rows = await db.get_categories()
+
+        self._compile([
+            (row["name"], row.get("questions") or {}, row.get("points"), row.get("slots"))
+            for row in rows
+        ])
+        return len(self._categories)
+
+    def names(self) -> List[str]:
+        return list(self._categories)
+
+    def get(self, name: str) -> Optional[CategorySpec]:
+        return self._categories.get(name)
+
+    def description(self, name: str) -> str:
+        category = self._categories.get(name)
+        return category.description if category else "Ticket"
+
+    def prefix(self, name: str) -> str:
+        category = self._categories.get(name)
+        return category.prefix if category else "ticket"
+
+    def slots(self, name: str) -> int:
+        category = self._categories.get(name)
+        return category.slots if category else DEFAULT_SLOTS
+
+    def points(self, name: str) -> int:
+        category = self._categories.get(name)
+        return category.points if category else DEFAULT_POINTS
+
+    def embed_name(self, boss: str) -> str:
+        """Merged boss name for the ticket embed (voidflibbi, ultradage)"""
+        return self._embed_names.get(boss, boss.lower().replace(" ", ""))
+
+    def join_commands(self, name: str, selected_bosses: List[str], room_number: int) -> str:
+        """/join commands for a ticket, in the category's boss order"""
+        category = self._categories.get(name)
+        if not category:
+            return ""
+        return "\n".join(
+            template.format(room=room_number)
+            for boss, template in category.join_templates
+            if boss is None or boss in selected_bosses
+        )
+
+
+registry = CategoryRegistry()
+
+
+async def setup_category_registry(bot):
+    """Register the category admin commands (the registry itself is loaded in on_ready)"""
+
+    def is_admin(interaction: discord.Interaction) -> bool:
+        return can(interaction.user, "admin_commands")
+
+    async def reload_and_refresh():
+        count = await registry.load(bot.db)
+        # Re-register the panel so buttons for new categories are handled
+        from tickets import TicketView
+        bot.add_view(TicketView())
+        return count
+
+    async def category_autocomplete(interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in registry.names()
+            if current.lower() in name.lower()
+        ][:25]
+
+    @bot.tree.command(name="category_reload", description="Reload ticket categories from the database (Admin only)")
+    @app_commands.describe(from_config="Overwrite the stored categories with the ones in config.py first")
+    async def category_reload(interaction: discord.Interaction, from_config: bool = False):
+        """Recompile the category registry"""
+        if not is_admin(interaction):
+            await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        if from_config:
+            await registry.seed(bot.db)
+        count = await reload_and_refresh()
+
+        await interaction.followup.send(
+            f"✅ Reloaded {count} ticket categories. Repost the panel with `/panel` to show new categories.",
+            ephemeral=True
+        )
+
+    @bot.tree.command(name="category_boss_add", description="Add or update a boss in a ticket category (Admin only)")
+    @app_commands.describe(
+        category="Ticket category",
+        boss="Boss name (e.g. Ultra Dage)",
+        select_name="Name shown in the boss dropdown",
+        embed_name="Merged name shown in the ticket embed",
+        join_map="Map used in the /join command"
+    )
+    @app_commands.autocomplete(category=category_autocomplete)
+    async def category_boss_add(
+        interaction: discord.Interaction,
+        category: str,
+        boss: str,
+        select_name: Optional[str] = None,
+        embed_name: Optional[str] = None,
+        join_map: Optional[str] = None
+    ):
+        """Add a boss to a category without a deploy"""
+        if not is_admin(interaction):
+            await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        row = await bot.db.get_category(category)
+        if not row:
+            await interaction.followup.send(f"❌ Unknown category: {category}", ephemeral=True)
+            return
+
+        merged = boss.lower().replace(" ", "")
+        entry = {
+            "name": boss,
+            "select": select_name or boss,
+            "embed": embed_name or merged,
+            "join": join_map or merged,
+        }
+
+        spec = dict(row.get("questions") or {})
+        bosses = [b for b in spec.get("bosses") or [] if b["name"] != boss]
+        if len(bosses) >= 25:
+            await interaction.followup.send("❌ A category can have at most 25 bosses (dropdown limit).", ephemeral=True)
+            return
+        existing = [b["name"] for b in spec.get("bosses") or []]
+        if boss in existing:
+            bosses.insert(existing.index(boss), entry)  # keep its /join position
+        else:
+            bosses.append(entry)
+        spec["bosses"] = bosses
+
+        await bot.db.add_category(category, spec, row.get("points"), row.get("slots"))
+        await reload_and_refresh()
+
+        await interaction.followup.send(
+            f"✅ {boss} saved in **{category}** (`/join {entry['join']}-<room>`)",
+            ephemeral=True
+        )
+
+    @bot.tree.command(name="category_boss_remove", description="Remove a boss from a ticket category (Admin only)")
+    @app_commands.describe(category="Ticket category", boss="Boss name")
+    @app_commands.autocomplete(category=category_autocomplete)
+    async def category_boss_remove(interaction: discord.Interaction, category: str, boss: str):
+        """Remove a boss from a category without a deploy"""
+        if not is_admin(interaction):
+            await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        row = await bot.db.get_category(category)
+        if not row:
+            await interaction.followup.send(f"❌ Unknown category: {category}", ephemeral=True)
+            return
+
+        spec = dict(row.get("questions") or {})
+        bosses = [b for b in spec.get("bosses") or [] if b["name"] != boss]
+        if len(bosses) == len(spec.get("bosses") or []):
+            await interaction.followup.send(f"❌ {boss} is not in **{category}**.", ephemeral=True)
+            return
+        if not bosses:
+            await interaction.followup.send("❌ A boss category needs at least one boss.", ephemeral=True)
+            return
+        spec["bosses"] = bosses
+
+        await bot.db.add_category(category, spec, row.get("points"), row.get("slots"))
+        await reload_and_refresh()
+
+        await interaction.followup.send(f"✅ Removed {boss} from **{category}**.", ephemeral=True)
@@ -0,0 +1,130 @@
+# channel_pool.py
+# Warm pool of pre-created, hidden ticket channels
+
+import discord
+import asyncio
+import math
+import secrets
+from collections import deque
+from typing import Optional
+import config
+from background import spawn
+from ticket_threads import thread_mode_enabled
+
+POOL_CHANNEL_PREFIX = "ticket-pool"
+
+
+class ChannelPool:
+    """Keeps a few hidden channels ready in the ticket categories.
+
+    Opening a ticket then costs one channel edit (rename + overwrites) instead
+    of a full create_text_channel. The pool is refilled in the background and
+    its target size follows recent ticket demand from the database."""
+    def __init__(self, bot):
+        self.bot = bot
+        self.ready = deque()  # channel IDs waiting to be claimed
+        self.target_size = config.CHANNEL_POOL_MIN
+        self.task = None
+        self._wake = None
+
+    def start(self):
+        """Adopt leftover pool channels and start the refill loop (safe to call again)"""
+        if not config.CHANNEL_POOL_ENABLED or thread_mode_enabled("TICKETS") or (self.task and not self.task.done()):
+            return
+
+        primary = self.bot.get_channel(config.CHANNEL_IDS.get("TICKETS_CATEGORY"))
+        if primary:
+            for category in self.bot.category_allocator.categories("TICKETS_CATEGORY", primary.guild):
+                for channel in category.text_channels:
+                    if channel.name.startswith(POOL_CHANNEL_PREFIX) and channel.id not in self.ready:
+                        self.ready.append(channel.id)
+
+        self._wake = asyncio.Event()
+        self.task = spawn(self._run(), name="channel-pool")
+        print(f"✅ Channel pool started ({len(self.ready)} channel(s) adopted)")
+
+    def __len__(self):
+        return len(self.ready)
+
+    async def claim(self, name: str, overwrites: dict, reason: str = None) -> Optional[discord.TextChannel]:
+        """Turn a pooled channel into a ticket channel. Returns None when the pool is empty."""
+        while self.ready:
+            channel = self.bot.get_channel(self.ready.popleft())
+            if not channel:
+                continue  # deleted by hand - try the next one
+
+            try:
+                await channel.edit(name=name, overwrites=overwrites, reason=reason)
+            except discord.NotFound:
+                continue
+            except discord.HTTPException as e:
+                print(f"⚠️ Failed to claim pooled channel {channel.id}: {e}")
+                continue
+            finally:
+                if self._wake:
+                    self._wake.set()
+
+            return channel
+
+        if self._wake:
+            self._wake.set()
+        return None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=config.CHANNEL_POOL_REFILL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                await self._update_target()
+                await self._rebalance()
+            except Exception as e:
+                print(f"⚠️ Channel pool refill failed: {e}")
+
+    async def _update_target(self):
+        """Size the pool for the tickets expected over the next horizon"""
+        window = config.CHANNEL_POOL_DEMAND_WINDOW_MINUTES
+        demand = await self.bot.db.get_recent_ticket_demand(window)
+        expected = demand * config.CHANNEL_POOL_HORIZON_MINUTES / window
+        self.target_size = max(
+            config.CHANNEL_POOL_MIN,
+            min(config.CHANNEL_POOL_MAX, math.ceil(expected))
+        )
+
+    async def _rebalance(self):
+        primary = self.bot.get_channel(config.CHANNEL_IDS.get("TICKETS_CATEGORY"))
+        if not primary:
+            return
+
+        # Grow one channel at a time so a refill never hogs the create-channel bucket
+        while len(self.ready) < self.target_size:
+            async with self.bot.category_allocator.place("TICKETS_CATEGORY", primary.guild) as category:
+                channel = await self._create(category) if category else None
+            if not channel:
+                return
+            self.ready.append(channel.id)
+            await asyncio.sleep(1)
+
+        # Shrink slowly - one channel per cycle - when demand drops
+        if len(self.ready) > self.target_size:
+            channel = self.bot.get_channel(self.ready.pop())
+            if channel:
+                try:
+                    await channel.delete(reason="Ticket channel pool shrinking")
+                except discord.HTTPException:
+                    pass
+
+    async def _create(self, category: discord.CategoryChannel) -> Optional[discord.TextChannel]:
+        overwrites = self.bot.overwrite_templates.get(category.guild, "pool")
+        try:
+            return await category.create_text_channel(
+                name=f"{POOL_CHANNEL_PREFIX}-{secrets.token_hex(3)}",
+                overwrites=overwrites,
+                reason="Pre-creating ticket channel"
+            )
+        except discord.HTTPException as e:
+            print(f"⚠️ Could not pre-create ticket channel: {e}")
+            return None
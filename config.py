@@ -104,6 +104,8 @@ POINT_VALUES = {
 
 # ============================================================================
 # BOSS LISTS - For generating /join commands
+# (these seed the category registry; after the first start the database copy
+#  is used - see /category_reload)
 # ============================================================================
 DAILY_4MAN_BOSSES = [
     "Ultra Dage",
@@ -124,17 +126,6 @@ DAILY_7MAN_BOSSES = [
     "Ultra Astral",
 ]
 
-BOSS_7MAN_COMMANDS = {
-    "Ultra Lich": ["frozenlair"],
-    "Ultra Beast": ["Beast"],
-    "Ultra Deimos": ["Deimos"],
-    "Ultra Flibbi": ["Flibbi"],
-    "Ultra Bane": ["Bane"],
-    "Ultra Xyfrag": ["Xyfrag"],
-    "Ultra Kathool": ["Kathool"],
-    "Ultra Astral": ["Astral"],
-}
-
 WEEKLY_ULTRA_BOSSES = [
     "Ultra Dage",
     "Ultra Nulgath",
@@ -143,6 +134,42 @@ WEEKLY_ULTRA_BOSSES = [
     "Ultra Champion Drakath",
 ]
 
+CATEGORY_BOSSES = {
+    "Daily 4-Man Express": DAILY_4MAN_BOSSES,
+    "Daily 7-Man Express": DAILY_7MAN_BOSSES,
+    "Weekly Ultra Express": WEEKLY_ULTRA_BOSSES,
+}
+
+# Boss names: "select" = dropdown label, "embed" = merged name in the ticket embed,
+# "join" = map used in the /join command (listed in the order commands are shown)
+BOSS_NAMES = {
+    "Ultra Dage": {"select": "Ultra Dage", "embed": "ultradage", "join": "ultradage"},
+    "Ultra Tyndarius": {"select": "Ultra Tyndarius", "embed": "ultratyndarius", "join": "ultratyndarius"},
+    "Ultra Engineer": {"select": "Ultra Engineer", "embed": "ultraengineer", "join": "ultraengineer"},
+    "Ultra Warden": {"select": "Ultra Warden", "embed": "ultrawarden", "join": "ultrawarden"},
+    "Ultra Ezrajal": {"select": "Ultra Ezrajal", "embed": "ultraezrajal", "join": "ultraezrajal"},
+    "Ultra Lich": {"select": "Lich Lord", "embed": "lichlord", "join": "frozenlair"},
+    "Ultra Beast": {"select": "Beast", "embed": "beast", "join": "sevencircleswar"},
+    "Ultra Deimos": {"select": "Deimos", "embed": "deimos", "join": "deimos"},
+    "Ultra Flibbi": {"select": "Void Flibbi", "embed": "voidflibbi", "join": "voidflibbi"},
+    "Ultra Bane": {"select": "Void Nightbane", "embed": "voidnightbane", "join": "voidnightbane"},
+    "Ultra Xyfrag": {"select": "Void Xyfrag", "embed": "voidxyfrag", "join": "voidxyfrag"},
+    "Ultra Kathool": {"select": "Kathool", "embed": "kathool", "join": "kathooldepths"},
+    "Ultra Astral": {"select": "Astral Shrine", "embed": "astralshrine", "join": "astralshrine"},
+    "Ultra Nulgath": {"select": "Ultra Nulgath", "embed": "ultranulgath", "join": "ultranulgath"},
+    "Ultra Drago": {"select": "Ultra Drago", "embed": "ultradrago", "join": "ultradrago"},
+    "Ultra Darkon": {"select": "Ultra Darkon", "embed": "ultradarkon", "join": "ultradarkon"},
+    "Ultra Champion Drakath": {"select": "Champion Drakath", "embed": "championdrakath", "join": "championdrakath"},
+}
+
+# /join maps for categories without a boss selection
+CATEGORY_JOIN_COMMANDS = {
+    "UltraSpeaker Express": ["ultraspeaker"],
+    "Ultra Gramiel Express": ["ultragramiel"],
+    "GrimChallenge Express": ["grimchallenge"],
+    "Daily Temple Express": ["templeshrine"],
+}
+
 # ============================================================================
 # COLORS - Embed colors (Discord color codes)
 # ============================================================================
@@ -221,3 +248,112 @@ HARDCODED_COMMANDS = {
 # ============================================================================
 DEFAULT_PREFIX = "!"
 LEADERBOARD_PER_PAGE = 10
+
+# Transcripts are spooled to disk past this size and gzipped past the threshold
+TRANSCRIPT_SPOOL_MAX_MEMORY = 1024 * 1024          # 1 MB in memory, then temp file
+TRANSCRIPT_GZIP_THRESHOLD = 4 * 1024 * 1024         # gzip transcripts larger than 4 MB
+
+# Warm pool of hidden, pre-created ticket channels (sized from recent demand)
+CHANNEL_POOL_ENABLED = True
+CHANNEL_POOL_MIN = 2                          # always keep at least this many ready
+CHANNEL_POOL_MAX = 8                          # never hold more than this many
+CHANNEL_POOL_DEMAND_WINDOW_MINUTES = 60       # how far back to look at ticket volume
+CHANNEL_POOL_HORIZON_MINUTES = 15             # keep enough channels for this long
+CHANNEL_POOL_REFILL_INTERVAL = 60             # seconds between background checks
+
+# Overflow categories - Discord caps a category at 50 channels, so new tickets go
+# into the least-loaded category of their group (CHANNEL_IDS key -> extra category IDs)
+CATEGORY_OVERFLOW = {
+    "TICKETS_CATEGORY": [],
+    "VERIFICATION_CATEGORY": [],
+    "APPRENTICE_TICKET_CATEGORY": [],
+}
+CATEGORY_CHANNEL_LIMIT = 50                   # Discord's hard cap per category
+CATEGORY_AUTO_CREATE = True                   # create another category when all are full
+
+# Private-thread ticket mode - tickets are opened as private threads under these
+# parent channels instead of text channels (no overwrites, no category/channel caps)
+TICKET_THREAD_MODE = False
+THREAD_PARENT_CHANNELS = {
+    "TICKETS": None,                          # parent channel for helper tickets
+    "VERIFICATION": None,                     # parent channel for verification tickets
+    "APPRENTICE": None,                       # parent channel for class tickets
+}
+
+# Outbound REST scheduler - background traffic (embed edits, notifications, logs,
+# transcripts) is queued by priority so interaction responses stay fast
+REST_MAX_INFLIGHT = 4                         # concurrent queued requests
+REST_RESERVED_SLOTS = 1                       # of those, kept free for ticket state edits
+REST_BUCKET_BURST = 5                         # per-channel burst (Discord: 5 messages / 5s)
+REST_BUCKET_PERIOD = 5.0                      # seconds to refill a full burst
+REST_QUEUE_LIMITS = {                         # max queued jobs per lane (None = unbounded)
+    "state": None,
+    "notify": 200,
+    "log": 500,
+}
+REST_DELAY_WARN = 2.0                         # queue wait (s) counted as "delayed"
+
+# Handler latency instrumentation (/perf)
+PERF_SLOW_MS = 2000                           # calls at least this slow are kept as samples
+PERF_SLOW_SAMPLES = 50                        # how many slow samples to keep
+
+# Health endpoints (/healthz, /readyz, /metrics)
+HEALTH_MAX_LATENCY = 5.0                      # gateway latency (s) above which /readyz fails
+HEALTH_DB_TIMEOUT = 3.0                       # seconds allowed for the database ping
+
+# Helper matchmaking queue (/queue)
+MATCHMAKING_SLOT_WEIGHT = 120                 # each missing helper counts as this many seconds of extra wait
+MATCHMAKING_QUEUE_TTL = 3600                  # drop helpers queued longer than this (seconds)
+MATCHMAKING_INTERVAL = 15                     # seconds between matching passes when nothing wakes it
+
+# Ticket lifecycle event log (/ticket_sla)
+TICKET_EVENT_BATCH_SIZE = 50                  # write the buffer once it holds this many events
+TICKET_EVENT_FLUSH_INTERVAL = 5.0             # or this many seconds after the first buffered event
+TICKET_EVENT_BUFFER_MAX = 5000                # events kept in memory while the database is failing
+
+# Demand heatmap (/demand_heatmap)
+DEMAND_HEATMAP_UTC_OFFSET = 0                 # whole hours added to UTC for the grid's day/hour labels
+
+# Idle ticket reaper - tickets with no messages (or helper joins/leaves) get a
+# warning, then are cancelled (transcript + history) if they stay idle
+TICKET_REAPER_ENABLED = True
+TICKET_IDLE_TIMEOUTS = {                      # category -> (idle seconds before warning, seconds from warning to cancel)
+    "default": (3 * 3600, 30 * 60),
+    "Weekly Ultra Express": (6 * 3600, 60 * 60),
+}
+
+# Persistent job scheduler (delayed channel deletions survive restarts)
+CHANNEL_DELETE_DELAY = 5                      # seconds between a close/delete click and the deletion
+TICKET_AUTO_DELETE_AFTER = 24 * 3600          # delete closed ticket channels after this long (None = never)
+JOB_MAX_CONCURRENCY = 2                       # jobs running at once
+JOB_POLL_INTERVAL = 60                        # longest sleep between checks of the job table (seconds)
+JOB_MAX_ATTEMPTS = 5                          # give up on a job after this many failures
+JOB_RETRY_DELAY = 30                          # first retry delay, doubled on every further failure
+JOB_HISTORY_DAYS = 7                          # finished/failed jobs are purged after this many days
+JOB_CLEANUP_SPACING = 2.0                     # seconds between deletions queued by /cleanup_closed_tickets
+
+# Capabilities - which roles grant which named permission (checked via capabilities.can)
+CAPABILITY_ROLES = {
+    "admin_commands": ["ADMIN"],                              # points reset/remove user, categories, perf, queues, SLA, cleanup
+    "manage_points": ["ADMIN", "STAFF"],                      # /points_add, /points_remove, /points_set
+    "post_panel": ["ADMIN", "STAFF"],                         # ticket and apprentice panels
+    "post_verification_panel": ["ADMIN", "STAFF", "OFFICER"],
+    "free_helper": ["ADMIN", "STAFF"],
+    "view_demand": ["ADMIN", "STAFF"],                        # /demand_heatmap
+    "close_ticket": ["ADMIN", "STAFF", "OFFICER"],            # close/cancel any ticket, not just your own
+    "kick_helper": ["ADMIN", "STAFF", "OFFICER"],
+    "remove_cooldown": ["ADMIN", "STAFF", "OFFICER"],
+    "view_room": ["ADMIN", "STAFF", "OFFICER"],               # room number of any ticket
+    "delete_channel": ["ADMIN", "STAFF", "OFFICER"],
+    "keep_ticket_access": ["ADMIN", "STAFF", "OFFICER"],      # not removed from closed tickets / on kick
+    "close_verification": ["ADMIN", "STAFF", "OFFICER"],
+    "close_class": ["ADMIN", "STAFF", "OFFICER"],             # close any apprentice class ticket
+    "search_tickets": ["ADMIN", "STAFF", "OFFICER"],          # /ticket_search
+}
+CAPABILITY_CACHE_MAX = 10000                  # memoized members before the cache is cleared
+
+# Room numbers - every open ticket gets a number no other open ticket has
+ROOM_NUMBER_RANGE = (1000, 99999)             # shared range (inclusive)
+ROOM_NUMBER_RESERVED = {                      # category -> its own (first, last) range, cut out of the shared one
+    # "Weekly Ultra Express": (1000, 1999),
+}
@@ -5,6 +5,8 @@ import os
 from pathlib import Path
 import shutil
 import asyncio
+import time
+from datetime import datetime, timezone
 
 DEFAULT_DB_FILE = "bot_data.db"
 DB_FILE = os.getenv("DB_FILE", DEFAULT_DB_FILE)
@@ -170,12 +172,137 @@ class Database:
         )
         """)
         
+        # Columns added to ticket_history after release
+        async with self.db.execute("PRAGMA table_info(ticket_history)") as cursor:
+            history_columns = {row[1] for row in await cursor.fetchall()}
+        if "opened_at" not in history_columns:
+            await self.db.execute("ALTER TABLE ticket_history ADD COLUMN opened_at TIMESTAMP")
+        if "cancelled" not in history_columns:
+            await self.db.execute("ALTER TABLE ticket_history ADD COLUMN cancelled INTEGER DEFAULT 0")
+        
+        # Append-only ticket lifecycle log (times are unix seconds)
+        await self.db.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel_id INTEGER NOT NULL,
+            category TEXT,
+            event TEXT NOT NULL,
+            user_id INTEGER,
+            actor_id INTEGER,
+            helpers INTEGER,
+            at REAL NOT NULL
+        )
+        """)
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_ticket_events_channel ON ticket_events (channel_id)")
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_ticket_events_category_at ON ticket_events (category, at)")
+        
+        # One row per ticket, folded from the event log as it is written (/ticket_sla)
+        await self.db.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_timings (
+            channel_id INTEGER PRIMARY KEY,
+            category TEXT,
+            created_at REAL NOT NULL,
+            first_helper_at REAL,
+            filled_at REAL,
+            closed_at REAL,
+            outcome TEXT
+        )
+        """)
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_ticket_timings_created ON ticket_timings (created_at, category)")
+        
+        # One row per helper of each completed ticket (/helper_stats)
+        await self.db.execute("""
+        CREATE TABLE IF NOT EXISTS history_helpers (
+            history_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            category TEXT,
+            points INTEGER,
+            closed_at TIMESTAMP,
+            PRIMARY KEY (history_id, user_id)
+        )
+        """)
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_history_helpers_user ON history_helpers (user_id, closed_at)")
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_history_helpers_closed ON history_helpers (closed_at)")
+        await self._backfill_history_helpers()
+        
+        # Persistent delayed jobs (channel deletions) - see job_scheduler.py
+        await self.db.execute("""
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            job_key TEXT,
+            payload TEXT,
+            due_at REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            created_at REAL
+        )
+        """)
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_due ON scheduled_jobs (status, due_at)")
+        # At most one pending job per key (e.g. one deletion per channel)
+        await self.db.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_scheduled_jobs_key ON scheduled_jobs (job_key) WHERE status = 'pending'"
+        )
+        
+        # Each user's last selections per category ("Same as last time" on the panel)
+        await self.db.execute("""
+        CREATE TABLE IF NOT EXISTS ticket_preferences (
+            user_id INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            selected_bosses TEXT DEFAULT '[]',
+            selected_server TEXT,
+            in_game_name TEXT,
+            updated_at REAL,
+            PRIMARY KEY (user_id, category)
+        )
+        """)
+        
         await self.db.commit()
 
+    async def _backfill_history_helpers(self):
+        """Split the helpers JSON of existing history into history_helpers (runs once, while it is empty)"""
+        async with self.db.execute("SELECT EXISTS (SELECT 1 FROM history_helpers)") as cursor:
+            if (await cursor.fetchone())[0]:
+                return
+        try:
+            # Cancelled tickets were saved with 0 points per helper
+            cursor = await self.db.execute("""
+                INSERT OR IGNORE INTO history_helpers (history_id, user_id, category, points, closed_at)
+                SELECT h.id, CAST(j.value AS INTEGER), h.category, h.points_per_helper, h.closed_at
+                FROM ticket_history h, json_each(h.helpers) j
+                WHERE json_valid(h.helpers) AND h.points_per_helper > 0 AND NOT h.cancelled
+            """)
+            # Tickets opened since the event log existed know their open time
+            await self.db.execute("""
+                UPDATE ticket_history
+                SET opened_at = (SELECT datetime(t.created_at, 'unixepoch') FROM ticket_timings t
+                                 WHERE t.channel_id = ticket_history.channel_id)
+                WHERE opened_at IS NULL
+            """)
+            if cursor.rowcount:
+                print(f"✅ Backfilled {cursor.rowcount} helper history rows")
+        except Exception as e:
+            print(f"⚠️ Helper history backfill failed: {e}")
+
     async def _fs_run(self, func):
         loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, func)
 
+    # ---------- HEALTH ----------
+    async def ping(self):
+        """Cheap round trip to the active backend (raises if it is unreachable)"""
+        if self.backend == "firestore":
+            def _op():
+                list(self.fs.collection("config").limit(1).stream())
+                return True
+            return await self._fs_run(_op)
+        if not self.db:
+            raise RuntimeError("SQLite is not connected")
+        async with self.db.execute("SELECT 1") as cursor:
+            await cursor.fetchone()
+        return True
+
     # ---------- STATS ----------
     async def get_total_tickets(self):
         """Get total number of tickets (starts at 15114)"""
@@ -211,6 +338,42 @@ class Database:
             print(f"⚠️ Error getting 24h stats: {e}")
             return 0
 
+    async def get_recent_ticket_demand(self, minutes: int = 60):
+        """Tickets opened in the last N minutes (still active or already closed)"""
+        if self.backend != "sqlite":
+            return 0
+        
+        window = f"-{int(minutes)} minutes"
+        try:
+            async with self.db.execute(
+                "SELECT (SELECT COUNT(*) FROM active_tickets WHERE created_at > datetime('now', ?)) + "
+                "(SELECT COUNT(*) FROM ticket_history WHERE closed_at > datetime('now', ?))",
+                (window, window)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else 0
+        except Exception as e:
+            print(f"⚠️ Error getting ticket demand: {e}")
+            return 0
+
+    async def get_demand_rows(self, after_id: int = 0, limit: int = 50000):
+        """History rows after `after_id` as (id, category, opened unix time, wait seconds or None).
+        Tickets closed before opened_at was recorded count at their close time."""
+        if self.backend != "sqlite":
+            return []
+        
+        async with self.db.execute("""
+            SELECT h.id, h.category,
+                   CAST(strftime('%s', COALESCE(h.opened_at, h.closed_at)) AS INTEGER),
+                   t.first_helper_at - t.created_at
+            FROM ticket_history h
+            LEFT JOIN ticket_timings t ON t.channel_id = h.channel_id
+            WHERE h.id > ?
+            ORDER BY h.id
+            LIMIT ?
+        """, (after_id, limit)) as cursor:
+            return await cursor.fetchall()
+
     # ---------- ROLES ----------
     async def set_roles(self, admin, staff, helper, restricted_ids):
         roles_data = {"admin": admin, "staff": staff, "helper": helper, "restricted": restricted_ids}
@@ -551,6 +714,7 @@ class Database:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(channel_id) DO UPDATE SET
                 helpers=excluded.helpers,
+                embed_message_id=excluded.embed_message_id,
                 proof_submitted=excluded.proof_submitted,
                 proof=excluded.proof,
                 is_closed=excluded.is_closed
@@ -577,16 +741,30 @@ class Database:
         if self.backend == "firestore":
             try:
                 def _op():
-                    self.fs.collection("ticket_history").add(history_data)
+                    _, ref = self.fs.collection("ticket_history").add(history_data)
+                    if history_data.get("cancelled"):
+                        return
+                    closed_at = datetime.now(timezone.utc)
+                    batch = self.fs.batch()
+                    for helper_id in _helper_ids(history_data["helpers"]):
+                        batch.set(self.fs.collection("history_helpers").document(f"{ref.id}_{helper_id}"), {
+                            "history_id": ref.id,
+                            "user_id": helper_id,
+                            "category": history_data["category"],
+                            "points": history_data["points_per_helper"],
+                            "closed_at": closed_at,
+                        })
+                    batch.commit()
                 return await self._fs_run(_op)
             except Exception as e:
                 await self._fallback_to_sqlite(str(e))
         
-        await self.db.execute("""
+        # The active row is still there while history is saved - it knows the open time
+        cursor = await self.db.execute("""
             INSERT INTO ticket_history 
             (channel_id, category, requestor_id, helpers, points_per_helper, 
-             total_points_awarded, closed_by)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+             total_points_awarded, closed_by, opened_at, cancelled)
+            VALUES (?, ?, ?, ?, ?, ?, ?, (SELECT created_at FROM active_tickets WHERE channel_id = ?), ?)
         """, (
             history_data["channel_id"],
             history_data["category"],
@@ -594,8 +772,32 @@ class Database:
             history_data["helpers"],
             history_data["points_per_helper"],
             history_data["total_points_awarded"],
-            history_data["closed_by"]
+            history_data["closed_by"],
+            history_data["channel_id"],
+            bool(history_data.get("cancelled", False))
         ))
+        if not history_data.get("cancelled"):
+            history_id = cursor.lastrowid
+            await self.db.executemany("""
+                INSERT OR IGNORE INTO history_helpers (history_id, user_id, category, points, closed_at)
+                SELECT id, ?, category, points_per_helper, closed_at FROM ticket_history WHERE id = ?
+            """, [(helper_id, history_id) for helper_id in _helper_ids(history_data["helpers"])])
+        await self.db.commit()
+
+    async def set_ticket_embed_message(self, channel_id, message_id):
+        """Point a ticket at a re-posted embed message"""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    self.fs.collection("active_tickets").document(str(channel_id)).update({"embed_message_id": message_id})
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        await self.db.execute(
+            "UPDATE active_tickets SET embed_message_id = ? WHERE channel_id = ?",
+            (message_id, channel_id)
+        )
         await self.db.commit()
 
     async def delete_ticket(self, channel_id):
@@ -715,3 +917,488 @@ class Database:
                     "is_closed": bool(row[13])
                 })
             return tickets
+
+    # ---------- TICKET EVENTS ----------
+    async def add_ticket_events(self, events):
+        """Append a batch of lifecycle events and fold them into ticket_timings"""
+        if not events:
+            return
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    timings = {}
+                    batch = self.fs.batch()
+                    for event in events:
+                        batch.set(self.fs.collection("ticket_events").document(), event)
+                        doc_id = str(event["channel_id"])
+                        if doc_id not in timings:
+                            snap = self.fs.collection("ticket_timings").document(doc_id).get()
+                            timings[doc_id] = snap.to_dict() if snap.exists else {}
+                        _fold_timing(timings[doc_id], event)
+                    for doc_id, timing in timings.items():
+                        if timing.get("created_at") is not None:
+                            batch.set(self.fs.collection("ticket_timings").document(doc_id), timing)
+                    batch.commit()
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        await self.db.executemany(
+            "INSERT INTO ticket_events (channel_id, category, event, user_id, actor_id, helpers, at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(e["channel_id"], e["category"], e["event"], e.get("user_id"), e.get("actor_id"), e.get("helpers"), e["at"])
+             for e in events]
+        )
+        # Events in a batch are in order, so created -> joined -> closed per ticket holds
+        await self.db.executemany(
+            "INSERT OR IGNORE INTO ticket_timings (channel_id, category, created_at) VALUES (?, ?, ?)",
+            [(e["channel_id"], e["category"], e["at"]) for e in events if e["event"] == "created"]
+        )
+        await self.db.executemany(
+            "UPDATE ticket_timings SET first_helper_at = COALESCE(first_helper_at, ?), "
+            "filled_at = COALESCE(filled_at, ?) WHERE channel_id = ?",
+            [(e["at"], e["at"] if e.get("filled") else None, e["channel_id"])
+             for e in events if e["event"] == "helper_joined"]
+        )
+        await self.db.executemany(
+            "UPDATE ticket_timings SET closed_at = ?, outcome = ? WHERE channel_id = ?",
+            [(e["at"], e["event"], e["channel_id"]) for e in events if e["event"] in ("closed", "cancelled")]
+        )
+        await self.db.commit()
+
+    async def get_ticket_sla(self, since: float, category=None):
+        """Wait (first helper) and fill (all slots) times for tickets opened since `since`.
+        Returns {category: {"opened", "waiting", "unfilled", "wait": {...}, "fill": {...}}}
+        where wait/fill hold count, avg, p50, p90 and p99 in seconds."""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    query = self.fs.collection("ticket_timings").where("created_at", ">=", since)
+                    by_category = {}
+                    for d in query.stream():
+                        row = d.to_dict()
+                        if category and row.get("category") != category:
+                            continue
+                        by_category.setdefault(row.get("category"), []).append(row)
+                    return {name: _sla_from_rows(rows) for name, rows in by_category.items()}
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        category_filter = " AND category = ?" if category else ""
+        params = (since, category) if category else (since,)
+        report = {}
+        
+        # Counts - a range scan of the (created_at, category) index
+        async with self.db.execute(f"""
+            SELECT category, COUNT(*),
+                   SUM(first_helper_at IS NULL AND closed_at IS NULL),
+                   SUM(filled_at IS NULL)
+            FROM ticket_timings
+            WHERE created_at >= ?{category_filter}
+            GROUP BY category
+        """, params) as cursor:
+            for row in await cursor.fetchall():
+                report[row[0]] = {
+                    "opened": row[1], "waiting": row[2] or 0, "unfilled": row[3] or 0,
+                    "wait": _empty_sla(), "fill": _empty_sla(),
+                }
+        
+        # Nearest-rank percentiles: the smallest value whose rank reaches q% of n
+        async with self.db.execute(f"""
+            WITH durations AS (
+                SELECT category, 'wait' AS metric, first_helper_at - created_at AS seconds
+                FROM ticket_timings
+                WHERE created_at >= ?{category_filter} AND first_helper_at IS NOT NULL
+                UNION ALL
+                SELECT category, 'fill', filled_at - created_at
+                FROM ticket_timings
+                WHERE created_at >= ?{category_filter} AND filled_at IS NOT NULL
+            ), ranked AS (
+                SELECT category, metric, seconds,
+                       ROW_NUMBER() OVER (PARTITION BY category, metric ORDER BY seconds) AS rank,
+                       COUNT(*) OVER (PARTITION BY category, metric) AS n
+                FROM durations
+            )
+            SELECT category, metric, MAX(n), AVG(seconds),
+                   MIN(CASE WHEN rank * 100 >= 50 * n THEN seconds END),
+                   MIN(CASE WHEN rank * 100 >= 90 * n THEN seconds END),
+                   MIN(CASE WHEN rank * 100 >= 99 * n THEN seconds END)
+            FROM ranked
+            GROUP BY category, metric
+        """, params * 2) as cursor:
+            for row in await cursor.fetchall():
+                if row[0] in report:
+                    report[row[0]][row[1]] = {"count": row[2], "avg": row[3], "p50": row[4], "p90": row[5], "p99": row[6]}
+        return report
+
+    # ---------- HELPER STATS ----------
+    async def get_helper_stats(self, user_id, recent: int = 5):
+        """Completed tickets for one helper: totals, per-category split, recent tickets, average duration"""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    docs = self.fs.collection("history_helpers").where("user_id", "==", user_id).stream()
+                    return _helper_stats_from_rows([d.to_dict() for d in docs], recent)
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        # Every query below is a range over idx_history_helpers_user (user_id, closed_at)
+        async with self.db.execute("""
+            SELECT COUNT(*), COALESCE(SUM(points), 0), MIN(closed_at), MAX(closed_at),
+                   SUM(closed_at > datetime('now', '-30 days'))
+            FROM history_helpers WHERE user_id = ?
+        """, (user_id,)) as cursor:
+            row = await cursor.fetchone()
+        stats = {
+            "tickets": row[0], "points": row[1], "first": row[2], "last": row[3], "last_30d": row[4] or 0,
+        }
+        
+        async with self.db.execute("""
+            SELECT category, COUNT(*), SUM(points)
+            FROM history_helpers WHERE user_id = ?
+            GROUP BY category ORDER BY COUNT(*) DESC
+        """, (user_id,)) as cursor:
+            stats["categories"] = [
+                {"category": r[0], "tickets": r[1], "points": r[2] or 0} for r in await cursor.fetchall()
+            ]
+        
+        async with self.db.execute("""
+            SELECT category, points, closed_at
+            FROM history_helpers WHERE user_id = ?
+            ORDER BY closed_at DESC LIMIT ?
+        """, (user_id, recent)) as cursor:
+            stats["recent"] = [
+                {"category": r[0], "points": r[1], "closed_at": r[2]} for r in await cursor.fetchall()
+            ]
+        
+        # Duration needs the open time, one primary-key lookup per helper row
+        async with self.db.execute("""
+            SELECT AVG((julianday(h.closed_at) - julianday(h.opened_at)) * 86400), COUNT(h.opened_at)
+            FROM history_helpers hh JOIN ticket_history h ON h.id = hh.history_id
+            WHERE hh.user_id = ? AND h.opened_at IS NOT NULL
+        """, (user_id,)) as cursor:
+            row = await cursor.fetchone()
+        stats["avg_duration"] = row[0]
+        stats["timed_tickets"] = row[1]
+        return stats
+
+    # ---------- SCHEDULED JOBS ----------
+    async def schedule_job(self, kind, payload, due_at, key=None):
+        """Add a pending job. A pending job with the same key keeps the earlier due time."""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    jobs = self.fs.collection("scheduled_jobs")
+                    doc = jobs.document(key) if key else jobs.document()
+                    snap = doc.get() if key else None
+                    if snap is not None and snap.exists and snap.to_dict().get("status") == "pending":
+                        doc.update({"due_at": min(snap.to_dict()["due_at"], due_at), "payload": payload})
+                        return
+                    doc.set({
+                        "kind": kind, "job_key": key, "payload": payload, "due_at": due_at,
+                        "status": "pending", "attempts": 0, "last_error": None, "created_at": time.time(),
+                    })
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        await self.db.execute("""
+            INSERT INTO scheduled_jobs (kind, job_key, payload, due_at, status, attempts, created_at)
+            VALUES (?, ?, ?, ?, 'pending', 0, ?)
+            ON CONFLICT(job_key) WHERE status = 'pending' DO UPDATE SET
+                due_at = MIN(due_at, excluded.due_at),
+                payload = excluded.payload
+        """, (kind, key, json.dumps(payload), due_at, time.time()))
+        await self.db.commit()
+
+    async def get_due_jobs(self, now, limit):
+        """Pending jobs due by `now`, oldest first"""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    docs = self.fs.collection("scheduled_jobs").where("status", "==", "pending").stream()
+                    due = [{"id": d.id, **d.to_dict()} for d in docs]
+                    due = sorted((job for job in due if job["due_at"] <= now), key=lambda job: job["due_at"])
+                    return [
+                        {"id": job["id"], "kind": job["kind"], "payload": job.get("payload") or {}, "attempts": job.get("attempts", 0)}
+                        for job in due[:limit]
+                    ]
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        async with self.db.execute("""
+            SELECT id, kind, payload, attempts FROM scheduled_jobs
+            WHERE status = 'pending' AND due_at <= ?
+            ORDER BY due_at LIMIT ?
+        """, (now, limit)) as cursor:
+            rows = await cursor.fetchall()
+        return [{"id": r[0], "kind": r[1], "payload": json.loads(r[2] or "{}"), "attempts": r[3]} for r in rows]
+
+    async def next_job_due(self):
+        """Due time of the earliest pending job (None if there is none)"""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    docs = self.fs.collection("scheduled_jobs").where("status", "==", "pending").stream()
+                    return min((d.to_dict()["due_at"] for d in docs), default=None)
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        async with self.db.execute("SELECT MIN(due_at) FROM scheduled_jobs WHERE status = 'pending'") as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else None
+
+    async def claim_job(self, job_id):
+        """Mark a pending job as running. False if something else already took it."""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    doc = self.fs.collection("scheduled_jobs").document(str(job_id))
+                    snap = doc.get()
+                    if not snap.exists or snap.to_dict().get("status") != "pending":
+                        return False
+                    doc.update({"status": "running"})
+                    return True
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        cursor = await self.db.execute(
+            "UPDATE scheduled_jobs SET status = 'running' WHERE id = ? AND status = 'pending'", (job_id,)
+        )
+        await self.db.commit()
+        return cursor.rowcount == 1
+
+    async def finish_job(self, job_id, status="done", error=None):
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    self.fs.collection("scheduled_jobs").document(str(job_id)).update({"status": status, "last_error": error})
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        await self.db.execute(
+            "UPDATE scheduled_jobs SET status = ?, last_error = ? WHERE id = ?", (status, error, job_id)
+        )
+        await self.db.commit()
+
+    async def retry_job(self, job_id, due_at, error):
+        """Put a failed job back in the queue (dropped if a newer job with its key is pending)"""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    self.fs.collection("scheduled_jobs").document(str(job_id)).update({
+                        "status": "pending", "due_at": due_at, "attempts": firestore.Increment(1), "last_error": error,
+                    })
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        await self.db.execute(f"""
+            UPDATE scheduled_jobs SET status = {_REQUEUE_STATUS}, due_at = ?, attempts = attempts + 1, last_error = ?
+            WHERE id = ?
+        """, (due_at, error, job_id))
+        await self.db.commit()
+
+    async def requeue_running_jobs(self):
+        """Jobs that were running when the bot stopped go back to pending (startup)"""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    docs = self.fs.collection("scheduled_jobs").where("status", "==", "running").stream()
+                    count = 0
+                    for d in docs:
+                        d.reference.update({"status": "pending"})
+                        count += 1
+                    return count
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        cursor = await self.db.execute(
+            f"UPDATE scheduled_jobs SET status = {_REQUEUE_STATUS} WHERE status = 'running'"
+        )
+        await self.db.commit()
+        return cursor.rowcount
+
+    async def purge_jobs(self, before):
+        """Forget finished and failed jobs that were due before `before`"""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    for status in ("done", "failed"):
+                        for d in self.fs.collection("scheduled_jobs").where("status", "==", status).stream():
+                            if d.to_dict().get("due_at", 0) < before:
+                                d.reference.delete()
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        await self.db.execute(
+            "DELETE FROM scheduled_jobs WHERE status IN ('done', 'failed') AND due_at < ?", (before,)
+        )
+        await self.db.commit()
+
+    async def get_job_counts(self):
+        """{status: count} for the job queue"""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    counts = {}
+                    for d in self.fs.collection("scheduled_jobs").stream():
+                        status = d.to_dict().get("status")
+                        counts[status] = counts.get(status, 0) + 1
+                    return counts
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        async with self.db.execute("SELECT status, COUNT(*) FROM scheduled_jobs GROUP BY status") as cursor:
+            return {row[0]: row[1] for row in await cursor.fetchall()}
+
+    async def save_ticket_preferences(self, user_id, category, selected_bosses, selected_server, in_game_name):
+        """Remember what a user picked for their latest ticket in a category"""
+        prefs = {
+            "user_id": user_id,
+            "category": category,
+            "selected_bosses": json.dumps(selected_bosses or []),
+            "selected_server": selected_server,
+            "in_game_name": in_game_name,
+            "updated_at": time.time(),
+        }
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    self.fs.collection("ticket_preferences").document(f"{user_id}_{category}").set(prefs)
+                return await self._fs_run(_op)
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        await self.db.execute("""
+            INSERT INTO ticket_preferences (user_id, category, selected_bosses, selected_server, in_game_name, updated_at)
+            VALUES (:user_id, :category, :selected_bosses, :selected_server, :in_game_name, :updated_at)
+            ON CONFLICT(user_id, category) DO UPDATE SET
+                selected_bosses = excluded.selected_bosses,
+                selected_server = excluded.selected_server,
+                in_game_name = excluded.in_game_name,
+                updated_at = excluded.updated_at
+        """, prefs)
+        await self.db.commit()
+
+    async def get_ticket_preferences(self, user_id, category):
+        """A user's last selections for a category, or None"""
+        if self.backend == "firestore":
+            try:
+                def _op():
+                    snap = self.fs.collection("ticket_preferences").document(f"{user_id}_{category}").get()
+                    return snap.to_dict() if snap.exists else None
+                prefs = await self._fs_run(_op)
+                if prefs:
+                    prefs["selected_bosses"] = json.loads(prefs.get("selected_bosses") or "[]")
+                return prefs
+            except Exception as e:
+                await self._fallback_to_sqlite(str(e))
+        
+        async with self.db.execute("""
+            SELECT selected_bosses, selected_server, in_game_name, updated_at
+            FROM ticket_preferences WHERE user_id = ? AND category = ?
+        """, (user_id, category)) as cursor:
+            row = await cursor.fetchone()
+        if not row:
+            return None
+        return {
+            "user_id": user_id,
+            "category": category,
+            "selected_bosses": json.loads(row[0] or "[]"),
+            "selected_server": row[1],
+            "in_game_name": row[2],
+            "updated_at": row[3],
+        }
+
+
+# A job going back to pending is dropped instead if another pending job has its key
+_REQUEUE_STATUS = """CASE WHEN job_key IS NOT NULL AND EXISTS (
+    SELECT 1 FROM scheduled_jobs other
+    WHERE other.job_key = scheduled_jobs.job_key AND other.status = 'pending'
+) THEN 'done' ELSE 'pending' END"""
+
+
+def _helper_ids(helpers) -> list:
+    """Helper IDs from a history row (stored as a JSON string)"""
+    if isinstance(helpers, str):
+        try:
+            helpers = json.loads(helpers)
+        except ValueError:
+            return []
+    return [int(h) for h in helpers or []]
+
+
+def _helper_stats_from_rows(rows, recent: int) -> dict:
+    """Same stats as the SQLite queries, computed in Python (Firestore has no open times)"""
+    rows = sorted(rows, key=lambda r: r.get("closed_at") or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+    cutoff = datetime.now(timezone.utc).timestamp() - 30 * 86400
+    categories = {}
+    for r in rows:
+        entry = categories.setdefault(r.get("category"), {"category": r.get("category"), "tickets": 0, "points": 0})
+        entry["tickets"] += 1
+        entry["points"] += r.get("points") or 0
+    return {
+        "tickets": len(rows),
+        "points": sum(r.get("points") or 0 for r in rows),
+        "first": rows[-1].get("closed_at") if rows else None,
+        "last": rows[0].get("closed_at") if rows else None,
+        "last_30d": sum(1 for r in rows if r.get("closed_at") and r["closed_at"].timestamp() > cutoff),
+        "categories": sorted(categories.values(), key=lambda c: c["tickets"], reverse=True),
+        "recent": [
+            {"category": r.get("category"), "points": r.get("points"), "closed_at": r.get("closed_at")}
+            for r in rows[:recent]
+        ],
+        "avg_duration": None,
+        "timed_tickets": 0,
+    }
+
+
+def _fold_timing(timing: dict, event: dict):
+    """Apply one lifecycle event to a ticket_timings document (Firestore)"""
+    kind = event["event"]
+    if kind == "created":
+        timing.setdefault("category", event["category"])
+        if timing.get("created_at") is None:
+            timing["created_at"] = event["at"]
+    elif kind == "helper_joined":
+        if timing.get("first_helper_at") is None:
+            timing["first_helper_at"] = event["at"]
+        if event.get("filled") and timing.get("filled_at") is None:
+            timing["filled_at"] = event["at"]
+    elif kind in ("closed", "cancelled"):
+        timing["closed_at"] = event["at"]
+        timing["outcome"] = kind
+
+
+def _empty_sla() -> dict:
+    return {"count": 0, "avg": None, "p50": None, "p90": None, "p99": None}
+
+
+def _sla_from_rows(rows) -> dict:
+    """Same report as the SQLite query, computed in Python (Firestore)"""
+    def summarize(values):
+        if not values:
+            return _empty_sla()
+        values = sorted(values)
+        n = len(values)
+        def nearest_rank(percent):
+            return values[max(0, -(-percent * n // 100) - 1)]
+        return {"count": n, "avg": sum(values) / n, "p50": nearest_rank(50), "p90": nearest_rank(90), "p99": nearest_rank(99)}
+    
+    return {
+        "opened": len(rows),
+        "waiting": sum(1 for r in rows if r.get("first_helper_at") is None and r.get("closed_at") is None),
+        "unfilled": sum(1 for r in rows if r.get("filled_at") is None),
+        "wait": summarize([r["first_helper_at"] - r["created_at"] for r in rows if r.get("first_helper_at") is not None]),
+        "fill": summarize([r["filled_at"] - r["created_at"] for r in rows if r.get("filled_at") is not None]),
+    }
@@ -0,0 +1,218 @@
+# demand_heatmap.py
+# Hour-of-week x category ticket volume and wait times (/demand_heatmap)
+
+import discord
+from discord import app_commands
+import asyncio
+import time
+from typing import Optional
+import config
+from capabilities import can
+from category_registry import registry
+from ticket_events import format_duration
+
+try:
+    import numpy as np
+except ImportError:  # optional - falls back to plain Python binning
+    np = None
+
+HOURS_PER_WEEK = 7 * 24
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+SHADES = " ░▒▓█"
+LOAD_CHUNK = 50000  # history rows fetched per query on the first load
+
+
+class DemandHeatmap:
+    """Cached per-category hour-of-week matrices built from ticket history.
+
+    Each category owns a row of three 168-bucket arrays: tickets opened,
+    summed wait (first helper) seconds and the number of tickets with a
+    known wait. `refresh` only reads history rows newer than the last one
+    it binned, so after the first load a report costs one small indexed
+    query plus a few array ops. Closing a ticket marks the cache stale."""
+    def __init__(self, bot):
+        self.bot = bot
+        self.categories = {}   # category -> row index
+        self.volume = self._zeros(0)
+        self.wait_sum = self._zeros(0)
+        self.wait_count = self._zeros(0)
+        self.last_id = 0
+        self.first_at = None
+        self.last_at = None
+        self.stale = True
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _zeros(rows: int):
+        if np is not None:
+            return np.zeros((rows, HOURS_PER_WEEK), dtype=np.float64)
+        return [[0.0] * HOURS_PER_WEEK for _ in range(rows)]
+
+    def ticket_closed(self):
+        self.stale = True
+
+    def _row(self, category: str) -> int:
+        if category not in self.categories:
+            self.categories[category] = len(self.categories)
+            if np is not None:
+                grow = np.zeros((1, HOURS_PER_WEEK))
+                self.volume = np.vstack([self.volume, grow])
+                self.wait_sum = np.vstack([self.wait_sum, grow])
+                self.wait_count = np.vstack([self.wait_count, grow])
+            else:
+                for matrix in (self.volume, self.wait_sum, self.wait_count):
+                    matrix.append([0.0] * HOURS_PER_WEEK)
+        return self.categories[category]
+
+    async def refresh(self) -> int:
+        """Bin history rows closed since the last refresh. Returns how many were added."""
+        if not self.stale:
+            return 0
+        async with self._lock:
+            # Cleared first so a ticket closing mid-refresh marks it stale again
+            self.stale = False
+            added = 0
+            while True:
+                rows = await self.bot.db.get_demand_rows(self.last_id, LOAD_CHUNK)
+                if rows:
+                    self._bin(rows)
+                    self.last_id = rows[-1][0]
+                    added += len(rows)
+                if len(rows) < LOAD_CHUNK:
+                    break
+            return added
+
+    def _bin(self, rows):
+        """rows: (history id, category, opened unix time, wait seconds or None)"""
+        rows = [row for row in rows if row[2] is not None]
+        if not rows:
+            return
+        category_rows = [self._row(row[1]) for row in rows]
+        offset = config.DEMAND_HEATMAP_UTC_OFFSET * 3600
+        times = [row[2] for row in rows]
+        self.first_at = min(times) if self.first_at is None else min(self.first_at, min(times))
+        self.last_at = max(times) if self.last_at is None else max(self.last_at, max(times))
+
+        if np is not None:
+            opened = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows)) + offset
+            waits = np.fromiter(
+                (row[3] if row[3] is not None else np.nan for row in rows), dtype=np.float64, count=len(rows)
+            )
+            # Unix day 0 was a Thursday - shift so Monday 00:00 is bucket 0
+            bucket = ((opened // 86400 + 3) % 7) * 24 + (opened // 3600) % 24
+            flat = np.asarray(category_rows, dtype=np.int64) * HOURS_PER_WEEK + bucket
+            size = len(self.categories) * HOURS_PER_WEEK
+            known = ~np.isnan(waits)
+            self.volume += np.bincount(flat, minlength=size).reshape(-1, HOURS_PER_WEEK)
+            self.wait_sum += np.bincount(flat[known], weights=waits[known], minlength=size).reshape(-1, HOURS_PER_WEEK)
+            self.wait_count += np.bincount(flat[known], minlength=size).reshape(-1, HOURS_PER_WEEK)
+            return
+
+        for row_index, (_, _, opened, wait) in zip(category_rows, rows):
+            opened += offset
+            bucket = ((opened // 86400 + 3) % 7) * 24 + (opened // 3600) % 24
+            self.volume[row_index][bucket] += 1
+            if wait is not None:
+                self.wait_sum[row_index][bucket] += wait
+                self.wait_count[row_index][bucket] += 1
+
+    def grid(self, metric: str, category: Optional[str] = None):
+        """168 values (tickets per week, or average wait seconds) for one category or all of them"""
+        if category is not None and category not in self.categories:
+            return [0.0] * HOURS_PER_WEEK
+        weeks = max(1.0, ((self.last_at or 0) - (self.first_at or 0)) / (7 * 86400))
+
+        if np is not None:
+            pick = slice(None) if category is None else slice(self.categories[category], self.categories[category] + 1)
+            if metric == "wait":
+                total = self.wait_sum[pick].sum(axis=0)
+                count = self.wait_count[pick].sum(axis=0)
+                return np.divide(total, count, out=np.zeros(HOURS_PER_WEEK), where=count > 0).tolist()
+            return (self.volume[pick].sum(axis=0) / weeks).tolist()
+
+        rows = range(len(self.categories)) if category is None else [self.categories[category]]
+        if metric == "wait":
+            result = []
+            for h in range(HOURS_PER_WEEK):
+                total = sum(self.wait_sum[r][h] for r in rows)
+                count = sum(self.wait_count[r][h] for r in rows)
+                result.append(total / count if count else 0.0)
+            return result
+        return [sum(self.volume[r][h] for r in rows) / weeks for h in range(HOURS_PER_WEEK)]
+
+
+def render_grid(values) -> str:
+    """7 x 24 shaded text grid, one row per day"""
+    peak = max(values) or 1
+    lines = ["    0     6     12    18    "]
+    for day, name in enumerate(DAY_NAMES):
+        cells = values[day * 24:(day + 1) * 24]
+        shades = "".join(
+            SHADES[0] if v <= 0 else SHADES[min(len(SHADES) - 1, 1 + int(v / peak * (len(SHADES) - 1.001)))]
+            for v in cells
+        )
+        lines.append(f"{name} {shades}")
+    return "\n".join(lines)
+
+
+def _format_value(metric: str, value: float) -> str:
+    if metric == "wait":
+        return format_duration(value)
+    return f"{value:.1f}/wk"
+
+
+async def setup_demand_heatmap(bot):
+    """Setup demand heatmap command"""
+
+    async def category_autocomplete(interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in registry.names()
+            if current.lower() in name.lower()
+        ][:25]
+
+    @bot.tree.command(name="demand_heatmap", description="Show when tickets are opened and how long they wait (Staff only)")
+    @app_commands.describe(metric="What to shade", category="Only this ticket category")
+    @app_commands.choices(metric=[
+        app_commands.Choice(name="Tickets opened", value="volume"),
+        app_commands.Choice(name="Average wait for a helper", value="wait"),
+    ])
+    @app_commands.autocomplete(category=category_autocomplete)
+    async def demand_heatmap(interaction: discord.Interaction, metric: str = "volume", category: Optional[str] = None):
+        """Hour-of-week grid of ticket demand for staffing"""
+        if not can(interaction.user, "view_demand"):
+            await interaction.response.send_message("❌ Only admins and staff can use this command.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        started = time.perf_counter()
+        heatmap = bot.demand_heatmap
+        await heatmap.refresh()
+        values = heatmap.grid(metric, category)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if not any(values):
+            await interaction.followup.send("ℹ️ No ticket history to chart yet.", ephemeral=True)
+            return
+
+        peaks = sorted(range(HOURS_PER_WEEK), key=lambda h: values[h], reverse=True)[:5]
+        offset = config.DEMAND_HEATMAP_UTC_OFFSET
+        embed = discord.Embed(
+            title=f"🗓️ {'Ticket Demand' if metric == 'volume' else 'Helper Wait'} by Hour"
+                  + (f" - {category}" if category else ""),
+            description=f"```\n{render_grid(values)}\n```",
+            color=config.COLORS["PRIMARY"]
+        )
+        embed.add_field(
+            name="Busiest hours" if metric == "volume" else "Longest waits",
+            value="\n".join(
+                f"{DAY_NAMES[h // 24]} {h % 24:02d}:00 - {_format_value(metric, values[h])}" for h in peaks
+            ),
+            inline=False
+        )
+        embed.set_footer(
+            text=f"Hours in UTC{offset:+d} • darker = {'more tickets' if metric == 'volume' else 'longer wait'} • "
+                 f"built in {elapsed:.0f} ms"
+        )
+        await interaction.followup.send(embed=embed, ephemeral=True)
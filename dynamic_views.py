@@ -0,0 +1,17 @@
+# dynamic_views.py
+# Layout-only views for DynamicItem components (their state lives in the custom_id)
+
+import discord
+
+
+def stateless_view(*items: discord.ui.Item) -> discord.ui.View:
+    """Lay out DynamicItems for a message.
+
+    Clicks on them are routed by custom_id template (bot.add_dynamic_items),
+    so the view is stopped before it is sent - discord.py only stores views
+    that are still running, and no object is kept per message."""
+    view = discord.ui.View(timeout=None)
+    for item in items:
+        view.add_item(item)
+    view.stop()
+    return view
@@ -0,0 +1,200 @@
+# job_scheduler.py
+# Persistent delayed jobs (channel deletions) that survive restarts
+
+import discord
+from discord import app_commands
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict
+import config
+from capabilities import can
+from background import spawn
+from rest_scheduler import LANE_STATE
+from category_registry import registry
+from channel_pool import POOL_CHANNEL_PREFIX
+
+DELETE_CHANNEL = "delete_channel"
+
+
+class JobScheduler:
+    """Runs jobs stored in the `scheduled_jobs` table when they come due.
+
+    The loop asks the (status, due_at) index for the earliest pending job
+    and sleeps until then - or until a new job is scheduled - with
+    JOB_POLL_INTERVAL as an upper bound. At most JOB_MAX_CONCURRENCY jobs
+    run at once. A job is claimed (pending -> running) before it starts;
+    jobs still running when the bot stopped are re-queued on startup.
+    Failures are retried with exponential backoff up to JOB_MAX_ATTEMPTS."""
+    def __init__(self, bot):
+        self.bot = bot
+        self.handlers: Dict[str, Callable[..., Awaitable]] = {DELETE_CHANNEL: delete_channel_job}
+        self.running = set()  # job ids in flight
+        self.task = None
+        self._wake = None
+
+    def register(self, kind: str, handler: Callable[..., Awaitable]):
+        """handler(bot, payload) - raise to have the job retried"""
+        self.handlers[kind] = handler
+
+    async def schedule(self, kind: str, payload: dict, delay: float = 0, key: str = None):
+        """Persist a job to run in `delay` seconds. Jobs sharing a pending `key` collapse
+        into one, due at the earlier time."""
+        await self.bot.db.schedule_job(kind, payload, time.time() + delay, key)
+        if self._wake:
+            self._wake.set()
+
+    async def delete_channel_later(self, channel, delay: float, reason: str):
+        await self.schedule(
+            DELETE_CHANNEL,
+            {"channel_id": channel.id, "reason": reason},
+            delay=delay,
+            key=f"{DELETE_CHANNEL}:{channel.id}"
+        )
+
+    # ---------- running ----------
+    def start(self):
+        if self.task and not self.task.done():
+            return
+        self._wake = asyncio.Event()
+        self.task = spawn(self._run(), name="job-scheduler")
+
+    async def _run(self):
+        try:
+            resumed = await self.bot.db.requeue_running_jobs()
+            if resumed:
+                print(f"✅ Re-queued {resumed} interrupted job(s)")
+            await self.bot.db.purge_jobs(time.time() - config.JOB_HISTORY_DAYS * 86400)
+        except Exception as e:
+            print(f"⚠️ Job scheduler startup cleanup failed: {e}")
+
+        while True:
+            self._wake.clear()
+            timeout = config.JOB_POLL_INTERVAL
+            try:
+                await self._dispatch_due()
+                if len(self.running) >= config.JOB_MAX_CONCURRENCY:
+                    timeout = None  # a finishing job wakes the loop
+                else:
+                    next_due = await self.bot.db.next_job_due()
+                    if next_due is not None:
+                        timeout = min(timeout, max(0.0, next_due - time.time()))
+            except Exception as e:
+                print(f"⚠️ Job scheduler pass failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch_due(self):
+        free = config.JOB_MAX_CONCURRENCY - len(self.running)
+        if free <= 0:
+            return
+        for job in await self.bot.db.get_due_jobs(time.time(), free):
+            if job["id"] in self.running or not await self.bot.db.claim_job(job["id"]):
+                continue
+            self.running.add(job["id"])
+            spawn(self._execute(job), name=f"job-{job['kind']}-{job['id']}", detached=True)
+
+    async def _execute(self, job: dict):
+        try:
+            handler = self.handlers.get(job["kind"])
+            if handler is None:
+                await self.bot.db.finish_job(job["id"], "failed", f"no handler for {job['kind']}")
+                return
+            try:
+                await handler(self.bot, job["payload"])
+            except Exception as e:
+                attempts = job["attempts"] + 1
+                print(f"⚠️ Job {job['kind']} #{job['id']} failed (attempt {attempts}): {e}")
+                if attempts < config.JOB_MAX_ATTEMPTS:
+                    retry_at = time.time() + config.JOB_RETRY_DELAY * 2 ** (attempts - 1)
+                    await self.bot.db.retry_job(job["id"], retry_at, str(e))
+                else:
+                    await self.bot.db.finish_job(job["id"], "failed", str(e))
+            else:
+                await self.bot.db.finish_job(job["id"])
+        except Exception as e:
+            print(f"⚠️ Could not record result of job #{job['id']}: {e}")
+        finally:
+            self.running.discard(job["id"])
+            self._wake.set()
+
+
+async def delete_channel_job(bot, payload: dict):
+    """Delete a ticket/verification/class channel - unless it hosts an open ticket again"""
+    from tickets import wait_for_transcript
+
+    channel_id = payload["channel_id"]
+    channel = bot.get_channel(channel_id)
+    if channel is None:
+        try:
+            channel = await bot.fetch_channel(channel_id)
+        except discord.NotFound:
+            return  # already gone
+
+    ticket = await bot.db.get_ticket(channel_id)
+    if ticket and not ticket.get("is_closed", False):
+        print(f"ℹ️ Not deleting {channel.name} - it has an open ticket")
+        return
+
+    # The transcript reads channel history, so let it finish first
+    await wait_for_transcript(channel_id)
+    try:
+        await bot.rest.run(
+            LANE_STATE,
+            lambda: channel.delete(reason=payload.get("reason")),
+            bucket=("channel", channel_id)
+        )
+    except discord.NotFound:
+        pass
+
+
+async def setup_job_scheduler(bot):
+    """Setup job queue commands"""
+
+    @bot.tree.command(name="cleanup_closed_tickets", description="Schedule deletion of leftover closed ticket channels (Admin only)")
+    @app_commands.describe(dry_run="Only list what would be deleted")
+    async def cleanup_closed_tickets(interaction: discord.Interaction, dry_run: bool = False):
+        """Queue deletions for ticket channels that no longer have an open ticket"""
+        if not can(interaction.user, "admin_commands"):
+            await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        open_ids = {t["channel_id"] for t in await bot.db.get_all_tickets() if not t.get("is_closed", False)}
+        prefixes = tuple(f"{registry.prefix(name)}-" for name in registry.names())
+        leftovers = [
+            channel
+            for category in bot.category_allocator.categories("TICKETS_CATEGORY", interaction.guild)
+            for channel in category.text_channels
+            if channel.id not in open_ids
+            and channel.name.startswith(prefixes)
+            and not channel.name.startswith(POOL_CHANNEL_PREFIX)
+        ]
+
+        if dry_run or not leftovers:
+            names = "\n".join(channel.mention for channel in leftovers[:30])
+            more = f"\n…and {len(leftovers) - 30} more" if len(leftovers) > 30 else ""
+            await interaction.followup.send(
+                f"🧹 {len(leftovers)} closed ticket channel(s) found.\n{names}{more}" if leftovers
+                else "✅ No leftover closed ticket channels.",
+                ephemeral=True
+            )
+            return
+
+        # Spaced out so the deletions trickle through the state lane
+        for i, channel in enumerate(leftovers):
+            await bot.jobs.delete_channel_later(
+                channel, delay=i * config.JOB_CLEANUP_SPACING, reason=f"Closed ticket cleanup by {interaction.user}"
+            )
+
+        counts = await bot.db.get_job_counts()
+        await interaction.followup.send(
+            f"🧹 Scheduled deletion of **{len(leftovers)}** closed ticket channel(s) "
+            f"(done in about {int(len(leftovers) * config.JOB_CLEANUP_SPACING)}s).\n"
+            f"Job queue: {counts.get('pending', 0)} pending • {counts.get('running', 0)} running • "
+            f"{counts.get('failed', 0)} failed",
+            ephemeral=True
+        )
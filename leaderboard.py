@@ -4,53 +4,71 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import re
 from typing import Optional
 import config
+from category_registry import registry
+from dynamic_views import stateless_view
+from perf import timed
 
 
-class LeaderboardView(discord.ui.View):
-    """Persistent pagination view for leaderboard"""
-    def __init__(self, page: int = 1):
-        super().__init__(timeout=None)  # Persistent view
+PAGE_BUTTONS = {"prev": "◀️", "refresh": "🔄", "next": "▶️"}
+PAGE_STEP = {"prev": -1, "refresh": 0, "next": 1}
+
+
+class LeaderboardPageButton(discord.ui.DynamicItem[discord.ui.Button], template=r"lb:(?P<action>prev|refresh|next):(?P<page>\d+)"):
+    """Pagination button - the page it was rendered on is part of its custom_id,
+    so every leaderboard message pages on its own, across restarts"""
+    def __init__(self, action: str, page: int):
+        super().__init__(discord.ui.Button(
+            emoji=PAGE_BUTTONS[action],
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"lb:{action}:{page}"
+        ))
+        self.action = action
         self.page = page
-        self.per_page = config.LEADERBOARD_PER_PAGE
-    
-    async def update_embed(self, interaction: discord.Interaction):
-        """Update leaderboard embed"""
-        bot = interaction.client
-        embed = await create_leaderboard_embed(bot, self.page, self.per_page)
-        
-        # Create new view with updated page
-        new_view = LeaderboardView(self.page)
-        await interaction.response.edit_message(embed=embed, view=new_view)
-    
-    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary, custom_id="lb_prev_persistent")
-    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Go to previous page"""
-        if self.page > 1:
-            self.page -= 1
-            await self.update_embed(interaction)
-        else:
-            await interaction.response.defer()
-    
-    @discord.ui.button(emoji="🔄", style=discord.ButtonStyle.secondary, custom_id="lb_refresh_persistent")
-    async def refresh_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Refresh current page"""
-        await self.update_embed(interaction)
-    
-    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary, custom_id="lb_next_persistent")
-    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Go to next page"""
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["action"], int(match["page"]))
+
+    @timed("leaderboard.page")
+    async def callback(self, interaction: discord.Interaction):
+        """Go to the previous/next page or refresh this one"""
         bot = interaction.client
-        # Check if there are more pages
+        per_page = config.LEADERBOARD_PER_PAGE
         leaderboard = await bot.db.get_leaderboard()
-        total_pages = max(1, (len(leaderboard) + self.per_page - 1) // self.per_page)
-        
-        if self.page < total_pages:
-            self.page += 1
-            await self.update_embed(interaction)
-        else:
-            await interaction.response.defer()
+        total_pages = max(1, (len(leaderboard) + per_page - 1) // per_page)
+        page = max(1, min(self.page + PAGE_STEP[self.action], total_pages))
+
+        if page == self.page and self.action != "refresh":
+            await interaction.response.defer()  # already on the first/last page
+            return
+
+        embed = await create_leaderboard_embed(bot, page, per_page)
+        await interaction.response.edit_message(embed=embed, view=leaderboard_view(page))
+
+
+class LegacyLeaderboardButton(discord.ui.DynamicItem[discord.ui.Button], template=r"lb_(?P<action>prev|refresh|next)_persistent"):
+    """Buttons on leaderboards posted before the page moved into the custom_id.
+    The page is read back from the embed footer; the first click re-renders
+    the message with LeaderboardPageButtons."""
+    def __init__(self, action: str):
+        super().__init__(discord.ui.Button(
+            emoji=PAGE_BUTTONS[action],
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"lb_{action}_persistent"
+        ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        embeds = interaction.message.embeds if interaction.message else []
+        footer = re.search(r"Page (\d+)/", embeds[0].footer.text or "") if embeds else None
+        return LeaderboardPageButton(match["action"], int(footer.group(1)) if footer else 1)
+
+
+def leaderboard_view(page: int) -> discord.ui.View:
+    return stateless_view(*(LeaderboardPageButton(action, page) for action in PAGE_BUTTONS))
 
 
 async def create_leaderboard_embed(bot, page: int = 1, per_page: int = 10) -> discord.Embed:
@@ -99,11 +117,11 @@ async def setup_leaderboard(bot):
     """Setup leaderboard commands"""
     
     @bot.tree.command(name="leaderboard", description="Show the helper leaderboard")
+    @timed("/leaderboard")
     async def leaderboard(interaction: discord.Interaction):
         """Display leaderboard with pagination"""
         embed = await create_leaderboard_embed(bot, page=1)
-        view = LeaderboardView(page=1)
-        await interaction.response.send_message(embed=embed, view=view)
+        await interaction.response.send_message(embed=embed, view=leaderboard_view(1))
     
     @bot.tree.command(name="points", description="Check your points or another user's points")
     @app_commands.describe(user="User to check points for (optional)")
@@ -178,8 +196,8 @@ async def setup_leaderboard(bot):
         
         # Point Values
         point_values = "\n".join([
-            f"**{cat.replace(' Express', '')}:** {config.POINT_VALUES.get(cat, 0)} pts"
-            for cat in config.CATEGORIES
+            f"**{spec.label}:** {spec.points} pts"
+            for spec in map(registry.get, registry.names())
         ])
         embed.add_field(name="💰 Point Values", value=point_values, inline=False)
         
@@ -7,18 +7,24 @@ import os
 import asyncio
 from dotenv import load_dotenv
 from database import Database
+from search_index import TicketSearchIndex
+from channel_pool import ChannelPool
+from category_allocator import CategoryAllocator
+from matchmaking import Matchmaker
+from permission_templates import OverwriteTemplates
+from rest_scheduler import RestScheduler
+from ticket_events import TicketEventLog
+from demand_heatmap import DemandHeatmap
+from reconciler import TicketReconciler
+from ticket_reaper import TicketReaper
+from job_scheduler import JobScheduler
+from room_allocator import RoomAllocator
+import perf
+import webserver
 
 # Load environment variables
 load_dotenv()
 
-# Import webserver for uptime monitoring
-try:
-    import webserver
-    webserver.start()
-    print("✅ Webserver started for uptime monitoring")
-except Exception as e:
-    print(f"⚠️ Webserver not started: {e}")
-
 # Bot configuration
 TOKEN = os.getenv("DISCORD_BOT_TOKEN")
 if not TOKEN:
@@ -42,6 +48,54 @@ db = Database()
 # Store database in bot for access in modules
 bot.db = db
 
+# Handler latency split into DB / REST / local time (/perf)
+perf.install(bot)
+
+# Priority lanes for outbound REST calls (embed edits, notifications, logs)
+bot.rest = RestScheduler()
+
+# Local full-text index of closed tickets (/ticket_search)
+bot.search_index = TicketSearchIndex()
+
+# Role-based permission overwrites, compiled once per guild
+bot.overwrite_templates = OverwriteTemplates()
+
+# Spreads ticket channels over overflow categories
+bot.category_allocator = CategoryAllocator(bot)
+
+# Pre-created ticket channels, refilled in the background
+bot.channel_pool = ChannelPool(bot)
+
+# Helper queue that assigns open tickets (/queue)
+bot.matchmaker = Matchmaker(bot)
+
+# Batched ticket lifecycle log (/ticket_sla)
+bot.ticket_events = TicketEventLog(bot)
+
+# Cached hour-of-week demand matrices (/demand_heatmap)
+bot.demand_heatmap = DemandHeatmap(bot)
+
+# Retires tickets whose channel was deleted by hand
+bot.reconciler = TicketReconciler(bot)
+
+# Warns about and cancels idle tickets
+bot.reaper = TicketReaper(bot)
+
+# Persistent delayed jobs (channel deletions)
+bot.jobs = JobScheduler(bot)
+
+# Room numbers in use by open tickets
+bot.rooms = RoomAllocator(bot)
+
+
+@bot.event
+async def setup_hook():
+    """Runs once on the bot's loop before connecting - start health/metrics endpoints"""
+    try:
+        await webserver.start(bot)
+    except Exception as e:
+        print(f"⚠️ Webserver not started: {e}")
+
 
 @bot.event
 async def on_ready():
@@ -53,10 +107,24 @@ async def on_ready():
     await bot.db.init()
     print("✅ Database initialized")
 
+    # Compile ticket categories before the panel view is built from them
+    from category_registry import registry
+    try:
+        count = await registry.load(bot.db)
+        print(f"✅ Loaded {count} ticket categories")
+    except Exception as e:
+        print(f"⚠️ Using ticket categories from config: {e}")
+
+    try:
+        await bot.search_index.init()
+        print("✅ Ticket search index initialized")
+    except Exception as e:
+        print(f"⚠️ Ticket search index unavailable: {e}")
+
     # Import and register persistent views (CRITICAL)
-    from tickets import TicketView, TicketActionView, DeleteChannelView
+    from tickets import TicketView, TicketActionView, DeleteChannelView, BossSelectMenu, ServerSelectMenu, RepeatTicketButton
     from verification import VerificationView, VerificationActionView
-    from leaderboard import LeaderboardView
+    from leaderboard import LeaderboardPageButton, LegacyLeaderboardButton
     from apprentice_tickets import ApprenticeTicketView, ApprenticeTicketActionView
 
     bot.add_view(TicketView())
@@ -64,10 +132,12 @@ async def on_ready():
     bot.add_view(DeleteChannelView())
     bot.add_view(VerificationView())
     bot.add_view(VerificationActionView())
-    bot.add_view(LeaderboardView())
     bot.add_view(ApprenticeTicketView())
     bot.add_view(ApprenticeTicketActionView())
 
+    # Stateless components - their state is parsed from the custom_id on each click
+    bot.add_dynamic_items(LeaderboardPageButton, LegacyLeaderboardButton, BossSelectMenu, ServerSelectMenu, RepeatTicketButton)
+
     print("✅ Persistent views registered - Buttons will work after restarts!")
 
     # Setup all modules
@@ -78,6 +148,25 @@ async def on_ready():
     from stats import setup_stats
     from dumb_things import setup_dumb_things
     from apprentice_tickets import setup_apprentice_tickets
+    from search_index import setup_search
+    from permission_templates import setup_permission_templates
+    from category_registry import setup_category_registry
+    from rest_scheduler import setup_rest_scheduler
+    from perf import setup_perf
+    from matchmaking import setup_matchmaking
+    from ticket_events import setup_ticket_events
+    from demand_heatmap import setup_demand_heatmap
+    from reconciler import setup_reconciler
+    from ticket_reaper import setup_ticket_reaper
+    from job_scheduler import setup_job_scheduler
+    from capabilities import setup_capabilities
+    from room_allocator import setup_room_allocator
+
+    await setup_permission_templates(bot)
+    print("✅ Permission templates loaded")
+
+    # Before tickets - new tickets must not reuse an open ticket's room
+    await setup_room_allocator(bot)
 
     await setup_tickets(bot)
     print("✅ Ticket system loaded")
@@ -100,6 +189,44 @@ async def on_ready():
     await setup_dumb_things(bot)
     print("✅ Dumb things system loaded")
 
+    await setup_search(bot)
+    print("✅ Ticket search loaded")
+
+    await setup_category_registry(bot)
+    print("✅ Category registry loaded")
+
+    await setup_rest_scheduler(bot)
+    print("✅ REST scheduler loaded")
+
+    await setup_perf(bot)
+    print("✅ Performance stats loaded")
+
+    await setup_matchmaking(bot)
+    print("✅ Helper queue loaded")
+
+    await setup_ticket_events(bot)
+    print("✅ Ticket SLA report loaded")
+
+    await setup_demand_heatmap(bot)
+    print("✅ Demand heatmap loaded")
+
+    await setup_reconciler(bot)
+    print("✅ Ticket reconciler loaded")
+
+    await setup_ticket_reaper(bot)
+    print("✅ Idle ticket reaper loaded")
+
+    await setup_job_scheduler(bot)
+    print("✅ Job scheduler loaded")
+
+    await setup_capabilities(bot)
+    print("✅ Capability cache loaded")
+
+    bot.channel_pool.start()
+    bot.matchmaker.start()
+    bot.reaper.start()
+    bot.jobs.start()
+
     # Sync slash commands
     try:
         synced = await bot.tree.sync()
@@ -0,0 +1,285 @@
+# matchmaking.py
+# Helper queue that assigns queued helpers to open tickets
+
+import discord
+from discord import app_commands
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Optional, Tuple
+import config
+from background import spawn
+from category_registry import registry
+from rest_scheduler import LANE_NOTIFY
+
+ANY_CATEGORY = "*"
+
+
+class Matchmaker:
+    """Matches queued helpers to open tickets.
+
+    Tickets sit in one min-heap keyed by (opened_at - MATCHMAKING_SLOT_WEIGHT *
+    missing slots), so older and emptier tickets come first. Helpers sit in a
+    heap per category filter ("*" for any category) keyed by the time they
+    queued. Both use lazy invalidation: an entry is only valid while its
+    sequence number is the one stored in `tickets`/`helpers`, so updates and
+    removals are O(log n) pushes and stale entries are skipped when popped.
+    Matching passes only run while helpers are queued, so the ticket heap is
+    also rebuilt from `tickets` once stale entries outnumber live ones.
+
+    Matched helpers go through tickets.add_helper_to_ticket, the same checks
+    and side effects as the Join button."""
+    def __init__(self, bot):
+        self.bot = bot
+        self._seq = itertools.count()
+        self.ticket_heap = []          # (priority, seq, channel_id)
+        self.tickets = {}              # channel_id -> (seq, category, opened_at, priority)
+        self.helper_heaps = {}         # category or "*" -> [(queued_at, seq, helper_id)]
+        self.helpers = {}              # helper_id -> (seq, category or None, queued_at)
+        self.task = None
+        self._wake = None
+        self.matched = 0
+        self.match_wait_total = 0.0    # seconds from ticket open to each queued helper being matched
+
+    # ---------- tickets ----------
+    def ticket_opened(self, ticket: dict):
+        self.ticket_changed(ticket)
+
+    def ticket_changed(self, ticket: dict):
+        """(Re)queue a ticket with its current number of missing helpers"""
+        channel_id = ticket["channel_id"]
+        missing = registry.slots(ticket["category"]) - len(ticket["helpers"])
+        if ticket.get("is_closed") or missing <= 0:
+            self.tickets.pop(channel_id, None)
+            return
+
+        known = self.tickets.get(channel_id)
+        opened_at = known[2] if known else discord.utils.snowflake_time(
+            ticket.get("embed_message_id") or channel_id
+        ).timestamp()
+        seq = next(self._seq)
+        priority = opened_at - config.MATCHMAKING_SLOT_WEIGHT * missing
+        self.tickets[channel_id] = (seq, ticket["category"], opened_at, priority)
+        heapq.heappush(self.ticket_heap, (priority, seq, channel_id))
+        self.wake()
+
+    def ticket_closed(self, channel_id: int):
+        self.tickets.pop(channel_id, None)
+
+    def _compact_tickets(self):
+        """Rebuild the ticket heap from the live entries once stale ones dominate"""
+        if len(self.ticket_heap) > 2 * len(self.tickets) + 64:
+            self.ticket_heap = [(priority, seq, channel_id) for channel_id, (seq, _, _, priority) in self.tickets.items()]
+            heapq.heapify(self.ticket_heap)
+
+    def _pop_ticket(self):
+        while self.ticket_heap:
+            entry = heapq.heappop(self.ticket_heap)
+            known = self.tickets.get(entry[2])
+            if known and known[0] == entry[1]:
+                return entry
+        return None
+
+    # ---------- helpers ----------
+    def enqueue_helper(self, helper_id: int, category: Optional[str] = None) -> Tuple[int, int]:
+        """Queue (or re-queue with a new filter) a helper.
+        Returns (position, helpers waiting) in the queue for their own filter."""
+        known = self.helpers.get(helper_id)
+        queued_at = known[2] if known else time.time()  # changing the filter keeps your place
+        seq = next(self._seq)
+        self.helpers[helper_id] = (seq, category, queued_at)
+        key = category or ANY_CATEGORY
+        self._push_helper(key, (queued_at, seq, helper_id))
+        self.wake()
+
+        # Live, unexpired entries of this filter's heap only
+        now = time.time()
+        waiting = [
+            other_at
+            for other_at, other_seq, other_id in self.helper_heaps[key]
+            if self.helpers.get(other_id, (None,))[0] == other_seq
+            and now - other_at <= config.MATCHMAKING_QUEUE_TTL
+        ]
+        return sum(1 for other_at in waiting if other_at <= queued_at), len(waiting)
+
+    def helper_placed(self, helper_id: int):
+        """Forget a helper (joined a ticket, left the queue)"""
+        return self.helpers.pop(helper_id, None) is not None
+
+    def _push_helper(self, key: str, entry: tuple):
+        heapq.heappush(self.helper_heaps.setdefault(key, []), entry)
+
+    def _peek_helper(self, key: str):
+        heap = self.helper_heaps.get(key)
+        now = time.time()
+        while heap:
+            queued_at, seq, helper_id = heap[0]
+            known = self.helpers.get(helper_id)
+            if known and known[0] == seq:
+                if now - queued_at <= config.MATCHMAKING_QUEUE_TTL:
+                    return heap[0]
+                del self.helpers[helper_id]  # queued too long - assume they left
+            heapq.heappop(heap)
+        return None
+
+    def _pop_helper(self, category: str, exclude: set):
+        """Longest-waiting helper for a category (own filter or "any"), skipping `exclude`"""
+        skipped = []
+        found = None
+        while found is None:
+            candidates = [
+                (entry, key)
+                for key in (category, ANY_CATEGORY)
+                for entry in [self._peek_helper(key)]
+                if entry
+            ]
+            if not candidates:
+                break
+            entry, key = min(candidates)
+            heapq.heappop(self.helper_heaps[key])
+            if entry[2] in exclude:
+                skipped.append((key, entry))
+            else:
+                found = (key, entry)
+        for key, entry in skipped:
+            self._push_helper(key, entry)
+        return found
+
+    # ---------- matching ----------
+    def start(self):
+        if self.task and not self.task.done():
+            return
+        self._wake = asyncio.Event()
+        self.task = spawn(self._run(), name="matchmaker")
+
+    def wake(self):
+        if self._wake:
+            self._wake.set()
+
+    async def load(self):
+        """Queue every open ticket (startup)"""
+        for ticket in await self.bot.db.get_all_tickets():
+            self.ticket_changed(ticket)
+
+    async def _run(self):
+        await self.load()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=config.MATCHMAKING_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            self._compact_tickets()
+            if not self.helpers or not self.tickets:
+                continue
+            try:
+                await self._match_pass()
+            except Exception as e:
+                print(f"⚠️ Matchmaking pass failed: {e}")
+
+    async def _match_pass(self):
+        from tickets import add_helper_to_ticket, JOINED, JOIN_COOLDOWN, JOIN_HELPER_REFUSED
+
+        held_tickets = []   # tickets nobody in the queue can take right now
+        held_helpers = []   # (key, entry) helpers on join cooldown
+        try:
+            while self.helpers:
+                entry = self._pop_ticket()
+                if entry is None:
+                    break
+                channel_id = entry[2]
+                ticket = await self.bot.db.get_ticket(channel_id)
+                channel = self.bot.get_channel(channel_id)
+                if not ticket or ticket.get("is_closed") or not channel:
+                    self.tickets.pop(channel_id, None)
+                    continue
+
+                exclude = {ticket["requestor_id"], *ticket["helpers"]}
+                found = self._pop_helper(ticket["category"], exclude)
+                if found is None:
+                    held_tickets.append(entry)
+                    continue
+
+                key, helper_entry = found
+                opened_at = self.tickets[channel_id][2]
+                member = channel.guild.get_member(helper_entry[2])
+                if not member:
+                    self.helper_placed(helper_entry[2])
+                    heapq.heappush(self.ticket_heap, entry)
+                    continue
+
+                outcome, message = await add_helper_to_ticket(self.bot, channel, member)
+                if outcome == JOINED:
+                    # add_helper_to_ticket re-queued the ticket if it still has free slots
+                    self.matched += 1
+                    self.match_wait_total += time.time() - opened_at
+                    self._notify(member, f"🎯 **Matched!** You've been added to {channel.mention}.\n\n{message}")
+                elif outcome == JOIN_COOLDOWN:
+                    held_helpers.append((key, helper_entry))
+                    heapq.heappush(self.ticket_heap, entry)
+                elif outcome == JOIN_HELPER_REFUSED:
+                    self.helper_placed(member.id)
+                    self._notify(member, f"🚫 You were removed from the helper queue.\n{message}")
+                    heapq.heappush(self.ticket_heap, entry)
+                else:
+                    # The ticket itself can't take helpers (closed/full) - drop it, keep the helper
+                    self.tickets.pop(channel_id, None)
+                    held_helpers.append((key, helper_entry))
+        finally:
+            for entry in held_tickets:
+                heapq.heappush(self.ticket_heap, entry)
+            for key, helper_entry in held_helpers:
+                self._push_helper(key, helper_entry)
+
+    def _notify(self, member: discord.Member, text: str):
+        self.bot.rest.submit(LANE_NOTIFY, lambda: member.send(text), bucket=("dm", member.id))
+
+    def snapshot(self) -> dict:
+        return {
+            "helpers": len(self.helpers),
+            "tickets": len(self.tickets),
+            "matched": self.matched,
+            "avg_wait_seconds": self.match_wait_total / self.matched if self.matched else 0.0,
+        }
+
+
+async def setup_matchmaking(bot):
+    """Setup helper queue commands"""
+
+    async def category_autocomplete(interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in registry.names()
+            if current.lower() in name.lower()
+        ][:25]
+
+    @bot.tree.command(name="queue", description="Join the helper queue and get matched to open tickets")
+    @app_commands.describe(category="Only match me with this ticket category (optional)")
+    @app_commands.autocomplete(category=category_autocomplete)
+    async def queue(interaction: discord.Interaction, category: Optional[str] = None):
+        """Queue for automatic ticket assignment"""
+        helper_role = interaction.guild.get_role(config.ROLE_IDS.get("HELPER"))
+        if helper_role and helper_role not in interaction.user.roles:
+            await interaction.response.send_message("❌ You need the Helper role to queue for tickets!", ephemeral=True)
+            return
+
+        if category and not registry.get(category):
+            await interaction.response.send_message(f"❌ Unknown category: {category}", ephemeral=True)
+            return
+
+        position, waiting = bot.matchmaker.enqueue_helper(interaction.user.id, category)
+        await interaction.response.send_message(
+            f"✅ You're in the helper queue{f' for **{category}**' if category else ''} "
+            f"(position **{position}** of {waiting}).\n"
+            "You'll get a DM with the room info as soon as you're matched. Use `/queue_leave` to leave.",
+            ephemeral=True
+        )
+
+    @bot.tree.command(name="queue_leave", description="Leave the helper queue")
+    async def queue_leave(interaction: discord.Interaction):
+        """Leave the matchmaking queue"""
+        if bot.matchmaker.helper_placed(interaction.user.id):
+            await interaction.response.send_message("✅ You left the helper queue.", ephemeral=True)
+        else:
+            await interaction.response.send_message("❌ You're not in the helper queue.", ephemeral=True)
@@ -0,0 +1,309 @@
+# perf.py
+# Per-handler latency histograms split into database, Discord REST and local time
+
+import discord
+from discord import app_commands
+import asyncio
+import bisect
+import contextvars
+import functools
+import logging
+import re
+import time
+from collections import defaultdict, deque
+import config
+from capabilities import can
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# The handler record the running task is charging time to (None outside handlers)
+_current = contextvars.ContextVar("perf_current", default=None)
+
+
+class _Record:
+    """Time spent by one handler invocation"""
+    __slots__ = ("db", "rest", "db_calls", "rest_calls", "done")
+
+    def __init__(self):
+        self.done = False
+        self.db = 0.0
+        self.rest = 0.0
+        self.db_calls = defaultdict(float)
+        self.rest_calls = defaultdict(float)
+
+
+class HandlerStats:
+    """Aggregated latency for one handler"""
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0.0
+        self.db = 0.0
+        self.rest = 0.0
+        self.max = 0.0
+        self.db_calls = defaultdict(float)    # db method -> seconds
+        self.rest_calls = defaultdict(float)  # route -> seconds
+
+    def add(self, elapsed: float, record: _Record, failed: bool):
+        self.count += 1
+        self.errors += failed
+        self.histogram[bisect.bisect_left(BUCKETS_MS, elapsed * 1000)] += 1
+        self.total += elapsed
+        self.db += record.db
+        self.rest += record.rest
+        self.max = max(self.max, elapsed)
+        for name, seconds in record.db_calls.items():
+            self.db_calls[name] += seconds
+        for route, seconds in record.rest_calls.items():
+            self.rest_calls[route] += seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the q-th percentile"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.histogram):
+            seen += n
+            if seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max * 1000
+        return self.max * 1000
+
+
+handlers = defaultdict(HandlerStats)
+rate_limits = defaultdict(int)  # route -> 429 count
+slowest = deque(maxlen=config.PERF_SLOW_SAMPLES)  # (when, handler, total, db, rest, user)
+
+
+def timed(name: str):
+    """Record latency for an async handler (view callback, modal submit, slash command).
+    Put it directly above the function, under the discord.py decorators."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            record = _Record()
+            token = _current.set(record)
+            started = time.perf_counter()
+            failed = False
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                record.done = True  # background tasks spawned by the handler stop charging it
+                _current.reset(token)
+                handlers[name].add(elapsed, record, failed)
+                if elapsed * 1000 >= config.PERF_SLOW_MS:
+                    interaction = next((a for a in args if isinstance(a, discord.Interaction)), None)
+                    slowest.append((time.time(), name, elapsed, record.db, record.rest,
+                                    interaction.user.id if interaction else None))
+        return wrapper
+    return decorator
+
+
+def charge(kind: str, key: str, elapsed: float):
+    """Add "db" or "rest" time to the handler running in this context"""
+    record = _current.get()
+    if record is None or record.done:
+        return
+    if kind == "db":
+        record.db += elapsed
+        record.db_calls[key] += elapsed
+    else:
+        record.rest += elapsed
+        record.rest_calls[key] += elapsed
+
+
+# Set while a Database method runs, so methods calling each other are charged once
+_in_db = contextvars.ContextVar("perf_in_db", default=False)
+
+
+def _wrap_db_method(name, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        if _in_db.get():
+            return await method(*args, **kwargs)
+        token = _in_db.set(True)
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _in_db.reset(token)
+            charge("db", name, time.perf_counter() - started)
+    return wrapper
+
+
+def _route_key(route) -> str:
+    return f"{getattr(route, 'method', '?')} {getattr(route, 'path', route)}"
+
+
+def _wrap_request(request):
+    @functools.wraps(request)
+    async def wrapper(route, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await request(route, *args, **kwargs)
+        finally:
+            charge("rest", _route_key(route), time.perf_counter() - started)
+    return wrapper
+
+
+_ID_RE = re.compile(r"/\d{15,}")
+_TOKEN_RE = re.compile(r"/(interactions|webhooks)/\{id\}/[^/?]+")
+
+
+def normalize_url(url: str) -> str:
+    """https://discord.com/api/v10/channels/123/messages -> /channels/{id}/messages"""
+    path = str(url).split("/api/v", 1)[-1]
+    path = path[path.find("/"):] if "/" in path else path
+    path = _ID_RE.sub("/{id}", path)
+    return _TOKEN_RE.sub(r"/\1/{id}/{token}", path)
+
+
+class RateLimitCounter(logging.Handler):
+    """Counts the 429 warnings discord.py logs, per route"""
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = str(record.msg)
+            if "rate limit" not in message:
+                return
+            args = record.args if isinstance(record.args, tuple) else ()
+            if len(args) >= 2 and isinstance(args[0], str) and args[0].isupper():
+                route = f"{args[0]} {normalize_url(args[1])}"
+            else:
+                route = record.name
+            rate_limits[route] += 1
+        except Exception:
+            pass
+
+
+def install(bot):
+    """Hook the database, the HTTP client and the interaction webhook adapter"""
+    db = bot.db
+    for name in dir(type(db)):
+        if name.startswith("_"):
+            continue
+        method = getattr(db, name)
+        if asyncio.iscoroutinefunction(method):
+            setattr(db, name, _wrap_db_method(name, method))
+
+    bot.http.request = _wrap_request(bot.http.request)
+
+    # Interaction responses/followups go through the webhook adapter, not bot.http
+    try:
+        from discord.webhook.async_ import async_context
+        adapter = async_context.get()
+        adapter.request = _wrap_request(adapter.request)
+    except Exception as e:
+        print(f"⚠️ Interaction REST timing unavailable: {e}")
+
+    counter = RateLimitCounter(level=logging.WARNING)
+    for logger_name in ("discord.http", "discord.webhook.async_"):
+        logging.getLogger(logger_name).addHandler(counter)
+
+
+def reset():
+    handlers.clear()
+    rate_limits.clear()
+    slowest.clear()
+
+
+def _top(calls: dict, limit: int = 3) -> str:
+    ranked = sorted(calls.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return ", ".join(f"`{key}` {seconds * 1000:.0f}ms" for key, seconds in ranked) or "-"
+
+
+async def setup_perf(bot):
+    """Setup performance stats command"""
+
+    async def handler_autocomplete(interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in sorted(handlers)
+            if current.lower() in name.lower()
+        ][:25]
+
+    @bot.tree.command(name="perf", description="Show handler latency stats (Admin only)")
+    @app_commands.describe(handler="Show the breakdown for one handler", reset_stats="Clear all collected stats")
+    @app_commands.autocomplete(handler=handler_autocomplete)
+    async def perf(interaction: discord.Interaction, handler: str = None, reset_stats: bool = False):
+        """Latency histograms per handler, split into DB / REST / local time"""
+        if not can(interaction.user, "admin_commands"):
+            await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+            return
+
+        if reset_stats:
+            reset()
+            await interaction.response.send_message("✅ Performance stats cleared.", ephemeral=True)
+            return
+
+        if handler:
+            stats = handlers.get(handler)
+            if not stats:
+                await interaction.response.send_message(f"❌ No data for `{handler}`.", ephemeral=True)
+                return
+
+            local = max(0.0, stats.total - stats.db - stats.rest)
+            embed = discord.Embed(
+                title=f"⏱️ {handler}",
+                description=(
+                    f"**Calls:** {stats.count:,} • **Errors:** {stats.errors:,}\n"
+                    f"**p50/p90/p99:** {stats.percentile(0.5):.0f} / {stats.percentile(0.9):.0f} / "
+                    f"{stats.percentile(0.99):.0f} ms • **Max:** {stats.max * 1000:.0f} ms\n"
+                    f"**Avg split:** DB {stats.db / stats.count * 1000:.0f} ms • "
+                    f"REST {stats.rest / stats.count * 1000:.0f} ms • "
+                    f"Local {local / stats.count * 1000:.0f} ms"
+                ),
+                color=config.COLORS["PRIMARY"]
+            )
+            histogram = "\n".join(
+                f"≤{BUCKETS_MS[i] if i < len(BUCKETS_MS) else '∞'} ms: {n:,}"
+                for i, n in enumerate(stats.histogram) if n
+            )
+            embed.add_field(name="📊 Histogram", value=histogram or "-", inline=False)
+            embed.add_field(name="🗄️ Slowest DB calls (total)", value=_top(stats.db_calls), inline=False)
+            embed.add_field(name="🌐 Slowest REST routes (total)", value=_top(stats.rest_calls), inline=False)
+
+            samples = [s for s in slowest if s[1] == handler][-5:]
+            if samples:
+                embed.add_field(
+                    name=f"🐢 Recent slow calls (≥{config.PERF_SLOW_MS} ms)",
+                    value="\n".join(
+                        f"<t:{int(when)}:T> {total * 1000:.0f} ms (DB {db * 1000:.0f} / REST {rest * 1000:.0f})"
+                        + (f" <@{user_id}>" if user_id else "")
+                        for when, _, total, db, rest, user_id in samples
+                    ),
+                    inline=False
+                )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        embed = discord.Embed(title="⏱️ Handler Latency", color=config.COLORS["PRIMARY"])
+        ranked = sorted(handlers.items(), key=lambda item: item[1].percentile(0.9), reverse=True)
+        lines = []
+        for name, stats in ranked[:20]:
+            local = max(0.0, stats.total - stats.db - stats.rest)
+            lines.append(
+                f"`{name}` ×{stats.count:,} • p50 {stats.percentile(0.5):.0f} / p90 {stats.percentile(0.9):.0f} ms • "
+                f"DB {stats.db / stats.total * 100 if stats.total else 0:.0f}% "
+                f"REST {stats.rest / stats.total * 100 if stats.total else 0:.0f}% "
+                f"local {local / stats.total * 100 if stats.total else 0:.0f}%"
+            )
+        embed.description = "\n".join(lines) or "*No handler calls recorded yet.*"
+
+        if rate_limits:
+            embed.add_field(
+                name="🚦 429s per route",
+                value="\n".join(
+                    f"`{route}`: {count:,}"
+                    for route, count in sorted(rate_limits.items(), key=lambda item: item[1], reverse=True)[:10]
+                ),
+                inline=False
+            )
+        embed.set_footer(text="Use /perf handler:<name> for the breakdown of one handler")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
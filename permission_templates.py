@@ -0,0 +1,115 @@
+# permission_templates.py
+# Per-guild cache of the role-based permission overwrite sets used by ticket channels
+
+import discord
+from typing import Dict, Optional
+import config
+
+# Role access shared by the open ticket/verification/class templates
+ROLE_ACCESS = dict(view_channel=True, send_messages=True)
+
+# Closed tickets: staff keep full access, everyone else is locked out
+CLOSED_MANAGER_ACCESS = dict(
+    view_channel=True,
+    send_messages=True,
+    read_message_history=True,
+    manage_channels=True,
+    manage_permissions=True
+)
+CLOSED_OFFICER_ACCESS = dict(view_channel=True, send_messages=True, read_message_history=True)
+BLOCKED = discord.PermissionOverwrite(view_channel=False, send_messages=False, read_message_history=False)
+
+# Template name -> [(ROLE_IDS key, overwrite kwargs)]
+TEMPLATE_ROLES = {
+    "ticket_open": [
+        ("ADMIN", ROLE_ACCESS),
+        ("STAFF", ROLE_ACCESS),
+        ("OFFICER", ROLE_ACCESS),
+        ("HELPER", ROLE_ACCESS),
+    ],
+    "ticket_closed": [
+        ("ADMIN", CLOSED_MANAGER_ACCESS),
+        ("STAFF", CLOSED_MANAGER_ACCESS),
+        ("OFFICER", CLOSED_OFFICER_ACCESS),
+        ("HELPER", None),  # None = blocked
+    ],
+    "verification": [
+        ("ADMIN", ROLE_ACCESS),
+        ("STAFF", ROLE_ACCESS),
+        ("OFFICER", ROLE_ACCESS),
+    ],
+    "class": [
+        ("APPRENTICE", ROLE_ACCESS),
+    ],
+    "pool": [],
+}
+
+
+class OverwriteTemplates:
+    """Compiles each template's role overwrites once per guild.
+
+    The compiled sets hold only guild-wide targets (@everyone, the bot and
+    roles); per-ticket members (opener, helpers) are layered on top by the
+    helpers below. A guild's cache is dropped whenever one of its roles is
+    created, deleted or updated, so the next ticket recompiles it."""
+    def __init__(self):
+        self._cache: Dict[int, Dict[str, dict]] = {}
+
+    def invalidate(self, guild_id: Optional[int] = None):
+        if guild_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(guild_id, None)
+
+    def _compile(self, guild: discord.Guild) -> Dict[str, dict]:
+        compiled = {}
+        for name, roles in TEMPLATE_ROLES.items():
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(view_channel=False),
+                guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+            }
+            if name == "pool":
+                # Hidden pre-created channels - the bot renames/re-permissions them on claim
+                overwrites[guild.me] = discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_channels=True)
+
+            for role_key, access in roles:
+                role = guild.get_role(config.ROLE_IDS.get(role_key)) if config.ROLE_IDS.get(role_key) else None
+                if role:
+                    overwrites[role] = discord.PermissionOverwrite(**access) if access else BLOCKED
+            compiled[name] = overwrites
+        return compiled
+
+    def get(self, guild: discord.Guild, name: str) -> dict:
+        """A fresh copy of a compiled template, safe for the caller to extend"""
+        templates = self._cache.get(guild.id)
+        if templates is None:
+            templates = self._cache[guild.id] = self._compile(guild)
+        return dict(templates[name])
+
+    def with_opener(self, guild: discord.Guild, name: str, opener: discord.Member) -> dict:
+        """Template plus read/write access for the member opening the ticket"""
+        overwrites = self.get(guild, name)
+        overwrites[opener] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+        return overwrites
+
+    def ticket_closed(self, guild: discord.Guild, ticket: dict, is_member_staff) -> dict:
+        """Closed-ticket template plus a block for the requestor and helpers
+        (staff members are skipped - they keep access through their roles)"""
+        overwrites = self.get(guild, "ticket_closed")
+        for user_id in [ticket["requestor_id"], *ticket["helpers"]]:
+            member = guild.get_member(user_id)
+            if member and not is_member_staff(member):
+                overwrites[member] = BLOCKED
+        return overwrites
+
+    async def on_role_changed(self, role: discord.Role, *args):
+        """Listener for role create/delete/update"""
+        self.invalidate(role.guild.id)
+
+
+async def setup_permission_templates(bot):
+    """Drop a guild's compiled templates when its roles change"""
+    listener = bot.overwrite_templates.on_role_changed
+    for event in ("on_guild_role_create", "on_guild_role_delete", "on_guild_role_update"):
+        if listener not in bot.extra_events.get(event, []):
+            bot.add_listener(listener, event)
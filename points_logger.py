@@ -5,6 +5,7 @@ import discord
 from discord import app_commands
 import config
 from datetime import datetime
+from rest_scheduler import LANE_LOG
 
 LOG_CHANNEL_ID = 1451319266941997279
 
@@ -43,7 +44,7 @@ async def log_points_added(bot, target_user_id: int, admin_id: int, amount: int,
         )
         embed.add_field(name="📊 Top 10 Leaderboard", value=leaderboard_preview, inline=False)
         
-        await channel.send(embed=embed)
+        bot.rest.send(channel, embed=embed, lane=LANE_LOG)
     except Exception as e:
         print(f"❌ Error logging points_add: {e}")
 
@@ -65,7 +66,7 @@ async def log_points_removed(bot, target_user_id: int, admin_id: int, amount: in
         )
         embed.add_field(name="📊 Top 10 Leaderboard", value=leaderboard_preview, inline=False)
         
-        await channel.send(embed=embed)
+        bot.rest.send(channel, embed=embed, lane=LANE_LOG)
     except Exception as e:
         print(f"❌ Error logging points_remove: {e}")
 
@@ -87,7 +88,7 @@ async def log_points_set(bot, target_user_id: int, admin_id: int, new_total: int
         )
         embed.add_field(name="📊 Top 10 Leaderboard", value=leaderboard_preview, inline=False)
         
-        await channel.send(embed=embed)
+        bot.rest.send(channel, embed=embed, lane=LANE_LOG)
     except Exception as e:
         print(f"❌ Error logging points_set: {e}")
 
@@ -107,7 +108,7 @@ async def log_points_reset(bot, admin_id: int):
         )
         embed.add_field(name="📊 Leaderboard Preview", value="*All reset to 0*", inline=False)
         
-        await channel.send(embed=embed)
+        bot.rest.send(channel, embed=embed, lane=LANE_LOG)
     except Exception as e:
         print(f"❌ Error logging points_reset: {e}")
 
@@ -129,7 +130,7 @@ async def log_user_deleted(bot, user_id: int, admin_id: int):
         )
         embed.add_field(name="📊 Top 10 Leaderboard", value=leaderboard_preview, inline=False)
         
-        await channel.send(embed=embed)
+        bot.rest.send(channel, embed=embed, lane=LANE_LOG)
     except Exception as e:
         print(f"❌ Error logging user_deleted: {e}")
 
@@ -165,7 +166,7 @@ async def log_member_left(bot, member_id: int, member_name: str):
             inline=False
         )
 
-        await channel.send(embed=embed)
+        bot.rest.send(channel, embed=embed, lane=LANE_LOG)
 
     except Exception as e:
         print(f"❌ Error logging member_left: {e}")
\ No newline at end of file
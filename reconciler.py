@@ -0,0 +1,89 @@
+# reconciler.py
+# Retires active tickets whose channel or thread was deleted outside the bot
+
+import discord
+from typing import Optional
+from background import spawn
+
+
+class TicketReconciler:
+    """Keeps `active_tickets` in step with the guild's channels.
+
+    On startup every active ticket is checked against the channel and
+    thread caches in one pass; only tickets missing from the cache cost a
+    fetch, to tell an archived thread from a deleted one. After that,
+    channel and thread delete events retire tickets as they disappear, so
+    the join path can trust the database without checking channels."""
+    def __init__(self, bot):
+        self.bot = bot
+        self.retired = 0
+
+    async def channel_exists(self, channel_id: int) -> Optional[bool]:
+        """True/False, or None if Discord couldn't say (the ticket is kept)"""
+        if self.bot.get_channel(channel_id):
+            return True
+        try:
+            await self.bot.fetch_channel(channel_id)
+            return True
+        except discord.NotFound:
+            return False
+        except discord.Forbidden:
+            return True  # exists, we just can't see it
+        except Exception as e:
+            print(f"⚠️ Could not check ticket channel {channel_id}: {e}")
+            return None
+
+    async def reconcile(self) -> int:
+        """Startup pass over every active ticket. Returns how many were retired."""
+        from tickets import retire_ticket
+
+        known = set()
+        for guild in self.bot.guilds:
+            known.update(channel.id for channel in guild.channels)
+            known.update(thread.id for thread in guild.threads)
+
+        retired = 0
+        for ticket in await self.bot.db.get_all_tickets():
+            channel_id = ticket["channel_id"]
+            if channel_id in known or await self.channel_exists(channel_id) is not False:
+                continue
+            if ticket.get("is_closed", False):
+                # Closed before the restart but its bookkeeping never finished
+                await self.bot.db.delete_ticket(channel_id)
+                retired += 1
+            elif await retire_ticket(self.bot, channel_id, "channel missing at startup"):
+                retired += 1
+
+        self.retired += retired
+        if retired:
+            print(f"🧹 Reconciled {retired} phantom ticket(s)")
+        return retired
+
+    async def _channel_gone(self, channel_id: int, reason: str):
+        from tickets import retire_ticket
+
+        try:
+            if await retire_ticket(self.bot, channel_id, reason):
+                self.retired += 1
+        except Exception as e:
+            print(f"⚠️ Failed to retire ticket {channel_id}: {e}")
+
+    async def on_guild_channel_delete(self, channel):
+        await self._channel_gone(channel.id, "channel deleted")
+
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        # Raw event - also fires for threads that aren't cached (archived)
+        await self._channel_gone(payload.thread_id, "thread deleted")
+
+
+async def setup_reconciler(bot):
+    """Listen for deleted ticket channels and run the startup reconciliation"""
+    reconciler = bot.reconciler
+    for event, listener in (
+        ("on_guild_channel_delete", reconciler.on_guild_channel_delete),
+        ("on_raw_thread_delete", reconciler.on_raw_thread_delete),
+    ):
+        if listener not in bot.extra_events.get(event, []):
+            bot.add_listener(listener, event)
+
+    spawn(reconciler.reconcile(), name="ticket-reconcile")
@@ -0,0 +1,299 @@
+# rest_scheduler.py
+# Priority lanes for outbound Discord REST calls
+
+import discord
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Hashable
+import config
+from capabilities import can
+from background import spawn
+import perf
+
+# Lanes, most urgent first
+LANE_INTERACTION = 0  # interaction responses/followups - never queued
+LANE_STATE = 1        # ticket state: embed edits, close/lock
+LANE_NOTIFY = 2       # channel notifications ("joined the ticket!")
+LANE_LOG = 3          # log channel messages, transcript uploads
+
+LANE_NAMES = ("interaction", "state", "notify", "log")
+
+
+class _Job:
+    __slots__ = ("lane", "factory", "bucket", "future", "queued_at")
+
+    def __init__(self, lane, factory, bucket, future):
+        self.lane = lane
+        self.factory = factory
+        self.bucket = bucket
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+class _LaneStats:
+    __slots__ = ("submitted", "completed", "failed", "dropped", "delayed", "rate_limited", "max_wait", "total_wait")
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.delayed = 0
+        self.rate_limited = 0
+        self.max_wait = 0.0
+        self.total_wait = 0.0
+
+
+class RestScheduler:
+    """Runs queued REST calls by lane priority.
+
+    Interaction responses run immediately - they have a 3 second deadline and
+    their own webhook bucket. Everything else is queued per lane and started
+    by a dispatcher that:
+      * always prefers the most urgent lane with a runnable job,
+      * caps background traffic at REST_MAX_INFLIGHT concurrent requests and
+        keeps REST_RESERVED_SLOTS of those for the state lane,
+      * paces each bucket (usually a channel) with a token bucket sized to
+        Discord's per-channel limit, so a busy channel can't stall the rest,
+      * applies backpressure: full notify/log lanes drop their oldest job,
+        awaited calls wait for room instead."""
+    def __init__(self):
+        self.lanes = [deque() for _ in LANE_NAMES]
+        self.stats = [_LaneStats() for _ in LANE_NAMES]
+        self.buckets = {}  # {bucket key: [tokens, last refill, blocked until]}
+        self.inflight = 0
+        self._wake = None
+        self._room = None
+        self.task = None
+
+    # ---------- submitting ----------
+    async def run(self, lane: int, factory: Callable[[], Awaitable], bucket: Hashable = None):
+        """Run a REST call in a lane and return its result (exceptions propagate)"""
+        if lane == LANE_INTERACTION:
+            return await self._run_direct(factory)
+
+        self._ensure_started()
+        while self._is_full(lane):
+            self._room.clear()
+            await self._room.wait()
+
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(lane, factory, bucket, future)
+        started = time.perf_counter()
+        try:
+            return await future
+        finally:
+            # The call runs in the dispatcher's task - charge queue + request time to the caller
+            perf.charge("rest", f"{LANE_NAMES[lane]} lane", time.perf_counter() - started)
+
+    def submit(self, lane: int, factory: Callable[[], Awaitable], bucket: Hashable = None):
+        """Queue a REST call without waiting for it"""
+        if lane == LANE_INTERACTION:
+            spawn(self._run_direct(factory), name="rest-interaction")
+            return
+
+        self._ensure_started()
+        if self._is_full(lane):
+            if lane < LANE_NOTIFY:
+                # State changes are never dropped - queue past the limit instead
+                print(f"⚠️ REST {LANE_NAMES[lane]} lane over its limit ({len(self.lanes[lane])} queued)")
+            else:
+                # Drop the oldest fire-and-forget job (awaited calls are never dropped)
+                queue = self.lanes[lane]
+                oldest = next((job for job in queue if job.future is None), None)
+                if oldest is not None:
+                    queue.remove(oldest)
+                    self.stats[lane].dropped += 1
+        self._enqueue(lane, factory, bucket, None)
+
+    def send(self, channel, *args, lane: int = LANE_NOTIFY, **kwargs):
+        """Fire-and-forget channel.send in a lane, paced on the channel's bucket"""
+        self.submit(lane, lambda: channel.send(*args, **kwargs), bucket=("channel", channel.id))
+
+    def _enqueue(self, lane, factory, bucket, future):
+        self.lanes[lane].append(_Job(lane, factory, bucket, future))
+        self.stats[lane].submitted += 1
+        self._wake.set()
+
+    def _is_full(self, lane: int) -> bool:
+        limit = config.REST_QUEUE_LIMITS.get(LANE_NAMES[lane])
+        return bool(limit) and len(self.lanes[lane]) >= limit
+
+    async def _run_direct(self, factory):
+        stats = self.stats[LANE_INTERACTION]
+        stats.submitted += 1
+        try:
+            result = await factory()
+        except Exception:
+            stats.failed += 1
+            raise
+        stats.completed += 1
+        return result
+
+    # ---------- dispatching ----------
+    def _ensure_started(self):
+        if self.task and not self.task.done():
+            return
+        self._wake = asyncio.Event()
+        self._room = asyncio.Event()
+        self.task = spawn(self._dispatch(), name="rest-scheduler", detached=True)
+
+    async def _dispatch(self):
+        while True:
+            self._wake.clear()
+            job, retry_in = self._next_job()
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=retry_in)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.inflight += 1
+            spawn(self._execute(job), name=f"rest-{LANE_NAMES[job.lane]}", detached=True)
+            self._room.set()
+
+    def _next_job(self):
+        """Pop the most urgent runnable job. Returns (job, None) or (None, seconds until retry)."""
+        now = time.monotonic()
+        retry_in = None
+
+        for lane in range(LANE_STATE, len(self.lanes)):
+            limit = config.REST_MAX_INFLIGHT
+            if lane > LANE_STATE:
+                limit -= config.REST_RESERVED_SLOTS
+            if self.inflight >= limit:
+                return None, retry_in
+
+            queue = self.lanes[lane]
+            for job in queue:
+                wait = self._bucket_wait(job.bucket, now)
+                if wait <= 0:
+                    queue.remove(job)
+                    self._take_token(job.bucket)
+                    return job, None
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+
+        return None, retry_in
+
+    def _bucket_wait(self, key, now: float) -> float:
+        """Seconds until the bucket has a token (0 = ready)"""
+        if key is None or key not in self.buckets:
+            return 0
+        tokens, updated, blocked_until = self.buckets[key]
+        if blocked_until > now:
+            return blocked_until - now
+        rate = config.REST_BUCKET_BURST / config.REST_BUCKET_PERIOD
+        tokens = min(config.REST_BUCKET_BURST, tokens + (now - updated) * rate)
+        self.buckets[key] = [tokens, now, 0.0]
+        return 0 if tokens >= 1 else (1 - tokens) / rate
+
+    def _take_token(self, key):
+        if key is None:
+            return
+        if key not in self.buckets:
+            if len(self.buckets) > 1000:
+                self._prune_buckets()
+            self.buckets[key] = [config.REST_BUCKET_BURST, time.monotonic(), 0.0]
+        self.buckets[key][0] -= 1
+
+    def _prune_buckets(self):
+        """Forget buckets that have fully refilled (idle channels)"""
+        now = time.monotonic()
+        rate = config.REST_BUCKET_BURST / config.REST_BUCKET_PERIOD
+        for key, (tokens, updated, blocked_until) in list(self.buckets.items()):
+            if blocked_until <= now and tokens + (now - updated) * rate >= config.REST_BUCKET_BURST:
+                del self.buckets[key]
+
+    async def _execute(self, job: _Job):
+        stats = self.stats[job.lane]
+        wait = time.monotonic() - job.queued_at
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        if wait > config.REST_DELAY_WARN:
+            stats.delayed += 1
+
+        try:
+            result = await job.factory()
+        except discord.HTTPException as e:
+            stats.failed += 1
+            if e.status == 429 and job.bucket is not None:
+                stats.rate_limited += 1
+                retry_after = getattr(e, "retry_after", None) or config.REST_BUCKET_PERIOD
+                self.buckets[job.bucket] = [0, time.monotonic(), time.monotonic() + retry_after]
+            self._settle(job, exc=e)
+        except Exception as e:
+            stats.failed += 1
+            self._settle(job, exc=e)
+        else:
+            stats.completed += 1
+            self._settle(job, result=result)
+        finally:
+            self.inflight -= 1
+            self._wake.set()
+
+    @staticmethod
+    def _settle(job: _Job, result=None, exc: Exception = None):
+        if job.future is None:
+            if exc:
+                print(f"⚠️ REST {LANE_NAMES[job.lane]} call failed: {exc}")
+            return
+        if job.future.done():
+            return
+        if exc:
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(result)
+
+    # ---------- metrics ----------
+    def snapshot(self) -> dict:
+        """Queue depth and counters per lane"""
+        lanes = {}
+        for lane, name in enumerate(LANE_NAMES):
+            stats = self.stats[lane]
+            started = stats.completed + stats.failed
+            lanes[name] = {
+                "depth": len(self.lanes[lane]),
+                "submitted": stats.submitted,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "dropped": stats.dropped,
+                "delayed": stats.delayed,
+                "rate_limited": stats.rate_limited,
+                "avg_wait_ms": (stats.total_wait / started * 1000) if started and lane else 0.0,
+                "max_wait_ms": stats.max_wait * 1000,
+            }
+        return {"inflight": self.inflight, "buckets": len(self.buckets), "lanes": lanes}
+
+
+async def setup_rest_scheduler(bot):
+    """Setup REST queue stats command"""
+
+    @bot.tree.command(name="rest_queue", description="Show outbound request queue stats (Admin only)")
+    async def rest_queue(interaction: discord.Interaction):
+        """Queue depth, drops and delays per lane"""
+        if not can(interaction.user, "admin_commands"):
+            await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+            return
+
+        snapshot = bot.rest.snapshot()
+        embed = discord.Embed(
+            title="📮 Outbound Request Queue",
+            description=f"In flight: **{snapshot['inflight']}** • Tracked buckets: **{snapshot['buckets']}**",
+            color=config.COLORS["PRIMARY"]
+        )
+        for name, lane in snapshot["lanes"].items():
+            embed.add_field(
+                name=name.title(),
+                value=(
+                    f"Queued: **{lane['depth']}**\n"
+                    f"Done: {lane['completed']:,} • Failed: {lane['failed']:,}\n"
+                    f"Dropped: {lane['dropped']:,} • Delayed: {lane['delayed']:,}\n"
+                    f"429s: {lane['rate_limited']:,}\n"
+                    f"Wait avg/max: {lane['avg_wait_ms']:.0f}/{lane['max_wait_ms']:.0f} ms"
+                ),
+                inline=True
+            )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -0,0 +1,120 @@
+# room_allocator.py
+# Hands out in-game room numbers that no other open ticket is using
+
+import random
+from typing import Optional
+import config
+
+FREE, USED, BLOCKED = 0, 1, 2
+
+
+class RoomPool:
+    """One inclusive number range as a bytearray (one byte per number).
+
+    While at least a quarter of the range is free a number is drawn by
+    rejection sampling - at most 4 draws expected. Past that it scans for
+    the next free byte from a random start (bytearray.find runs in C)."""
+    def __init__(self, first: int, last: int, excluded=()):
+        self.first = first
+        self.last = last
+        self.slots = bytearray(last - first + 1)
+        for lo, hi in excluded:
+            lo, hi = max(lo, first), min(hi, last)
+            if lo <= hi:
+                self.slots[lo - first:hi - first + 1] = bytes([BLOCKED]) * (hi - lo + 1)
+        self.free = self.slots.count(FREE)
+
+    def __contains__(self, number: int) -> bool:
+        return self.first <= number <= self.last and self.slots[number - self.first] != BLOCKED
+
+    def take(self) -> Optional[int]:
+        if not self.free:
+            return None
+        size = len(self.slots)
+        if self.free * 4 >= size:
+            i = random.randrange(size)
+            while self.slots[i] != FREE:
+                i = random.randrange(size)
+        else:
+            i = self.slots.find(FREE, random.randrange(size))
+            if i < 0:
+                i = self.slots.find(FREE)
+        self.slots[i] = USED
+        self.free -= 1
+        return self.first + i
+
+    def mark(self, number: int):
+        i = number - self.first
+        if self.slots[i] == FREE:
+            self.slots[i] = USED
+            self.free -= 1
+
+    def release(self, number: int):
+        i = number - self.first
+        if self.slots[i] == USED:
+            self.slots[i] = FREE
+            self.free += 1
+
+
+def check_reserved(number_range, reserved):
+    """Reserved ranges must sit inside the room range and not overlap one another"""
+    first, last = number_range
+    spans = sorted((lo, hi, category) for category, (lo, hi) in reserved.items())
+    for lo, hi, category in spans:
+        if not first <= lo <= hi <= last:
+            raise ValueError(f"ROOM_NUMBER_RESERVED[{category!r}] = ({lo}, {hi}) is not inside ROOM_NUMBER_RANGE {number_range}")
+    for (lo, hi, a), (next_lo, next_hi, b) in zip(spans, spans[1:]):
+        if next_lo <= hi:
+            raise ValueError(f"ROOM_NUMBER_RESERVED ranges for {a!r} and {b!r} overlap")
+
+
+class RoomAllocator:
+    """Room numbers in use by open tickets.
+
+    Categories listed in ROOM_NUMBER_RESERVED draw from their own range;
+    everyone else shares ROOM_NUMBER_RANGE with the reserved ranges cut
+    out, so a number is never live in two tickets at once. The in-use
+    marks are rebuilt from `active_tickets` on startup and released when a
+    ticket is closed, cancelled or retired."""
+    def __init__(self, bot):
+        self.bot = bot
+        reserved = config.ROOM_NUMBER_RESERVED
+        check_reserved(config.ROOM_NUMBER_RANGE, reserved)
+        self.shared = RoomPool(*config.ROOM_NUMBER_RANGE, excluded=reserved.values())
+        self.reserved = {category: RoomPool(first, last) for category, (first, last) in reserved.items()}
+
+    def _pool_of(self, number: int) -> Optional[RoomPool]:
+        if number in self.shared:
+            return self.shared
+        for pool in self.reserved.values():
+            if number in pool:
+                return pool
+        return None  # from an older range config - nothing to track
+
+    def allocate(self, category: str) -> Optional[int]:
+        """A random unused number for a new ticket, or None if the range is exhausted"""
+        return self.reserved.get(category, self.shared).take()
+
+    def release(self, number: Optional[int]):
+        pool = self._pool_of(number) if number is not None else None
+        if pool:
+            pool.release(number)
+
+    async def load(self):
+        """Mark the numbers of every open ticket (startup)"""
+        marked = 0
+        for ticket in await self.bot.db.get_all_tickets():
+            number = ticket.get("random_number")
+            if ticket.get("is_closed", False) or number is None:
+                continue
+            pool = self._pool_of(number)
+            if pool:
+                pool.mark(number)
+                marked += 1
+        return marked
+
+
+async def setup_room_allocator(bot):
+    """Rebuild the in-use room numbers from the active tickets"""
+    marked = await bot.rooms.load()
+    print(f"✅ {marked} room number(s) in use")
@@ -0,0 +1,229 @@
+# search_index.py
+# Local full-text search over ticket transcripts and metadata (SQLite FTS5)
+
+import discord
+from discord import app_commands
+import aiosqlite
+import json
+import os
+import time
+import config
+from perf import timed
+from capabilities import can
+
+SEARCH_DB_FILE = os.getenv("SEARCH_DB_FILE", "ticket_search.db")
+RESULTS_PER_PAGE = 5
+
+
+class TicketSearchIndex:
+    """FTS5 index of closed tickets.
+
+    Every ticket gets one row in `indexed_tickets` plus documents in the
+    `ticket_search` FTS table: one "meta" document (category, requestor,
+    helpers, IGN, concerns, server, room) and one "transcript" document per
+    page of messages, so a transcript is never held in memory as a whole."""
+    def __init__(self, path: str = SEARCH_DB_FILE):
+        self.path = path
+        self.db = None
+
+    async def init(self):
+        if self.db:
+            return
+        self.db = await aiosqlite.connect(self.path)
+        await self.db.execute("PRAGMA journal_mode=WAL")
+        await self.db.execute("""
+        CREATE TABLE IF NOT EXISTS indexed_tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel_id INTEGER,
+            channel_name TEXT,
+            category TEXT,
+            requestor_id INTEGER,
+            helpers TEXT,
+            in_game_name TEXT,
+            concerns TEXT,
+            server TEXT,
+            room INTEGER,
+            status TEXT,
+            closed_at REAL
+        )
+        """)
+        await self.db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_indexed_tickets_channel ON indexed_tickets(channel_id)"
+        )
+        await self.db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS ticket_search USING fts5(
+            ticket_id UNINDEXED,
+            kind UNINDEXED,
+            body
+        )
+        """)
+        await self.db.commit()
+
+    async def begin_ticket(self, channel, ticket: dict, status: str) -> int:
+        """Index a ticket's metadata and return its document id.
+        Re-indexing the same channel (e.g. a retried transcript) replaces the old entry."""
+        await self._delete_channel(channel.id)
+
+        guild = channel.guild
+        requestor = guild.get_member(ticket["requestor_id"])
+        helper_names = []
+        for helper_id in ticket["helpers"]:
+            helper = guild.get_member(helper_id)
+            if helper:
+                helper_names.append(helper.name)
+
+        cursor = await self.db.execute("""
+            INSERT INTO indexed_tickets
+            (channel_id, channel_name, category, requestor_id, helpers, in_game_name,
+             concerns, server, room, status, closed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            channel.id,
+            channel.name,
+            ticket["category"],
+            ticket["requestor_id"],
+            json.dumps(ticket["helpers"]),
+            ticket.get("in_game_name", "N/A"),
+            ticket.get("concerns", "None"),
+            ticket.get("selected_server", "Unknown"),
+            ticket.get("random_number"),
+            status,
+            time.time()
+        ))
+        ticket_id = cursor.lastrowid
+
+        meta = " ".join(str(part) for part in [
+            channel.name,
+            ticket["category"],
+            ticket["requestor_id"],
+            requestor.name if requestor else "",
+            " ".join(str(h) for h in ticket["helpers"]),
+            " ".join(helper_names),
+            ticket.get("in_game_name", ""),
+            ticket.get("concerns", ""),
+            ticket.get("selected_server", ""),
+            ticket.get("random_number", ""),
+            status,
+        ] if part)
+        await self.db.execute(
+            "INSERT INTO ticket_search(ticket_id, kind, body) VALUES (?, 'meta', ?)",
+            (ticket_id, meta)
+        )
+        return ticket_id
+
+    async def add_transcript_chunk(self, ticket_id: int, text: str):
+        """Index one page of transcript text"""
+        await self.db.execute(
+            "INSERT INTO ticket_search(ticket_id, kind, body) VALUES (?, 'transcript', ?)",
+            (ticket_id, text)
+        )
+
+    async def commit(self):
+        await self.db.commit()
+
+    async def _delete_channel(self, channel_id: int):
+        async with self.db.execute("SELECT id FROM indexed_tickets WHERE channel_id = ?", (channel_id,)) as cursor:
+            rows = await cursor.fetchall()
+        for (ticket_id,) in rows:
+            await self.db.execute("DELETE FROM ticket_search WHERE ticket_id = ?", (ticket_id,))
+        await self.db.execute("DELETE FROM indexed_tickets WHERE channel_id = ?", (channel_id,))
+
+    async def search(self, query: str, page: int = 1, per_page: int = RESULTS_PER_PAGE):
+        """Ranked search. Returns (total_matches, rows) for the requested page."""
+        match = to_match_expression(query)
+        if not match:
+            return 0, []
+
+        # MATERIALIZED keeps rank/snippet() inside the FTS query they belong to
+        async with self.db.execute("""
+            WITH matches AS MATERIALIZED (
+                SELECT ticket_id, rank AS score,
+                       snippet(ticket_search, 2, '**', '**', '…', 16) AS snip
+                FROM ticket_search WHERE ticket_search MATCH ?
+            ), hits AS (
+                SELECT ticket_id, MIN(score) AS score, snip FROM matches GROUP BY ticket_id
+            )
+            SELECT t.channel_id, t.channel_name, t.category, t.requestor_id, t.in_game_name,
+                   t.room, t.status, t.closed_at, hits.snip, COUNT(*) OVER ()
+            FROM hits JOIN indexed_tickets t ON t.id = hits.ticket_id
+            ORDER BY hits.score
+            LIMIT ? OFFSET ?
+        """, (match, per_page, (page - 1) * per_page)) as cursor:
+            rows = await cursor.fetchall()
+
+        total = rows[0][9] if rows else 0
+        return total, [
+            {
+                "channel_id": r[0],
+                "channel_name": r[1],
+                "category": r[2],
+                "requestor_id": r[3],
+                "in_game_name": r[4],
+                "room": r[5],
+                "status": r[6],
+                "closed_at": r[7],
+                "snippet": r[8],
+            }
+            for r in rows
+        ]
+
+
+def to_match_expression(query: str) -> str:
+    """Quote every term so user input can't break FTS5 query syntax"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+async def setup_search(bot):
+    """Setup ticket search command"""
+
+    @bot.tree.command(name="ticket_search", description="Search closed tickets and transcripts (Staff only)")
+    @app_commands.describe(
+        query="Words to look for (IGN, user ID, boss, server, room, message text...)",
+        page="Result page"
+    )
+    @timed("/ticket_search")
+    async def ticket_search(
+        interaction: discord.Interaction,
+        query: str,
+        page: app_commands.Range[int, 1, 1000] = 1
+    ):
+        """Search the local ticket index"""
+        if not can(interaction.user, "search_tickets"):
+            await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+            return
+
+        if not bot.search_index.db:
+            await interaction.response.send_message("❌ The ticket search index is not available.", ephemeral=True)
+            return
+
+        started = time.perf_counter()
+        total, results = await bot.search_index.search(query, page)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        total_pages = max(1, (total + RESULTS_PER_PAGE - 1) // RESULTS_PER_PAGE)
+
+        embed = discord.Embed(
+            title=f"🔎 Ticket Search: {query[:200]}",
+            description=None if results else "*No matching tickets.*",
+            color=config.COLORS["PRIMARY"]
+        )
+
+        for i, result in enumerate(results):
+            rank = (page - 1) * RESULTS_PER_PAGE + i + 1
+            snippet = (result["snippet"] or "").replace("\n", " ")
+            if len(snippet) > 300:
+                snippet = snippet[:300] + "…"
+            embed.add_field(
+                name=f"#{rank} {result['channel_name']} • {result['category']} ({result['status'].title()})",
+                value=(
+                    f"Requestor: <@{result['requestor_id']}> • IGN: {result['in_game_name']} • "
+                    f"Room: {result['room']} • <t:{int(result['closed_at'])}:d>\n"
+                    f"{snippet}"
+                ),
+                inline=False
+            )
+
+        embed.set_footer(text=f"📄 Page {page}/{total_pages} • {total} ticket(s) • {elapsed_ms:.1f} ms")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
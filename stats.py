@@ -4,8 +4,22 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
 import config
+from ticket_events import format_duration
+
+
+def _unix(closed_at) -> Optional[int]:
+    """History timestamps are UTC text in SQLite and datetimes in Firestore"""
+    if closed_at is None:
+        return None
+    if isinstance(closed_at, str):
+        try:
+            closed_at = datetime.strptime(closed_at[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+    return int(closed_at.timestamp())
 
 
 async def setup_stats(bot):
@@ -45,3 +59,54 @@ async def setup_stats(bot):
         embed.set_footer(text="Tracking since April 9, 2025")
         
         await interaction.response.send_message(embed=embed)
+    
+    @bot.tree.command(name="helper_stats", description="Show a helper's completed tickets")
+    @app_commands.describe(user="Helper to show (defaults to you)")
+    async def helper_stats(interaction: discord.Interaction, user: Optional[discord.Member] = None):
+        """Totals, per-category split, recent tickets and average duration for one helper"""
+        user = user or interaction.user
+        await interaction.response.defer()
+        
+        stats = await bot.db.get_helper_stats(user.id)
+        
+        embed = discord.Embed(
+            title=f"📈 Helper Stats - {user.display_name}",
+            color=config.COLORS["PRIMARY"]
+        )
+        embed.set_thumbnail(url=user.display_avatar.url)
+        
+        if not stats["tickets"]:
+            embed.description = f"{user.mention} hasn't completed any tickets yet."
+            await interaction.followup.send(embed=embed)
+            return
+        
+        embed.add_field(name="Tickets Completed", value=f"**{stats['tickets']:,}**", inline=True)
+        embed.add_field(name="Last 30 Days", value=f"**{stats['last_30d']:,}**", inline=True)
+        embed.add_field(name="Ticket Points", value=f"**{stats['points']:,}**", inline=True)
+        embed.add_field(
+            name="Avg Ticket Duration",
+            value=f"**{format_duration(stats['avg_duration'])}**"
+                  + (f" ({stats['timed_tickets']:,} timed)" if stats["timed_tickets"] else ""),
+            inline=True
+        )
+        first, last = _unix(stats["first"]), _unix(stats["last"])
+        if first and last:
+            embed.add_field(name="Active", value=f"<t:{first}:d> → <t:{last}:R>", inline=True)
+        
+        embed.add_field(
+            name="By Category",
+            value="\n".join(
+                f"**{c['category']}**: {c['tickets']:,} tickets ({c['points']:,} pts)"
+                for c in stats["categories"][:10]
+            ),
+            inline=False
+        )
+        
+        recent = []
+        for ticket in stats["recent"]:
+            closed = _unix(ticket["closed_at"])
+            recent.append(f"{ticket['category']} • +{ticket['points']} pts" + (f" • <t:{closed}:R>" if closed else ""))
+        embed.add_field(name="Recent Tickets", value="\n".join(recent) or "-", inline=False)
+        
+        embed.set_footer(text="Ticket points are the category values - volunteers are not awarded them")
+        await interaction.followup.send(embed=embed)
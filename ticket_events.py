@@ -0,0 +1,148 @@
+# ticket_events.py
+# Append-only ticket lifecycle log (batched writes) and the /ticket_sla report
+
+import discord
+from discord import app_commands
+import asyncio
+import time
+from typing import Optional
+import config
+from capabilities import can
+from background import spawn
+from category_registry import registry
+
+CREATED = "created"
+HELPER_JOINED = "helper_joined"
+HELPER_LEFT = "helper_left"
+KICKED = "kicked"
+CLOSED = "closed"
+CANCELLED = "cancelled"
+
+SLA_WINDOWS = {"24h": 24 * 3600, "7d": 7 * 24 * 3600, "30d": 30 * 24 * 3600}
+
+
+class TicketEventLog:
+    """Buffers ticket lifecycle events and writes them in batches.
+
+    `record` only appends to a list, so handlers never wait on the database.
+    The buffer is written (one executemany per statement) once it holds
+    TICKET_EVENT_BATCH_SIZE events or TICKET_EVENT_FLUSH_INTERVAL seconds
+    after the first event was buffered. A failed write keeps the events for
+    the next flush, up to TICKET_EVENT_BUFFER_MAX."""
+    def __init__(self, bot):
+        self.bot = bot
+        self.buffer = []
+        self.task = None
+        self._lock = asyncio.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, ticket: dict, event: str, user_id: int = None, actor_id: int = None):
+        """Log an event for a ticket (call after `ticket` reflects the change)"""
+        helpers = len(ticket.get("helpers") or [])
+        self.buffer.append({
+            "channel_id": ticket["channel_id"],
+            "category": ticket["category"],
+            "event": event,
+            "user_id": user_id,
+            "actor_id": actor_id,
+            "helpers": helpers,
+            "filled": event == HELPER_JOINED and helpers >= registry.slots(ticket["category"]),
+            "at": time.time(),
+        })
+        if len(self.buffer) >= config.TICKET_EVENT_BATCH_SIZE:
+            spawn(self.flush(), name="ticket-events-flush", detached=True)
+        elif self.task is None or self.task.done():
+            self.task = spawn(self._flush_later(), name="ticket-events-flush", detached=True)
+
+    async def _flush_later(self):
+        await asyncio.sleep(config.TICKET_EVENT_FLUSH_INTERVAL)
+        await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far"""
+        async with self._lock:
+            if not self.buffer:
+                return
+            batch, self.buffer = self.buffer, []
+            try:
+                await self.bot.db.add_ticket_events(batch)
+                self.written += len(batch)
+            except Exception as e:
+                print(f"⚠️ Failed to write {len(batch)} ticket events: {e}")
+                self.buffer[:0] = batch
+                overflow = len(self.buffer) - config.TICKET_EVENT_BUFFER_MAX
+                if overflow > 0:
+                    del self.buffer[:overflow]
+                    self.dropped += overflow
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+
+async def setup_ticket_events(bot):
+    """Setup ticket SLA report command"""
+
+    async def category_autocomplete(interaction: discord.Interaction, current: str):
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in registry.names()
+            if current.lower() in name.lower()
+        ][:25]
+
+    @bot.tree.command(name="ticket_sla", description="Show ticket wait and fill times (Admin only)")
+    @app_commands.describe(window="Tickets opened within this window", category="Only this ticket category")
+    @app_commands.choices(window=[
+        app_commands.Choice(name="Last 24 hours", value="24h"),
+        app_commands.Choice(name="Last 7 days", value="7d"),
+        app_commands.Choice(name="Last 30 days", value="30d"),
+    ])
+    @app_commands.autocomplete(category=category_autocomplete)
+    async def ticket_sla(interaction: discord.Interaction, window: str = "7d", category: Optional[str] = None):
+        """p50/p90/p99 time to first helper and time to fill per category"""
+        if not can(interaction.user, "admin_commands"):
+            await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        # Include events still sitting in the buffer
+        await bot.ticket_events.flush()
+        since = time.time() - SLA_WINDOWS.get(window, SLA_WINDOWS["7d"])
+        report = await bot.db.get_ticket_sla(since, category)
+
+        embed = discord.Embed(
+            title="⏱️ Ticket Wait & Fill Times",
+            description=(
+                f"Tickets opened in the last **{window}**"
+                + (f" • **{category}**" if category else "")
+                + "\n*Wait = until the first helper joined • Fill = until every slot was taken*"
+            ),
+            color=config.COLORS["PRIMARY"]
+        )
+        for name in sorted(report, key=lambda n: report[n]["opened"], reverse=True)[:25]:
+            stats = report[name]
+            wait, fill = stats["wait"], stats["fill"]
+            embed.add_field(
+                name=f"{name} ({stats['opened']:,} opened)",
+                value=(
+                    f"**Wait** p50/p90/p99: {format_duration(wait['p50'])} / {format_duration(wait['p90'])} / "
+                    f"{format_duration(wait['p99'])} (n={wait['count']:,})\n"
+                    f"**Fill** p50/p90/p99: {format_duration(fill['p50'])} / {format_duration(fill['p90'])} / "
+                    f"{format_duration(fill['p99'])} (n={fill['count']:,})\n"
+                    f"Still waiting: {stats['waiting']:,} • Never filled: {stats['unfilled']:,}"
+                ),
+                inline=False
+            )
+        if not report:
+            embed.add_field(name="No data", value="No tickets were opened in this window.", inline=False)
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
@@ -0,0 +1,189 @@
+# ticket_reaper.py
+# Warns about and then cancels tickets that have gone idle
+
+import discord
+import asyncio
+import heapq
+import itertools
+import time
+import config
+from background import spawn
+
+IDLE_WARNING = "⏰ This ticket has been idle"
+
+
+def idle_timeouts(category: str):
+    """(idle seconds before the warning, seconds after the warning before cancelling)"""
+    return config.TICKET_IDLE_TIMEOUTS.get(category) or config.TICKET_IDLE_TIMEOUTS["default"]
+
+
+class TicketReaper:
+    """Timer heap of idle deadlines for open tickets.
+
+    Each ticket has one heap entry for its next deadline. Activity (a
+    message, a helper joining or leaving) only updates `last_activity` and
+    clears the warning - O(1), no heap push. When an entry comes due the
+    reaper compares it with the ticket's real state: if there was activity
+    since, it re-arms for the new deadline; otherwise it posts a warning,
+    and after a second idle period cancels the ticket through close_ticket
+    (transcript, cancelled history row, channel and requestor freed).
+    Entries are invalidated lazily by sequence number, like the matchmaker."""
+    def __init__(self, bot):
+        self.bot = bot
+        self._seq = itertools.count()
+        self.heap = []      # (due, seq, channel_id)
+        self.tickets = {}   # channel_id -> {"category", "last_activity", "warned_at", "seq"}
+        self.task = None
+        self._wake = None
+        self.warned = 0
+        self.reaped = 0
+
+    # ---------- tracking ----------
+    def ticket_opened(self, channel_id: int, category: str, last_activity: float = None, warned_at: float = None):
+        if not config.TICKET_REAPER_ENABLED:
+            return  # nothing would ever pop the heap
+        self.tickets[channel_id] = {
+            "category": category,
+            "last_activity": last_activity or time.time(),
+            "warned_at": warned_at,
+            "seq": None,
+        }
+        warn_after, cancel_after = idle_timeouts(category)
+        state = self.tickets[channel_id]
+        self._arm(channel_id, warned_at + cancel_after if warned_at else state["last_activity"] + warn_after)
+
+    def touch(self, channel_id: int):
+        state = self.tickets.get(channel_id)
+        if state:
+            state["last_activity"] = time.time()
+            state["warned_at"] = None
+
+    def ticket_closed(self, channel_id: int):
+        self.tickets.pop(channel_id, None)
+
+    def _arm(self, channel_id: int, due: float):
+        seq = next(self._seq)
+        self.tickets[channel_id]["seq"] = seq
+        heapq.heappush(self.heap, (due, seq, channel_id))
+        if self._wake and self.heap[0][1] == seq:
+            self._wake.set()  # new earliest deadline
+
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or message.channel.id not in self.tickets:
+            return
+        self.touch(message.channel.id)
+
+    # ---------- timer loop ----------
+    def start(self):
+        if not config.TICKET_REAPER_ENABLED or (self.task and not self.task.done()):
+            return
+        self._wake = asyncio.Event()
+        self.task = spawn(self._run(), name="ticket-reaper")
+
+    async def load(self):
+        """Track every open ticket (startup) - idle time counts from its last message"""
+        for ticket in await self.bot.db.get_all_tickets():
+            if ticket.get("is_closed", False) or ticket["channel_id"] in self.tickets:
+                continue
+            channel = self.bot.get_channel(ticket["channel_id"])
+            if not channel:
+                continue  # the reconciler retires it
+            try:
+                last_activity, warned_at = await self._idle_state(channel, ticket)
+            except Exception as e:
+                print(f"⚠️ Could not read idle state of {channel.name}: {e}")
+                last_activity, warned_at = None, None
+            self.ticket_opened(ticket["channel_id"], ticket["category"], last_activity, warned_at)
+
+    async def _idle_state(self, channel, ticket: dict):
+        """(last activity, time of a pending idle warning) from the channel's recent messages.
+        Bot messages don't count as activity - the newest is often our own warning."""
+        warned_at = None
+        async for message in channel.history(limit=50):
+            if not message.author.bot:
+                return message.created_at.timestamp(), warned_at
+            if warned_at is None and message.author.id == self.bot.user.id and message.content.startswith(IDLE_WARNING):
+                warned_at = message.created_at.timestamp()
+        # No member message in reach - count from the ticket embed
+        opened_id = ticket.get("embed_message_id") or ticket["channel_id"]
+        return discord.utils.snowflake_time(opened_id).timestamp(), warned_at
+
+    async def _run(self):
+        await self.load()
+        while True:
+            self._wake.clear()
+            timeout = max(0.0, self.heap[0][0] - time.time()) if self.heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            now = time.time()
+            while self.heap and self.heap[0][0] <= now:
+                _, seq, channel_id = heapq.heappop(self.heap)
+                state = self.tickets.get(channel_id)
+                if not state or state["seq"] != seq:
+                    continue
+                try:
+                    await self._check(channel_id, state, now)
+                except Exception as e:
+                    print(f"⚠️ Reaper check failed for {channel_id}: {e}")
+                    if self.tickets.get(channel_id) is state:
+                        self._arm(channel_id, now + 60)
+
+    async def _check(self, channel_id: int, state: dict, now: float):
+        warn_after, cancel_after = idle_timeouts(state["category"])
+
+        if state["warned_at"] is None:
+            due = state["last_activity"] + warn_after
+            if due > now:
+                self._arm(channel_id, due)  # there was activity since this entry was armed
+                return
+            await self._warn(channel_id, state, warn_after, cancel_after)
+            return
+
+        due = state["warned_at"] + cancel_after
+        if due > now:
+            self._arm(channel_id, due)
+            return
+        await self._cancel(channel_id)
+
+    async def _warn(self, channel_id: int, state: dict, warn_after: int, cancel_after: int):
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            self.ticket_closed(channel_id)  # the reconciler retires it
+            return
+        state["warned_at"] = time.time()
+        self._arm(channel_id, state["warned_at"] + cancel_after)
+        self.warned += 1
+        self.bot.rest.send(
+            channel,
+            f"{IDLE_WARNING} for **{warn_after // 60} minutes**. "
+            f"It will be cancelled <t:{int(state['warned_at'] + cancel_after)}:R> unless someone posts here."
+        )
+
+    async def _cancel(self, channel_id: int):
+        from tickets import close_ticket, get_ticket_lock
+
+        self.ticket_closed(channel_id)
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            return
+        async with get_ticket_lock(channel_id):
+            ticket = await self.bot.db.get_ticket(channel_id)
+            if not ticket or ticket.get("is_closed", False):
+                return
+            print(f"⏰ Cancelling idle ticket {channel.name}")
+            self.reaped += 1
+            await close_ticket(self.bot, channel, ticket, self.bot.user, cancelled=True)
+
+    def snapshot(self) -> dict:
+        return {"tracked": len(self.tickets), "warned": self.warned, "reaped": self.reaped}
+
+
+async def setup_ticket_reaper(bot):
+    """Count ticket messages as activity (guarded - on_ready can run more than once)"""
+    listener = bot.reaper.on_message
+    if listener not in bot.extra_events.get("on_message", []):
+        bot.add_listener(listener, "on_message")
@@ -0,0 +1,65 @@
+# ticket_threads.py
+# Private-thread ticket mode - a lighter alternative to one text channel per ticket
+
+import discord
+import asyncio
+from typing import Iterable, Optional
+import config
+
+
+def thread_mode_enabled(kind: str) -> bool:
+    """True when tickets of this kind ("TICKETS", "VERIFICATION", "APPRENTICE") use private threads"""
+    return bool(config.TICKET_THREAD_MODE and config.THREAD_PARENT_CHANNELS.get(kind))
+
+
+async def create_ticket_thread(guild: discord.Guild, kind: str, name: str, opener: discord.Member) -> Optional[discord.Thread]:
+    """Open a private thread under the configured parent channel and add the opener.
+
+    Role pings sent in the thread (helpers, staff, apprentices) add that role's
+    members, which is what the role overwrites do in channel mode."""
+    parent = guild.get_channel(config.THREAD_PARENT_CHANNELS.get(kind))
+    if not isinstance(parent, discord.TextChannel):
+        return None
+
+    thread = await parent.create_thread(
+        name=name[:100],
+        type=discord.ChannelType.private_thread,
+        invitable=False,
+        auto_archive_duration=10080
+    )
+    await thread.add_user(opener)
+    return thread
+
+
+async def grant_ticket_access(channel, member: discord.Member):
+    """Let a member see and talk in a ticket"""
+    if isinstance(channel, discord.Thread):
+        await channel.add_user(member)
+    else:
+        await channel.set_permissions(
+            member,
+            view_channel=True,
+            send_messages=True,
+            read_message_history=True
+        )
+
+
+async def revoke_ticket_access(channel, member):
+    """Undo grant_ticket_access"""
+    if isinstance(channel, discord.Thread):
+        await channel.remove_user(member)
+    else:
+        await channel.set_permissions(member, overwrite=None)
+
+
+async def lock_ticket_thread(thread: discord.Thread, member_ids: Iterable[int]):
+    """Closed-ticket equivalent of the closed overwrite set: remove the given
+    members and lock the thread. Staff keep access through Manage Threads."""
+    results = await asyncio.gather(
+        *(thread.remove_user(discord.Object(id=member_id)) for member_id in member_ids),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"⚠️ Failed to remove member from {thread.name}: {result}")
+    await thread.edit(locked=True)
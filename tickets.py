@@ -4,14 +4,27 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import random
 from typing import Optional, List
-import json
 import io
+import json
+import gzip
+import shutil
+import tempfile
 import asyncio
 import traceback
 import time
 import config
+from background import spawn
+from capabilities import can
+from category_registry import registry
+from dynamic_views import stateless_view
+from rest_scheduler import LANE_STATE, LANE_LOG
+from perf import timed
+import ticket_events
+from ticket_threads import (
+    thread_mode_enabled, create_ticket_thread, grant_ticket_access,
+    revoke_ticket_access, lock_ticket_thread
+)
 
 # === GLOBAL LOCK DICTIONARY FOR RACE CONDITION PREVENTION ===
 ticket_locks = {}
@@ -21,6 +34,19 @@ join_cooldowns = {}  # {user_id: timestamp}
 leave_cooldowns = {}  # {user_id: timestamp}
 COOLDOWN_SECONDS = 120  # 2 minutes
 
+# === BACKGROUND TRANSCRIPT JOBS ===
+transcript_jobs = {}  # {channel_id: asyncio.Task}
+TRANSCRIPT_RETRIES = 3
+TRANSCRIPT_PAGE_SIZE = 100  # matches channel.history's page size
+
+# === PIN NOTICE CLEANUP ===
+pending_pin_notices = {}  # {channel_id: pinned message_id}
+PIN_NOTICE_TIMEOUT = 60  # seconds to wait for the "pinned a message" notice
+
+# === COALESCED EMBED UPDATES ===
+embed_updaters = {}  # {channel_id: TicketEmbedUpdater}
+EMBED_UPDATE_DELAY = 1.5  # seconds - a burst of joins costs one edit
+
 def get_ticket_lock(channel_id: int):
     """Get or create a lock for a specific ticket channel"""
     if channel_id not in ticket_locks:
@@ -46,7 +72,7 @@ class TicketView(discord.ui.View):
         super().__init__(timeout=None)
         
         # Add buttons for each category
-        for i, category in enumerate(config.CATEGORIES):
+        for i, category in enumerate(registry.names()):
             row = i // 4  # 4 buttons per row
             self.add_item(TicketButton(category, row=row))
 
@@ -54,7 +80,8 @@ class TicketView(discord.ui.View):
 class TicketButton(discord.ui.Button):
     """Button for each ticket category"""
     def __init__(self, category: str, row: int):
-        label = category.replace(" Express", "")
+        spec = registry.get(category)
+        label = spec.label if spec else category.replace(" Express", "")
         
         super().__init__(
             label=label,
@@ -65,6 +92,7 @@ class TicketButton(discord.ui.Button):
         )
         self.category = category
     
+    @timed("ticket.open_button")
     async def callback(self, interaction: discord.Interaction):
         """Handle ticket button click"""
         # Check if user has RESTRICTED role - BLOCK THEM
@@ -83,7 +111,7 @@ class TicketButton(discord.ui.Button):
         for ticket in all_tickets:
             if interaction.user.id == ticket["requestor_id"]:
                 # Verify channel exists
-                channel = interaction.guild.get_channel(ticket["channel_id"])
+                channel = interaction.guild.get_channel_or_thread(ticket["channel_id"])
                 if channel:
                     await interaction.response.send_message(
                         f"❌ You already have an active ticket: {channel.mention}\n"
@@ -96,7 +124,7 @@ class TicketButton(discord.ui.Button):
         for ticket in all_tickets:
             if interaction.user.id in ticket["helpers"]:
                 # Verify channel exists
-                channel = interaction.guild.get_channel(ticket["channel_id"])
+                channel = interaction.guild.get_channel_or_thread(ticket["channel_id"])
                 if channel:
                     await interaction.response.send_message(
                         f"❌ You cannot create a ticket while you're a helper in another ticket: {channel.mention}\n"
@@ -105,82 +133,72 @@ class TicketButton(discord.ui.Button):
                     )
                     return
         
+        # Returning users can skip the selects (and the modal) in one click
+        prefs = await bot.db.get_ticket_preferences(interaction.user.id, self.category)
+        repeat = [RepeatTicketButton(self.category)] if prefs else []
+        
         # Check if category needs boss selection
-        if self.category in ["Daily 4-Man Express", "Daily 7-Man Express", "Weekly Ultra Express"]:
+        spec = registry.get(self.category)
+        if spec and spec.bosses:
             # Show boss selection menu
-            view = BossSelectView(self.category)
+            view = stateless_view(BossSelectMenu(self.category), *repeat)
             
             embed = discord.Embed(
                 title=f"🎯 Select Bosses - {self.category}",
                 description="Choose which bosses you need help with:",
                 color=config.COLORS["PRIMARY"]
             )
-            
-            await interaction.response.send_message(
-                embed=embed,
-                view=view,
-                ephemeral=True
-            )
         else:
             # Direct to server selection modal
-            view = ServerSelectView(self.category, selected_bosses=None)
+            view = stateless_view(ServerSelectMenu(self.category), *repeat)
             
             embed = discord.Embed(
                 title=f"🌍 Select Server - {self.category}",
                 description="Choose which server you're playing on:",
                 color=config.COLORS["PRIMARY"]
             )
-            
-            await interaction.response.send_message(
-                embed=embed,
-                view=view,
-                ephemeral=True
-            )
+        
+        if prefs:
+            embed.add_field(name="🔁 Same as last time?", value=describe_preferences(prefs), inline=False)
+        
+        await interaction.response.send_message(
+            embed=embed,
+            view=view,
+            ephemeral=True
+        )
 
 
-class BossSelectView(discord.ui.View):
-    """View with boss selection dropdown"""
-    def __init__(self, category: str):
-        super().__init__(timeout=300)  # 5 minute timeout for selection
-        self.category = category
-        self.add_item(BossSelectMenu(category))
+SERVERS = ["Swordhaven", "Safiria", "Gravelyn", "Galanoth", "Alteon", "Yorumi"]
 
 
-class BossSelectMenu(discord.ui.Select):
-    """Dropdown menu for boss selection"""
+class BossSelectMenu(discord.ui.DynamicItem[discord.ui.Select], template=r"boss_select::(?P<category>.+)"):
+    """Dropdown menu for boss selection (stateless - the category is in the custom_id)"""
     def __init__(self, category: str):
-        self.category = category
-        
-        # Get boss list based on category
-        if category == "Daily 4-Man Express":
-            boss_list = config.DAILY_4MAN_BOSSES
-        elif category == "Daily 7-Man Express":
-            boss_list = config.DAILY_7MAN_BOSSES
-        elif category == "Weekly Ultra Express":
-            boss_list = config.WEEKLY_ULTRA_BOSSES
-        else:
-            boss_list = []
-        
-        # Create options with CORRECT display names (remove Ultra from non-ultra bosses)
-        options = []
-        for boss in boss_list:
-            display_name = format_boss_name_for_select(boss)
-            options.append(discord.SelectOption(label=display_name, value=boss, emoji="⚔️"))
+        # Precompiled (label, boss) pairs - labels drop "Ultra" from non-ultra bosses
+        spec = registry.get(category)
+        choices = spec.select_options if spec else ()
+        options = [
+            discord.SelectOption(label=label, value=boss, emoji="⚔️")
+            for label, boss in choices
+        ]
         
-        super().__init__(
-            placeholder=f"Select bosses (1-{len(boss_list)})",
+        super().__init__(discord.ui.Select(
+            placeholder=f"Select bosses (1-{len(options)})",
             min_values=1,
-            max_values=len(boss_list),
+            max_values=len(options),
             options=options,
-            custom_id=f"boss_select_{category}"
-        )
+            custom_id=f"boss_select::{category}"
+        ))
+        self.category = category
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(match["category"])
     
+    @timed("ticket.boss_select")
     async def callback(self, interaction: discord.Interaction):
         """Handle boss selection and show server selection"""
-        selected_bosses = self.values
-        
-        # Show server selection
-        view = ServerSelectView(self.category, selected_bosses=selected_bosses)
+        selected_bosses = self.item.values
         
         embed = discord.Embed(
             title=f"🌍 Select Server - {self.category}",
@@ -188,52 +206,120 @@ class BossSelectMenu(discord.ui.Select):
             color=config.COLORS["PRIMARY"]
         )
         
-        await interaction.response.edit_message(embed=embed, view=view)
-
-
-class ServerSelectView(discord.ui.View):
-    """View with server selection dropdown"""
-    def __init__(self, category: str, selected_bosses: Optional[List[str]] = None):
-        super().__init__(timeout=300)
-        self.category = category
-        self.selected_bosses = selected_bosses or []
-        self.add_item(ServerSelectMenu(category, selected_bosses))
+        await interaction.response.edit_message(
+            embed=embed,
+            view=stateless_view(ServerSelectMenu(self.category, selected_bosses=selected_bosses))
+        )
 
 
-class ServerSelectMenu(discord.ui.Select):
-    """Dropdown menu for server selection"""
+class ServerSelectMenu(discord.ui.DynamicItem[discord.ui.Select], template=r"server_select::(?P<category>.+)::(?P<bosses>[0-9.]*)"):
+    """Dropdown menu for server selection (stateless - the category and the
+    selected bosses, as indexes into the category's boss list, are in the custom_id)"""
     def __init__(self, category: str, selected_bosses: Optional[List[str]] = None):
         self.category = category
         self.selected_bosses = selected_bosses or []
         
-        # Server options
-        servers = ["Swordhaven", "Safiria", "Gravelyn", "Galanoth", "Alteon", "Yorumi"]
+        spec = registry.get(category)
+        bosses = spec.bosses if spec else ()
+        indexes = ".".join(str(bosses.index(boss)) for boss in self.selected_bosses if boss in bosses)
         
         options = [
             discord.SelectOption(label=server, value=server, emoji="🌐")
-            for server in servers
+            for server in SERVERS
         ]
         
-        super().__init__(
+        super().__init__(discord.ui.Select(
             placeholder="Select your server",
             min_values=1,
             max_values=1,
             options=options,
-            custom_id=f"server_select_{category}"
-        )
+            custom_id=f"server_select::{category}::{indexes}"
+        ))
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        spec = registry.get(match["category"])
+        bosses = spec.bosses if spec else ()
+        selected = [
+            bosses[int(i)] for i in match["bosses"].split(".")
+            if i and int(i) < len(bosses)
+        ]
+        return cls(match["category"], selected_bosses=selected)
     
+    @timed("ticket.server_select")
     async def callback(self, interaction: discord.Interaction):
         """Handle server selection and open modal"""
-        selected_server = self.values[0]
+        selected_server = self.item.values[0]
         
-        # Show modal with selected bosses and server
-        modal = TicketModal(self.category, selected_bosses=self.selected_bosses, selected_server=selected_server)
+        # Show modal with selected bosses and server (IGN prefilled from last time)
+        prefs = await interaction.client.db.get_ticket_preferences(interaction.user.id, self.category)
+        modal = TicketModal(
+            self.category,
+            selected_bosses=self.selected_bosses,
+            selected_server=selected_server,
+            in_game_name=prefs["in_game_name"] if prefs else None
+        )
         await interaction.response.send_modal(modal)
 
 
+class RepeatTicketButton(discord.ui.DynamicItem[discord.ui.Button], template=r"ticket_repeat::(?P<category>.+)"):
+    """Open a ticket with the bosses, server and IGN of the user's last ticket
+    in this category - no selects, and no modal when the IGN is known"""
+    def __init__(self, category: str):
+        super().__init__(discord.ui.Button(
+            label="Same as last time",
+            style=discord.ButtonStyle.success,
+            emoji="🔁",
+            custom_id=f"ticket_repeat::{category}"
+        ))
+        self.category = category
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["category"])
+    
+    @timed("ticket.repeat")
+    async def callback(self, interaction: discord.Interaction):
+        prefs = await interaction.client.db.get_ticket_preferences(interaction.user.id, self.category)
+        spec = registry.get(self.category)
+        if not prefs or not spec:
+            await interaction.response.send_message("❌ Nothing to repeat - please use the menu above.", ephemeral=True)
+            return
+        
+        # Bosses removed from the category since then are dropped
+        selected_bosses = [boss for boss in prefs["selected_bosses"] if boss in spec.bosses]
+        if spec.bosses and not selected_bosses:
+            await interaction.response.send_message("❌ Your last bosses are no longer available - please pick again above.", ephemeral=True)
+            return
+        
+        if not prefs["in_game_name"]:
+            await interaction.response.send_modal(TicketModal(
+                self.category, selected_bosses=selected_bosses, selected_server=prefs["selected_server"]
+            ))
+            return
+        
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        await open_ticket(
+            interaction, self.category, selected_bosses, prefs["selected_server"], prefs["in_game_name"], "None"
+        )
+
+
+def describe_preferences(prefs: dict) -> str:
+    """One-line summary of a user's last selections for the panel prompt"""
+    parts = []
+    if prefs["selected_bosses"]:
+        parts.append(", ".join(prefs["selected_bosses"]))
+    if prefs["selected_server"]:
+        parts.append(f"🌐 {prefs['selected_server']}")
+    if prefs["in_game_name"]:
+        parts.append(f"IGN: {prefs['in_game_name']}")
+    return " • ".join(parts) or "Your last ticket"
+
+
 class TicketModal(discord.ui.Modal):
     """Modal for ticket creation"""
-    def __init__(self, category: str, selected_bosses: Optional[List[str]] = None, selected_server: str = None):
+    def __init__(self, category: str, selected_bosses: Optional[List[str]] = None, selected_server: str = None,
+                 in_game_name: str = None):
         super().__init__(title=f"{category} Ticket")
         self.category = category
         self.selected_bosses = selected_bosses or []
@@ -243,6 +329,7 @@ class TicketModal(discord.ui.Modal):
         self.in_game_name = discord.ui.TextInput(
             label="In-game name?",
             placeholder="Enter your in-game name",
+            default=in_game_name,
             required=True,
             max_length=100,
             style=discord.TextStyle.short
@@ -259,153 +346,205 @@ class TicketModal(discord.ui.Modal):
         )
         self.add_item(self.concerns)
     
+    @timed("ticket.submit")
     async def on_submit(self, interaction: discord.Interaction):
         """Create ticket channel when modal submitted"""
         await interaction.response.defer(ephemeral=True)
-        
-        # === DOUBLE-CHECK: User doesn't have an active ticket ===
-        bot = interaction.client
-        all_tickets = await bot.db.get_all_tickets()
-        
-        for ticket in all_tickets:
-            if interaction.user.id == ticket["requestor_id"]:
-                channel = interaction.guild.get_channel(ticket["channel_id"])
-                if channel:
-                    await interaction.followup.send(
-                        f"❌ You already have an active ticket: {channel.mention}\n"
-                        "Please close or cancel that ticket before creating a new one.",
-                        ephemeral=True
-                    )
+        await open_ticket(
+            interaction,
+            self.category,
+            self.selected_bosses,
+            self.selected_server,
+            self.in_game_name.value,
+            self.concerns.value or "None"
+        )
+
+
+async def open_ticket(interaction: discord.Interaction, category: str, selected_bosses: List[str],
+                      selected_server: str, in_game_name: str, concerns: str):
+    """Create the ticket channel, embed and active row.
+    
+    The interaction must already be deferred - it comes from the modal or,
+    for returning users, straight from the "Same as last time" button."""
+    # === DOUBLE-CHECK: User doesn't have an active ticket ===
+    bot = interaction.client
+    all_tickets = await bot.db.get_all_tickets()
+    
+    for ticket in all_tickets:
+        if interaction.user.id == ticket["requestor_id"]:
+            channel = interaction.guild.get_channel_or_thread(ticket["channel_id"])
+            if channel:
+                await interaction.followup.send(
+                    f"❌ You already have an active ticket: {channel.mention}\n"
+                    "Please close or cancel that ticket before creating a new one.",
+                    ephemeral=True
+                )
+                return
+    
+    guild = interaction.guild
+    category_id = config.CHANNEL_IDS.get("TICKETS_CATEGORY")
+    
+    if not category_id and not thread_mode_enabled("TICKETS"):
+        await interaction.followup.send("❌ Ticket category not configured!", ephemeral=True)
+        return
+    
+    # Random room number no other open ticket is using
+    random_number = bot.rooms.allocate(category)
+    if random_number is None:
+        await interaction.followup.send("❌ No free room numbers right now, please try again later.", ephemeral=True)
+        return
+    
+    # Get channel prefix
+    prefix = registry.prefix(category)
+    
+    # Create channel name: prefix-username
+    username = interaction.user.name.lower().replace(" ", "")[:20]
+    channel_name = f"{prefix}-{username}"
+    
+    # Create ticket channel (role overwrites come precompiled per guild)
+    overwrites = bot.overwrite_templates.with_opener(guild, "ticket_open", interaction.user)
+    
+    try:
+        # Claim a pre-created channel if one is ready, otherwise create one
+        channel = None
+        channel_pool = getattr(bot, "channel_pool", None)
+        if thread_mode_enabled("TICKETS"):
+            # Private thread instead of a channel (no overwrites, no category cap)
+            channel = await create_ticket_thread(guild, "TICKETS", channel_name, interaction.user)
+            if channel is None:
+                bot.rooms.release(random_number)
+                await interaction.followup.send("❌ Ticket thread parent channel not found!", ephemeral=True)
+                return
+        elif channel_pool:
+            channel = await channel_pool.claim(channel_name, overwrites, reason=f"Ticket opened by {interaction.user}")
+        if channel is None:
+            # Least-loaded ticket category (overflow categories past the 50-channel cap)
+            async with bot.category_allocator.place("TICKETS_CATEGORY", guild) as parent:
+                if not parent:
+                    bot.rooms.release(random_number)
+                    await interaction.followup.send("❌ Ticket category not found or full!", ephemeral=True)
                     return
-        
-        guild = interaction.guild
-        category_id = config.CHANNEL_IDS.get("TICKETS_CATEGORY")
-        
-        if not category_id:
-            await interaction.followup.send("❌ Ticket category not configured!", ephemeral=True)
-            return
-        
-        category = guild.get_channel(category_id)
-        if not category:
-            await interaction.followup.send("❌ Ticket category not found!", ephemeral=True)
-            return
-        
-        # Generate random number for ticket (1000-99999)
-        random_number = random.randint(1000, 99999)
-        
-        # Get channel prefix
-        prefix = config.CATEGORY_METADATA.get(self.category, {}).get("prefix", "ticket")
-        
-        # Create channel name: prefix-username
-        username = interaction.user.name.lower().replace(" ", "")[:20]
-        channel_name = f"{prefix}-{username}"
-        
-        # Create ticket channel
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-        }
-        
-        # Add staff/admin/officer permissions
-        admin_role = guild.get_role(config.ROLE_IDS.get("ADMIN"))
-        staff_role = guild.get_role(config.ROLE_IDS.get("STAFF"))
-        officer_role = guild.get_role(config.ROLE_IDS.get("OFFICER"))
-        helper_role = guild.get_role(config.ROLE_IDS.get("HELPER"))
-        
-        if admin_role:
-            overwrites[admin_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        if staff_role:
-            overwrites[staff_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        if officer_role:
-            overwrites[officer_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        if helper_role:
-            overwrites[helper_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        
-        try:
-            channel = await category.create_text_channel(
-                name=channel_name,
-                overwrites=overwrites
-            )
-        except Exception as e:
-            await interaction.followup.send(f"❌ Failed to create ticket: {e}", ephemeral=True)
-            return
-        
+                channel = await parent.create_text_channel(
+                    name=channel_name,
+                    overwrites=overwrites
+                )
+    except Exception as e:
+        bot.rooms.release(random_number)
+        await interaction.followup.send(f"❌ Failed to create ticket: {e}", ephemeral=True)
+        return
+    
+    # Anything failing before the ticket row exists must free its room number
+    try:
         # Create ticket embed
         embed = create_ticket_embed(
-            category=self.category,
+            category=category,
             requestor_id=interaction.user.id,
-            in_game_name=self.in_game_name.value,
-            concerns=self.concerns.value or "None",
+            in_game_name=in_game_name,
+            concerns=concerns,
             helpers=[],
             random_number=random_number,
-            selected_bosses=self.selected_bosses,
-            selected_server=self.selected_server
+            selected_bosses=selected_bosses,
+            selected_server=selected_server
         )
-        
+    
         # Create ticket action buttons
         view = TicketActionView()
-        
+    
         # Send ticket message with REQUESTOR + HELPER ROLE PING
         ping_content = f"{interaction.user.mention}"
+        helper_role = guild.get_role(config.ROLE_IDS.get("HELPER"))
         if helper_role:
             ping_content += f" <@&{helper_role.id}>"
         ping_content += " ticket created!"
-        
+    
         ticket_msg = await channel.send(
             content=ping_content,
             embed=embed,
             view=view
         )
-       
-        # PIN THE TICKET MESSAGE (with system message cleanup)
-        try:
-            await ticket_msg.pin(reason="Ticket embed auto-pinned for easy access")
-            print(f"✅ Pinned ticket message in {channel.name}")
-            
-            # Wait a moment for the system message to appear
-            await asyncio.sleep(1)
-            
-            # Delete the "X pinned a message" system notification
-            async for msg in channel.history(limit=10):
-                if msg.type == discord.MessageType.pins_add:
-                    try:
-                        await msg.delete()
-                        print(f"✅ Deleted pin notification in {channel.name}")
-                    except Exception as e:
-                        print(f"⚠️ Could not delete pin notification: {e}")
-                    break
-        except discord.Forbidden:
-            print(f"❌ Bot lacks permission to pin messages in {channel.name}")
-        except discord.HTTPException as e:
-            print(f"❌ HTTP error while pinning: {e}")
-        except Exception as e:
-            print(f"❌ Unexpected error while pinning: {e}")
-            traceback.print_exc()
-        
+        get_embed_updater(bot, channel.id).mark_sent(embed)
+   
         # Save ticket to database
-        await bot.db.save_ticket({
+        ticket = {
             "channel_id": channel.id,
-            "category": self.category,
+            "category": category,
             "requestor_id": interaction.user.id,
             "helpers": [],
-            "points": config.POINT_VALUES.get(self.category, 0),
+            "points": registry.points(category),
             "random_number": random_number,
             "proof_submitted": False,
             "embed_message_id": ticket_msg.id,
-            "in_game_name": self.in_game_name.value,
-            "concerns": self.concerns.value or "None",
-            "selected_bosses": json.dumps(self.selected_bosses),
-            "selected_server": self.selected_server,
+            "in_game_name": in_game_name,
+            "concerns": concerns,
+            "selected_bosses": json.dumps(selected_bosses),
+            "selected_server": selected_server,
             "is_closed": False
-        })
-        
-        # Send confirmation in panel channel (ephemeral)
-        await interaction.followup.send(
-            f"✅ Ticket created: {channel.mention}\n\n"
-            f"💡 **Click the 'Show Room Info' button in your ticket to see the room number!**",
-            ephemeral=True
-        )
+        }
+        await bot.db.save_ticket(ticket)
+    except Exception:
+        bot.rooms.release(random_number)
+        raise
+    bot.ticket_events.record(ticket, ticket_events.CREATED, user_id=interaction.user.id)
+    
+    # Offer it to helpers waiting in /queue, start its idle timer
+    bot.matchmaker.ticket_opened(ticket)
+    bot.reaper.ticket_opened(channel.id, category)
+    
+    # Send confirmation in panel channel (ephemeral)
+    await interaction.followup.send(
+        f"✅ Ticket created: {channel.mention}\n\n"
+        f"💡 **Click the 'Show Room Info' button in your ticket to see the room number!**",
+        ephemeral=True
+    )
+    
+    # Pinning is cosmetic - do it after the user already has their ticket
+    spawn(pin_ticket_message(ticket_msg), name=f"pin-ticket-{channel.id}")
+    
+    # Remembered for "Same as last time" on the user's next ticket
+    spawn(
+        bot.db.save_ticket_preferences(interaction.user.id, category, selected_bosses, selected_server, in_game_name),
+        name=f"ticket-prefs-{interaction.user.id}"
+    )
+
+
+async def pin_ticket_message(ticket_msg: discord.Message):
+    """Pin the ticket embed. The "X pinned a message" notice is removed by
+    on_pin_notice when it arrives, instead of sleeping and scanning history."""
+    channel = ticket_msg.channel
+    pending_pin_notices[channel.id] = ticket_msg.id
+    # Forget the pin if its notice never shows up
+    asyncio.get_running_loop().call_later(
+        PIN_NOTICE_TIMEOUT, pending_pin_notices.pop, channel.id, None
+    )
+    
+    try:
+        await ticket_msg.pin(reason="Ticket embed auto-pinned for easy access")
+        print(f"✅ Pinned ticket message in {channel.name}")
+    except discord.Forbidden:
+        pending_pin_notices.pop(channel.id, None)
+        print(f"❌ Bot lacks permission to pin messages in {channel.name}")
+    except discord.HTTPException as e:
+        pending_pin_notices.pop(channel.id, None)
+        print(f"❌ HTTP error while pinning: {e}")
+
+
+async def on_pin_notice(message: discord.Message):
+    """Delete the system notice for a ticket embed the bot just pinned"""
+    if message.type != discord.MessageType.pins_add:
+        return
+    
+    pinned_id = pending_pin_notices.get(message.channel.id)
+    if pinned_id is None:
+        return
+    if message.reference and message.reference.message_id not in (None, pinned_id):
+        return
+    
+    pending_pin_notices.pop(message.channel.id, None)
+    try:
+        await message.delete()
+        print(f"✅ Deleted pin notification in {message.channel.name}")
+    except Exception as e:
+        print(f"⚠️ Could not delete pin notification: {e}")
 
 
 class TicketActionView(discord.ui.View):
@@ -424,8 +563,7 @@ class TicketActionView(discord.ui.View):
             return
         
         # Check permissions - ONLY staff/admin/officer or requestor or helpers who JOINED
-        member = interaction.user
-        is_staff = any(member.get_role(rid) for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF"), config.ROLE_IDS.get("OFFICER")] if rid)
+        is_staff = can(interaction.user, "view_room")
         is_requestor = interaction.user.id == ticket["requestor_id"]
         is_helper_in_ticket = interaction.user.id in ticket["helpers"]
         
@@ -434,15 +572,7 @@ class TicketActionView(discord.ui.View):
             return
         
         # Parse selected bosses
-        try:
-            selected_bosses_raw = ticket.get("selected_bosses", "[]")
-            if isinstance(selected_bosses_raw, str):
-                selected_bosses = json.loads(selected_bosses_raw)
-            else:
-                selected_bosses = selected_bosses_raw or []
-        except:
-            selected_bosses = []
-        
+        selected_bosses = get_selected_bosses(ticket)
         selected_server = ticket.get("selected_server", "Unknown")
         
         # Generate join commands
@@ -469,6 +599,7 @@ class TicketActionView(discord.ui.View):
             )
     
     @discord.ui.button(label="Leave Ticket", style=discord.ButtonStyle.secondary, emoji="🚪", custom_id="leave_ticket_persistent", row=0)
+    @timed("ticket.leave")
     async def leave_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Helper leaves ticket - WITH 120 SECOND COOLDOWN"""
         # Check cooldown
@@ -499,331 +630,253 @@ class TicketActionView(discord.ui.View):
         # Remove helper
         ticket["helpers"].remove(interaction.user.id)
         await bot.db.save_ticket(ticket)
+        bot.ticket_events.record(ticket, ticket_events.HELPER_LEFT, user_id=interaction.user.id)
+        bot.matchmaker.ticket_changed(ticket)
+        bot.reaper.touch(ticket["channel_id"])
         
         # Set cooldown
         set_cooldown(interaction.user.id, leave_cooldowns)
         
         # Remove channel permissions
         try:
-            await interaction.channel.set_permissions(interaction.user, overwrite=None)
+            await revoke_ticket_access(interaction.channel, interaction.user)
         except Exception as e:
             print(f"Failed to remove permissions: {e}")
         
-        # Update embed
-        try:
-            selected_bosses_raw = ticket.get("selected_bosses", "[]")
-            if isinstance(selected_bosses_raw, str):
-                selected_bosses = json.loads(selected_bosses_raw)
-            else:
-                selected_bosses = selected_bosses_raw or []
-        except:
-            selected_bosses = []
-        
-        selected_server = ticket.get("selected_server", "Unknown")
-        
-        embed = create_ticket_embed(
-            category=ticket["category"],
-            requestor_id=ticket["requestor_id"],
-            in_game_name=ticket.get("in_game_name", "N/A"),
-            concerns=ticket.get("concerns", "None"),
-            helpers=ticket["helpers"],
-            random_number=ticket["random_number"],
-            selected_bosses=selected_bosses,
-            selected_server=selected_server
-        )
-        
-        # Update ticket message
-        try:
-            msg = await interaction.channel.fetch_message(ticket["embed_message_id"])
-            await msg.edit(embed=embed)
-        except Exception as e:
-            print(f"Failed to update embed: {e}")
+        # Update embed (edits in place, no fetch)
+        await update_ticket_embed(bot, ticket, interaction.channel)
         
         await interaction.response.send_message(f"✅ You've left the ticket!", ephemeral=True)
-        await interaction.channel.send(f"🚪 {interaction.user.mention} left the ticket.")
+        interaction.client.rest.send(interaction.channel, f"🚪 {interaction.user.mention} left the ticket.")
     
     @discord.ui.button(label="Join Ticket", style=discord.ButtonStyle.success, emoji="✅", custom_id="ticket_join_persistent", row=1)
+    @timed("ticket.join")
     async def join_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Helper joins ticket - ONE TICKET AT A TIME - WITH RACE CONDITION PROTECTION AND 120 SECOND COOLDOWN"""
-        # Check cooldown FIRST
-        remaining = check_cooldown(interaction.user.id, join_cooldowns)
-        if remaining:
-            await interaction.response.send_message(
-                f"⏳ You're on cooldown! Please wait **{remaining} seconds** before joining another ticket.",
-                ephemeral=True
-            )
-            return
-        
-        # === ACQUIRE LOCK TO PREVENT RACE CONDITIONS ===
-        lock = get_ticket_lock(interaction.channel_id)
-        
-        async with lock:  # Only one person can execute this block at a time
+        try:
+            _, message = await add_helper_to_ticket(interaction.client, interaction.channel, interaction.user)
+            await interaction.response.send_message(message, ephemeral=True)
+        except Exception as e:
+            print(f"❌ Join button error: {e}")
+            import traceback
+            traceback.print_exc()
             try:
-                bot = interaction.client
-                
-                # === FRESH DATABASE READ (CRITICAL FOR RACE CONDITION FIX) ===
-                ticket = await bot.db.get_ticket(interaction.channel_id)
-                
-                if not ticket:
-                    await interaction.response.send_message("❌ No active ticket found.", ephemeral=True)
-                    return
-                
-                if ticket.get("is_closed", False):
-                    await interaction.response.send_message("❌ This ticket is already closed.", ephemeral=True)
-                    return
-                
-                # Check if user is requestor
-                if interaction.user.id == ticket["requestor_id"]:
-                    await interaction.response.send_message("❌ You cannot join your own ticket!", ephemeral=True)
-                    return
-                
-                # Check if user is already a helper (FRESH CHECK)
-                if interaction.user.id in ticket["helpers"]:
-                    await interaction.response.send_message("❌ You've already joined this ticket!", ephemeral=True)
-                    return
-                
-                # Check if user is REQUESTOR of another active ticket - PREVENT JOINING
-                all_tickets = await bot.db.get_all_tickets()
-                for other_ticket in all_tickets:
-                    if other_ticket["channel_id"] == interaction.channel_id:
-                        continue
-                    if interaction.user.id == other_ticket["requestor_id"]:
-                        # Verify channel exists
-                        other_channel = interaction.guild.get_channel(other_ticket["channel_id"])
-                        if other_channel:
-                            await interaction.response.send_message(
-                                f"❌ You cannot join tickets while you have an active ticket as requestor: {other_channel.mention}\n"
-                                "Please close or cancel your ticket first.",
-                                ephemeral=True
-                            )
-                            return
-                
-                # Check if user is in another active ticket (with verification that ticket channel exists)
-                for other_ticket in all_tickets:
-                    if other_ticket["channel_id"] == interaction.channel_id:
-                        continue
-                    if interaction.user.id in other_ticket["helpers"]:
-                        # Verify the channel actually exists
-                        other_channel = interaction.guild.get_channel(other_ticket["channel_id"])
-                        if other_channel:
-                            # Channel exists, user is actually in another ticket
-                            await interaction.response.send_message(
-                                f"❌ You're already in another ticket: {other_channel.mention}\n"
-                                "You must leave that ticket before joining a new one.\n\n"
-                                "*If you believe this is an error, ask an admin to run `/free_helper @you`*",
-                                ephemeral=True
-                            )
-                            return
-                        else:
-                            # Channel doesn't exist - remove user from phantom ticket
-                            print(f"⚠️ Removing {interaction.user.id} from phantom ticket {other_ticket['channel_id']}")
-                            other_ticket["helpers"].remove(interaction.user.id)
-                            await bot.db.save_ticket(other_ticket)
-                
-                # Check if ticket is full (FRESH CHECK WITH LATEST DATA)
-                max_helpers = config.HELPER_SLOTS.get(ticket["category"], 3)
-                if len(ticket["helpers"]) >= max_helpers:
-                    await interaction.response.send_message(
-                        f"❌ This ticket is full! ({len(ticket['helpers'])}/{max_helpers} helpers)",
-                        ephemeral=True
-                    )
-                    return
-                
-                # Check if user has helper role
-                helper_role = interaction.guild.get_role(config.ROLE_IDS.get("HELPER"))
-                if helper_role and helper_role not in interaction.user.roles:
-                    await interaction.response.send_message("❌ You need the Helper role to join tickets!", ephemeral=True)
-                    return
-                
-                # === SET COOLDOWN AFTER ALL CHECKS PASS ===
-                set_cooldown(interaction.user.id, join_cooldowns)
-                
-                # Add helper
-                ticket["helpers"].append(interaction.user.id)
-                await bot.db.save_ticket(ticket)
-                
-                # Grant channel permissions
-                await interaction.channel.set_permissions(
-                    interaction.user,
-                    view_channel=True,
-                    send_messages=True,
-                    read_message_history=True
-                )
-                
-                # Update embed
-                try:
-                    selected_bosses_raw = ticket.get("selected_bosses", "[]")
-                    if isinstance(selected_bosses_raw, str):
-                        selected_bosses = json.loads(selected_bosses_raw)
-                    else:
-                        selected_bosses = selected_bosses_raw or []
-                except:
-                    selected_bosses = []
-                
-                selected_server = ticket.get("selected_server", "Unknown")
-                
-                embed = create_ticket_embed(
-                    category=ticket["category"],
-                    requestor_id=ticket["requestor_id"],
-                    in_game_name=ticket.get("in_game_name", "N/A"),
-                    concerns=ticket.get("concerns", "None"),
-                    helpers=ticket["helpers"],
-                    random_number=ticket["random_number"],
-                    selected_bosses=selected_bosses,
-                    selected_server=selected_server
-                )
-                
-                # Update ticket message
-                try:
-                    msg = await interaction.channel.fetch_message(ticket["embed_message_id"])
-                    await msg.edit(embed=embed)
-                except Exception as e:
-                    print(f"Failed to update embed: {e}")
-                
-                # Generate join commands
-                join_commands = generate_join_commands(
-                    ticket["category"],
-                    selected_bosses,
-                    ticket["random_number"],
-                    selected_server
-                )
-                
-                # Show room number to helper
-                if join_commands:
-                    await interaction.response.send_message(
-                        f"✅ You've joined the ticket!\n\n"
-                        f"🎮 **Room Number: `{ticket['random_number']}`**\n\n"
-                        f"**Join Commands:**\n{join_commands}\n\n"
-                        f"⚠️ **DO NOT share this room number with anyone outside this ticket!**",
-                        ephemeral=True
-                    )
-                else:
-                    await interaction.response.send_message(
-                        f"✅ You've joined the ticket!\n\n"
-                        f"🎮 **Room Number: `{ticket['random_number']}`**\n\n"
-                        f"⚠️ **DO NOT share this room number with anyone outside this ticket!**",
-                        ephemeral=True
-                    )
-                
-                # Notify channel
-                await interaction.channel.send(f"✅ {interaction.user.mention} joined the ticket!")
-            
-            except Exception as e:
-                print(f"❌ Join button error: {e}")
-                import traceback
-                traceback.print_exc()
-                try:
-                    await interaction.response.send_message(f"❌ An error occurred: {str(e)}", ephemeral=True)
-                except:
-                    await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
+                await interaction.response.send_message(f"❌ An error occurred: {str(e)}", ephemeral=True)
+            except:
+                await interaction.followup.send(f"❌ An error occurred: {str(e)}", ephemeral=True)
     
     @discord.ui.button(label="Close Ticket", style=discord.ButtonStyle.danger, emoji="🔒", custom_id="ticket_close_persistent", row=1)
+    @timed("ticket.close")
     async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Close ticket with rewards - STAFF/ADMIN/OFFICER/REQUESTOR"""
+        await self._finish(interaction, cancelled=False)
+    
+    @discord.ui.button(label="Cancel Ticket", style=discord.ButtonStyle.secondary, emoji="❌", custom_id="ticket_cancel_persistent", row=1)
+    @timed("ticket.cancel")
+    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Cancel ticket - STAFF/ADMIN/OFFICER/REQUESTOR"""
+        await self._finish(interaction, cancelled=True)
+    
+    async def _finish(self, interaction: discord.Interaction, cancelled: bool):
+        """Shared close/cancel entry point - checks, then hands off to close_ticket"""
         bot = interaction.client
-        ticket = await bot.db.get_ticket(interaction.channel_id)
+        action = "cancel" if cancelled else "close"
+        
+        # Lock so a simultaneous Close + Cancel can't both pass the is_closed check
+        async with get_ticket_lock(interaction.channel_id):
+            ticket = await bot.db.get_ticket(interaction.channel_id)
+            
+            if not ticket:
+                await interaction.response.send_message("❌ No active ticket found.", ephemeral=True)
+                return
+            
+            if ticket.get("is_closed", False):
+                await interaction.response.send_message("❌ This ticket is already closed.", ephemeral=True)
+                return
+            
+            is_staff = can(interaction.user, "close_ticket")
+            is_requestor = interaction.user.id == ticket["requestor_id"]
+            
+            if not (is_staff or is_requestor):
+                await interaction.response.send_message(f"❌ Only staff, officers, admins, or the requestor can {action} tickets.", ephemeral=True)
+                return
+            
+            await interaction.response.defer()
+            
+            await close_ticket(
+                bot,
+                interaction.channel,
+                ticket,
+                closed_by=interaction.user,
+                cancelled=cancelled,
+                followup=interaction.followup
+            )
+
+
+# Outcomes of add_helper_to_ticket
+JOINED = "joined"
+JOIN_COOLDOWN = "cooldown"        # helper must wait before joining again
+JOIN_TICKET_REFUSED = "ticket"    # this ticket can't take this helper (closed, full, own ticket...)
+JOIN_HELPER_REFUSED = "helper"    # this helper can't join any ticket right now
+
+
+async def add_helper_to_ticket(bot, channel, member: discord.Member):
+    """Add a helper to a ticket - ONE TICKET AT A TIME - WITH RACE CONDITION PROTECTION AND 120 SECOND COOLDOWN
+    
+    Shared by the Join button and the matchmaking queue. Returns (outcome, message
+    for the helper); on success the message carries the room number and join commands."""
+    # Check cooldown FIRST
+    remaining = check_cooldown(member.id, join_cooldowns)
+    if remaining:
+        return JOIN_COOLDOWN, f"⏳ You're on cooldown! Please wait **{remaining} seconds** before joining another ticket."
+    
+    # === ACQUIRE LOCK TO PREVENT RACE CONDITIONS ===
+    lock = get_ticket_lock(channel.id)
+    
+    async with lock:  # Only one person can execute this block at a time
+        # === FRESH DATABASE READ (CRITICAL FOR RACE CONDITION FIX) ===
+        ticket = await bot.db.get_ticket(channel.id)
         
         if not ticket:
-            await interaction.response.send_message("❌ No active ticket found.", ephemeral=True)
-            return
+            return JOIN_TICKET_REFUSED, "❌ No active ticket found."
         
         if ticket.get("is_closed", False):
-            await interaction.response.send_message("❌ This ticket is already closed.", ephemeral=True)
-            return
-        
-        member = interaction.user
-        is_staff = any(member.get_role(rid) for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF"), config.ROLE_IDS.get("OFFICER")] if rid)
-        is_requestor = interaction.user.id == ticket["requestor_id"]
-        
-        if not (is_staff or is_requestor):
-            await interaction.response.send_message("❌ Only staff, officers, admins, or the requestor can close tickets.", ephemeral=True)
-            return
-        
-        await interaction.response.defer()
+            return JOIN_TICKET_REFUSED, "❌ This ticket is already closed."
         
-        guild = interaction.guild
-        admin_role = guild.get_role(config.ROLE_IDS.get("ADMIN"))
-        staff_role = guild.get_role(config.ROLE_IDS.get("STAFF"))
-        officer_role = guild.get_role(config.ROLE_IDS.get("OFFICER"))
-        helper_role = guild.get_role(config.ROLE_IDS.get("HELPER"))
+        # Check if user is requestor
+        if member.id == ticket["requestor_id"]:
+            return JOIN_TICKET_REFUSED, "❌ You cannot join your own ticket!"
         
-        # === STEP 1: REMOVE PERMISSIONS IMMEDIATELY ===
-        new_overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-        }
+        # Check if user is already a helper (FRESH CHECK)
+        if member.id in ticket["helpers"]:
+            return JOIN_TICKET_REFUSED, "❌ You've already joined this ticket!"
         
-        # ADMIN/STAFF/OFFICER roles get full access + manage channels
-        if admin_role:
-            new_overwrites[admin_role] = discord.PermissionOverwrite(
-                view_channel=True, 
-                send_messages=True, 
-                read_message_history=True,
-                manage_channels=True,
-                manage_permissions=True
-            )
-        if staff_role:
-            new_overwrites[staff_role] = discord.PermissionOverwrite(
-                view_channel=True, 
-                send_messages=True, 
-                read_message_history=True,
-                manage_channels=True,
-                manage_permissions=True
-            )
-        if officer_role:
-            new_overwrites[officer_role] = discord.PermissionOverwrite(
-                view_channel=True, 
-                send_messages=True, 
-                read_message_history=True
-            )
-        
-        # Block requestor UNLESS they are staff/officer/admin
-        requestor = guild.get_member(ticket["requestor_id"])
-        if requestor:
-            is_requestor_staff = (admin_role and admin_role in requestor.roles) or \
-                                 (staff_role and staff_role in requestor.roles) or \
-                                 (officer_role and officer_role in requestor.roles)
-            
-            if not is_requestor_staff:
-                # Regular requestor - block access
-                new_overwrites[requestor] = discord.PermissionOverwrite(
-                    view_channel=False,
-                    send_messages=False,
-                    read_message_history=False
+        # Check if user is REQUESTOR or HELPER of another active ticket - PREVENT JOINING
+        # (no channel checks: the reconciler retires tickets whose channel was deleted)
+        all_tickets = await bot.db.get_all_tickets()
+        for other_ticket in all_tickets:
+            if other_ticket["channel_id"] == channel.id:
+                continue
+            if member.id == other_ticket["requestor_id"]:
+                return JOIN_HELPER_REFUSED, (
+                    f"❌ You cannot join tickets while you have an active ticket as requestor: <#{other_ticket['channel_id']}>\n"
+                    "Please close or cancel your ticket first."
+                )
+            if member.id in other_ticket["helpers"]:
+                return JOIN_HELPER_REFUSED, (
+                    f"❌ You're already in another ticket: <#{other_ticket['channel_id']}>\n"
+                    "You must leave that ticket before joining a new one.\n\n"
+                    "*If you believe this is an error, ask an admin to run `/free_helper @you`*"
                 )
-            # If requestor IS staff/officer/admin, they keep access via role permissions
         
-        # Remove all helpers
-        for helper_id in ticket["helpers"]:
-            helper = guild.get_member(helper_id)
-            if helper:
-                is_helper_staff = (admin_role and admin_role in helper.roles) or \
-                                  (staff_role and staff_role in helper.roles) or \
-                                  (officer_role and officer_role in helper.roles)
-                if not is_helper_staff:
-                    new_overwrites[helper] = discord.PermissionOverwrite(
-                        view_channel=False,
-                        send_messages=False,
-                        read_message_history=False
-                    )
+        # Check if ticket is full (FRESH CHECK WITH LATEST DATA)
+        max_helpers = registry.slots(ticket["category"])
+        if len(ticket["helpers"]) >= max_helpers:
+            return JOIN_TICKET_REFUSED, f"❌ This ticket is full! ({len(ticket['helpers'])}/{max_helpers} helpers)"
         
-        # Block Helper ROLE
-        if helper_role:
-            new_overwrites[helper_role] = discord.PermissionOverwrite(
-                view_channel=False,
-                send_messages=False,
-                read_message_history=False
-            )
+        # Check if user has helper role
+        helper_role = channel.guild.get_role(config.ROLE_IDS.get("HELPER"))
+        if helper_role and helper_role not in member.roles:
+            return JOIN_HELPER_REFUSED, "❌ You need the Helper role to join tickets!"
+        
+        # === SET COOLDOWN AFTER ALL CHECKS PASS ===
+        set_cooldown(member.id, join_cooldowns)
         
-        await interaction.channel.edit(overwrites=new_overwrites)
+        # Add helper
+        ticket["helpers"].append(member.id)
+        await bot.db.save_ticket(ticket)
+        bot.ticket_events.record(ticket, ticket_events.HELPER_JOINED, user_id=member.id)
         
-        # === STEP 2: CREATE FINAL EMBED ===
-        helpers_text = ", ".join([f"<@{h}>" for h in ticket["helpers"]]) if ticket["helpers"] else "None"
+        # Grant channel permissions (or thread membership)
+        await grant_ticket_access(channel, member)
         
-        # Get points per helper
-        points_per = config.POINT_VALUES.get(ticket["category"], 0)
-        total_points = points_per * len(ticket["helpers"]) if ticket["helpers"] else 0
+        # Update embed (edits in place, no fetch)
+        await update_ticket_embed(bot, ticket, channel)
         
+        # Joined by hand or matched - either way they no longer need a queue spot
+        bot.matchmaker.helper_placed(member.id)
+        bot.matchmaker.ticket_changed(ticket)
+        bot.reaper.touch(channel.id)
+    
+    selected_bosses = get_selected_bosses(ticket)
+    selected_server = ticket.get("selected_server", "Unknown")
+    
+    # Generate join commands
+    join_commands = generate_join_commands(
+        ticket["category"],
+        selected_bosses,
+        ticket["random_number"],
+        selected_server
+    )
+    
+    # Notify channel
+    bot.rest.send(channel, f"✅ {member.mention} joined the ticket!")
+    
+    # Show room number to helper
+    if join_commands:
+        return JOINED, (
+            f"✅ You've joined the ticket!\n\n"
+            f"🎮 **Room Number: `{ticket['random_number']}`**\n\n"
+            f"**Join Commands:**\n{join_commands}\n\n"
+            f"⚠️ **DO NOT share this room number with anyone outside this ticket!**"
+        )
+    return JOINED, (
+        f"✅ You've joined the ticket!\n\n"
+        f"🎮 **Room Number: `{ticket['random_number']}`**\n\n"
+        f"⚠️ **DO NOT share this room number with anyone outside this ticket!**"
+    )
+
+
+def is_member_staff(member: discord.Member) -> bool:
+    """Admin/staff/officer members keep access to closed tickets"""
+    return can(member, "keep_ticket_access")
+
+
+def build_closed_overwrites(bot, guild: discord.Guild, ticket: dict) -> dict:
+    """Overwrites for a closed/cancelled ticket - staff keep access, everyone else is locked out"""
+    return bot.overwrite_templates.ticket_closed(guild, ticket, is_member_staff)
+
+
+async def close_ticket(bot, channel, ticket: dict, closed_by, cancelled: bool = False, followup=None):
+    """Close or cancel a ticket as a staged pipeline.
+    
+    1. Commit state: mark the ticket closed so no more joins/closes get through.
+    2. User-visible result: lock the channel and post the final embed + delete
+       button concurrently.
+    3. Bookkeeping (points, counter, history, active row) in the background.
+    4. Transcript generation/upload as a background job with retries.
+    
+    `followup` is the interaction webhook when a user triggered the close;
+    without it the delete button is posted straight to the channel."""
+    guild = channel.guild
+    
+    # === STAGE 1: COMMIT STATE ===
+    discard_embed_updater(channel.id)
+    bot.matchmaker.ticket_closed(channel.id)
+    bot.reaper.ticket_closed(channel.id)
+    bot.rooms.release(ticket.get("random_number"))
+    ticket["is_closed"] = True
+    await bot.db.save_ticket(ticket)
+    bot.ticket_events.record(
+        ticket, ticket_events.CANCELLED if cancelled else ticket_events.CLOSED, actor_id=closed_by.id
+    )
+    
+    # === STAGE 2: USER-VISIBLE RESULT (concurrent Discord calls) ===
+    helpers_text = ", ".join([f"<@{h}>" for h in ticket["helpers"]]) if ticket["helpers"] else "None"
+    points_per = 0 if cancelled else registry.points(ticket["category"])
+    total_points = points_per * len(ticket["helpers"]) if ticket["helpers"] else 0
+    
+    if cancelled:
+        final_embed = discord.Embed(
+            title=f"❌ {ticket['category']} (Cancelled)",
+            description="**This ticket was cancelled. No points were awarded.**",
+            color=config.COLORS["DANGER"],
+            timestamp=discord.utils.utcnow()
+        )
+        final_embed.add_field(name="Requestor", value=f"<@{ticket['requestor_id']}>", inline=False)
+        final_embed.add_field(name="Helpers", value=helpers_text, inline=False)
+        final_embed.set_footer(text=f"Cancelled by {closed_by}")
+    else:
         final_embed = discord.Embed(
             title=f"✅ {ticket['category']} (Completed)",
             description="**Ticket Completed! Points awarded to all helpers.**",
@@ -834,248 +887,175 @@ class TicketActionView(discord.ui.View):
         final_embed.add_field(name="Helpers", value=helpers_text, inline=False)
         final_embed.add_field(name="Points per Helper", value=f"**{points_per}**", inline=True)
         final_embed.add_field(name="Total Points Awarded", value=f"**{total_points}**", inline=True)
-        final_embed.set_footer(text=f"Closed by {interaction.user}")
-        
-        await interaction.channel.send(embed=final_embed)
-        
-        # === STEP 3: AWARD POINTS ===
-        volunteer_role = guild.get_role(config.ROLE_IDS.get("VOLUNTEER"))
+        final_embed.set_footer(text=f"Closed by {closed_by}")
+    
+    delete_embed = discord.Embed(
+        title="🗑️ Delete Channel?",
+        description=(
+            f"This ticket has been {'cancelled' if cancelled else 'closed'}.\n\n"
+            "Click the button below to delete this channel.\n"
+            "Only staff can delete the channel."
+        ),
+        color=config.COLORS["DANGER"] if cancelled else config.COLORS["SUCCESS"]
+    )
+    
+    bucket = ("channel", channel.id)
+    
+    async def post_result():
+        # Sequential so the final embed always appears above the delete button
+        await bot.rest.run(LANE_STATE, lambda: channel.send(embed=final_embed), bucket)
+        if followup:
+            await followup.send(embed=delete_embed, view=DeleteChannelView(), ephemeral=False)
+        else:
+            await bot.rest.run(LANE_STATE, lambda: channel.send(embed=delete_embed, view=DeleteChannelView()), bucket)
+    
+    if isinstance(channel, discord.Thread):
+        # Thread mode: drop the requestor/helpers from the thread and lock it
+        removals = []
+        for user_id in [ticket["requestor_id"], *ticket["helpers"]]:
+            member = guild.get_member(user_id)
+            if not (member and is_member_staff(member)):
+                removals.append(user_id)
+        lock_step = bot.rest.run(LANE_STATE, lambda: lock_ticket_thread(channel, removals), bucket)
+    else:
+        overwrites = build_closed_overwrites(bot, guild, ticket)
+        lock_step = bot.rest.run(LANE_STATE, lambda: channel.edit(overwrites=overwrites), bucket)
+    
+    results = await asyncio.gather(
+        lock_step,
+        post_result(),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"⚠️ Close step failed in {channel.name}: {result}")
+    
+    # === STAGE 3: BOOKKEEPING (background) ===
+    spawn(
+        _record_closed_ticket(bot, guild, ticket, closed_by.id, points_per, total_points, cancelled),
+        name=f"close-bookkeeping-{channel.id}"
+    )
+    
+    # === STAGE 4: TRANSCRIPT (background job with retries) ===
+    schedule_transcript(channel, bot, ticket, is_cancelled=cancelled)
+    
+    # Delete the channel after a grace period if nobody clicks the delete button
+    if config.TICKET_AUTO_DELETE_AFTER:
+        try:
+            await bot.jobs.delete_channel_later(
+                channel, delay=config.TICKET_AUTO_DELETE_AFTER, reason="Closed ticket grace period expired"
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to schedule auto-delete for {channel.name}: {e}")
 
+
+async def _record_closed_ticket(bot, guild, ticket: dict, closed_by_id: int, points_per: int, total_points: int, cancelled: bool):
+    """Award points and persist history for a ticket that was just closed"""
+    if not cancelled:
+        volunteer_role = guild.get_role(config.ROLE_IDS.get("VOLUNTEER"))
+        
         for helper_id in ticket["helpers"]:
             try:
                 # Check for volunteer role
                 helper_member = guild.get_member(helper_id)
                 if helper_member and volunteer_role and volunteer_role in helper_member.roles:
-                     print(f"ℹ️ {helper_member.name} is a Volunteer - Skipping points.")
-                     continue
-
+                    print(f"ℹ️ {helper_member.name} is a Volunteer - Skipping points.")
+                    continue
+                
                 new_points = await bot.db.add_points(helper_id, points_per)
                 print(f"✅ Awarded {points_per} points to {helper_id} (Total: {new_points})")
             except Exception as e:
                 print(f"⚠️ Failed to award points to {helper_id}: {e}")
         
-        # === STEP 4: DATABASE OPERATIONS ===
         try:
-            # Mark as closed
-            ticket["is_closed"] = True
-            await bot.db.save_ticket(ticket)
-            
-            # === NEW: INCREMENT TOTAL TICKETS COUNTER ===
-            try:
-                await bot.db.increment_total_tickets()
-                print(f"✅ Incremented total tickets counter")
-            except Exception as e:
-                print(f"⚠️ Failed to increment total tickets: {e}")
-            
-            # Generate transcript
-            try:
-                await generate_transcript(interaction.channel, bot, ticket)
-            except Exception as e:
-                print(f"⚠️ Transcript generation failed: {e}")
-            
-            # Save history
-            try:
-                await bot.db.save_ticket_history({
-                    "channel_id": ticket["channel_id"],
-                    "category": ticket["category"],
-                    "requestor_id": ticket["requestor_id"],
-                    "helpers": json.dumps(ticket["helpers"]),
-                    "points_per_helper": points_per,
-                    "total_points_awarded": total_points,
-                    "closed_by": interaction.user.id
-                })
-            except Exception as e:
-                print(f"⚠️ History save failed: {e}")
-            
-            # Delete from active
-            try:
-                await bot.db.delete_ticket(ticket["channel_id"])
-            except Exception as e:
-                print(f"⚠️ Ticket deletion failed: {e}")
-                
+            await bot.db.increment_total_tickets()
+            print(f"✅ Incremented total tickets counter")
         except Exception as e:
-            print(f"⚠️ Database error during close: {e}")
-            traceback.print_exc()
-        
-        # === SEND DELETE BUTTON ===
-        delete_embed = discord.Embed(
-            title="🗑️ Delete Channel?",
-            description=(
-                "This ticket has been closed.\n\n"
-                "Click the button below to delete this channel.\n"
-                "Only staff can delete the channel."
-            ),
-            color=config.COLORS["SUCCESS"]
-        )
-        
-        delete_view = DeleteChannelView()
-        await interaction.followup.send(embed=delete_embed, view=delete_view, ephemeral=False)
+            print(f"⚠️ Failed to increment total tickets: {e}")
     
-    @discord.ui.button(label="Cancel Ticket", style=discord.ButtonStyle.secondary, emoji="❌", custom_id="ticket_cancel_persistent", row=1)
-    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Cancel ticket - STAFF/ADMIN/OFFICER/REQUESTOR"""
-        bot = interaction.client
-        ticket = await bot.db.get_ticket(interaction.channel_id)
-        
-        if not ticket:
-            await interaction.response.send_message("❌ No active ticket found.", ephemeral=True)
-            return
-        
-        if ticket.get("is_closed", False):
-            await interaction.response.send_message("❌ This ticket is already closed.", ephemeral=True)
-            return
-        
-        member = interaction.user
-        is_staff = any(member.get_role(rid) for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF"), config.ROLE_IDS.get("OFFICER")] if rid)
-        is_requestor = interaction.user.id == ticket["requestor_id"]
-        
-        if not (is_staff or is_requestor):
-            await interaction.response.send_message("❌ Only staff, officers, admins, or the requestor can cancel tickets.", ephemeral=True)
-            return
-        
-        await interaction.response.defer()
-        
-        guild = interaction.guild
-        admin_role = guild.get_role(config.ROLE_IDS.get("ADMIN"))
-        staff_role = guild.get_role(config.ROLE_IDS.get("STAFF"))
-        officer_role = guild.get_role(config.ROLE_IDS.get("OFFICER"))
-        helper_role = guild.get_role(config.ROLE_IDS.get("HELPER"))
-        
-        # === STEP 1: REMOVE PERMISSIONS IMMEDIATELY ===
-        new_overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True),
+    # Save history
+    try:
+        history = {
+            "channel_id": ticket["channel_id"],
+            "category": ticket["category"],
+            "requestor_id": ticket["requestor_id"],
+            "helpers": json.dumps(ticket["helpers"]),
+            "points_per_helper": points_per,
+            "total_points_awarded": total_points,
+            "closed_by": closed_by_id
         }
-        
-        # ADMIN/STAFF/OFFICER roles get full access + manage channels
-        if admin_role:
-            new_overwrites[admin_role] = discord.PermissionOverwrite(
-                view_channel=True, 
-                send_messages=True, 
-                read_message_history=True,
-                manage_channels=True,
-                manage_permissions=True
-            )
-        if staff_role:
-            new_overwrites[staff_role] = discord.PermissionOverwrite(
-                view_channel=True, 
-                send_messages=True, 
-                read_message_history=True,
-                manage_channels=True,
-                manage_permissions=True
-            )
-        if officer_role:
-            new_overwrites[officer_role] = discord.PermissionOverwrite(
-                view_channel=True, 
-                send_messages=True, 
-                read_message_history=True
-            )
-        
-        # Block requestor UNLESS they are staff/officer/admin
-        requestor = guild.get_member(ticket["requestor_id"])
-        if requestor:
-            is_requestor_staff = (admin_role and admin_role in requestor.roles) or \
-                                 (staff_role and staff_role in requestor.roles) or \
-                                 (officer_role and officer_role in requestor.roles)
-            
-            if not is_requestor_staff:
-                # Regular requestor - block access
-                new_overwrites[requestor] = discord.PermissionOverwrite(
-                    view_channel=False,
-                    send_messages=False,
-                    read_message_history=False
-                )
-            # If requestor IS staff/officer/admin, they keep access via role permissions
-        
-        # Remove all helpers
-        for helper_id in ticket["helpers"]:
-            helper = guild.get_member(helper_id)
-            if helper:
-                is_helper_staff = (admin_role and admin_role in helper.roles) or \
-                                  (staff_role and staff_role in helper.roles) or \
-                                  (officer_role and officer_role in helper.roles)
-                if not is_helper_staff:
-                    new_overwrites[helper] = discord.PermissionOverwrite(
-                        view_channel=False,
-                        send_messages=False,
-                        read_message_history=False
-                    )
-        
-        # Block Helper ROLE
-        if helper_role:
-            new_overwrites[helper_role] = discord.PermissionOverwrite(
-                view_channel=False,
-                send_messages=False,
-                read_message_history=False
-            )
-        
-        await interaction.channel.edit(overwrites=new_overwrites)
-        
-        # === SEND CANCELLED EMBED ===
-        helpers_text = ", ".join([f"<@{h}>" for h in ticket["helpers"]]) if ticket["helpers"] else "None"
-        
-        cancelled_embed = discord.Embed(
-            title=f"❌ {ticket['category']} (Cancelled)",
-            description="**This ticket was cancelled. No points were awarded.**",
-            color=config.COLORS["DANGER"],
-            timestamp=discord.utils.utcnow()
-        )
-        cancelled_embed.add_field(name="Requestor", value=f"<@{ticket['requestor_id']}>", inline=False)
-        cancelled_embed.add_field(name="Helpers", value=helpers_text, inline=False)
-        cancelled_embed.set_footer(text=f"Cancelled by {interaction.user}")
-        
-        await interaction.channel.send(embed=cancelled_embed)
-        
-        # === SEND DELETE BUTTON ===
-        delete_embed = discord.Embed(
-            title="🗑️ Delete Channel?",
-            description=(
-                "This ticket has been cancelled.\n\n"
-                "Click the button below to delete this channel.\n"
-                "Only staff can delete the channel."
-            ),
-            color=config.COLORS["DANGER"]
-        )
-        
-        delete_view = DeleteChannelView()
-        await interaction.followup.send(embed=delete_embed, view=delete_view, ephemeral=False)
-        
-        # === DATABASE OPERATIONS ===
+        if cancelled:
+            history["cancelled"] = True
+        await bot.db.save_ticket_history(history)
+        bot.demand_heatmap.ticket_closed()
+    except Exception as e:
+        print(f"⚠️ History save failed: {e}")
+    
+    # Delete from active
+    try:
+        await bot.db.delete_ticket(ticket["channel_id"])
+    except Exception as e:
+        print(f"⚠️ Ticket deletion failed: {e}")
+
+
+async def retire_ticket(bot, channel_id: int, reason: str) -> bool:
+    """Cancel a ticket whose channel/thread no longer exists.
+    
+    Nothing is sent to Discord - the ticket gets a cancelled history entry
+    (no points) and its active row is dropped, which frees the requestor and
+    helpers. Returns False if the ticket was already closed or gone."""
+    async with get_ticket_lock(channel_id):
+        ticket = await bot.db.get_ticket(channel_id)
+        if not ticket or ticket.get("is_closed", False):
+            return False
+        
+        discard_embed_updater(channel_id)
+        bot.matchmaker.ticket_closed(channel_id)
+        bot.reaper.ticket_closed(channel_id)
+        bot.rooms.release(ticket.get("random_number"))
+        ticket["is_closed"] = True
+        bot.ticket_events.record(ticket, ticket_events.CANCELLED, actor_id=bot.user.id)
+        await _record_closed_ticket(bot, None, ticket, bot.user.id, 0, 0, cancelled=True)
+    
+    print(f"🧹 Retired ticket {channel_id} ({ticket['category']}): {reason}")
+    return True
+
+
+def schedule_transcript(channel, bot, ticket: dict, is_cancelled: bool = False) -> asyncio.Task:
+    """Generate and upload the transcript in the background, retrying on failure"""
+    task = spawn(
+        _transcript_job(channel, bot, ticket, is_cancelled),
+        name=f"transcript-{channel.id}"
+    )
+    transcript_jobs[channel.id] = task
+    task.add_done_callback(lambda _: transcript_jobs.pop(channel.id, None))
+    return task
+
+
+async def _transcript_job(channel, bot, ticket: dict, is_cancelled: bool):
+    for attempt in range(1, TRANSCRIPT_RETRIES + 1):
         try:
-            # Mark as closed (cancelled)
-            ticket["is_closed"] = True
-            await bot.db.save_ticket(ticket)
-            
-            # Generate transcript (cancelled)
-            try:
-                await generate_transcript(interaction.channel, bot, ticket, is_cancelled=True)
-            except Exception as e:
-                print(f"⚠️ Transcript generation failed: {e}")
-            
-            # Save history
-            try:
-                await bot.db.save_ticket_history({
-                    "channel_id": ticket["channel_id"],
-                    "category": ticket["category"],
-                    "requestor_id": ticket["requestor_id"],
-                    "helpers": json.dumps(ticket["helpers"]),
-                    "points_per_helper": 0,
-                    "total_points_awarded": 0,
-                    "closed_by": interaction.user.id,
-                    "cancelled": True
-                })
-            except Exception as e:
-                print(f"⚠️ History save failed: {e}")
-            
-            # Delete from active
-            try:
-                await bot.db.delete_ticket(ticket["channel_id"])
-            except Exception as e:
-                print(f"⚠️ Ticket deletion failed: {e}")
-                
+            await generate_transcript(channel, bot, ticket, is_cancelled=is_cancelled)
+            return
+        except discord.HTTPException as e:
+            if e.status == 413:
+                # Too large for this guild - the same file fails every time
+                print(f"❌ Transcript for {channel.name} rejected as too large: {e}")
+                return
+            print(f"⚠️ Transcript attempt {attempt}/{TRANSCRIPT_RETRIES} failed for {channel.name}: {e}")
+            if attempt < TRANSCRIPT_RETRIES:
+                await asyncio.sleep(2 ** attempt)
         except Exception as e:
-            print(f"⚠️ Database error during cancel: {e}")
-            traceback.print_exc()
+            print(f"⚠️ Transcript attempt {attempt}/{TRANSCRIPT_RETRIES} failed for {channel.name}: {e}")
+            if attempt < TRANSCRIPT_RETRIES:
+                await asyncio.sleep(2 ** attempt)
+
+
+async def wait_for_transcript(channel_id: int, timeout: float = 60):
+    """Block until a pending transcript for this channel is done (before deleting it)"""
+    task = transcript_jobs.get(channel_id)
+    if task:
+        await asyncio.wait({task}, timeout=timeout)
 
 
 class DeleteChannelView(discord.ui.View):
@@ -1086,65 +1066,22 @@ class DeleteChannelView(discord.ui.View):
     @discord.ui.button(label="Delete Channel", style=discord.ButtonStyle.danger, emoji="🗑️", custom_id="delete_channel_persistent")
     async def delete_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Delete the channel - STAFF/ADMIN/OFFICER ONLY"""
-        member = interaction.user
-        is_staff = any(member.get_role(rid) for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF"), config.ROLE_IDS.get("OFFICER")] if rid)
-        
-        if not is_staff:
+        if not can(interaction.user, "delete_channel"):
             await interaction.response.send_message("❌ Only staff, officers, or admins can delete the channel.", ephemeral=True)
             return
         
         await interaction.response.send_message(
-            f"🗑️ Channel will be deleted in 5 seconds...",
+            f"🗑️ Channel will be deleted in {config.CHANNEL_DELETE_DELAY} seconds...",
             ephemeral=False
         )
         
-        await asyncio.sleep(5)
-        try:
-            await interaction.channel.delete(reason=f"Ticket closed and deleted by {interaction.user}")
-        except:
-            pass
-
-
-def format_boss_name_for_select(boss: str) -> str:
-    """Format boss names correctly for SELECT DROPDOWN (remove Ultra from non-ultra bosses)"""
-    boss_select_names = {
-        "Ultra Lich": "Lich Lord",
-        "Ultra Beast": "Beast",
-        "Ultra Deimos": "Deimos",
-        "Ultra Flibbi": "Void Flibbi",
-        "Ultra Bane": "Void Nightbane",
-        "Ultra Xyfrag": "Void Xyfrag",
-        "Ultra Kathool": "Kathool",
-        "Ultra Astral": "Astral Shrine",
-        "Ultra Champion Drakath": "Champion Drakath"
-    }
-    
-    return boss_select_names.get(boss, boss)
-
-
-def format_boss_name_for_embed(boss: str) -> str:
-    """Format boss names for TICKET EMBED (merged names like voidflibbi, ultradage)"""
-    boss_embed_names = {
-        "Ultra Lich": "lichlord",
-        "Ultra Beast": "beast",
-        "Ultra Deimos": "deimos",
-        "Ultra Flibbi": "voidflibbi",
-        "Ultra Bane": "voidnightbane",
-        "Ultra Xyfrag": "voidxyfrag",
-        "Ultra Kathool": "kathool",
-        "Ultra Astral": "astralshrine",
-        "Ultra Champion Drakath": "championdrakath",
-        "Ultra Dage": "ultradage",
-        "Ultra Tyndarius": "ultratyndarius",
-        "Ultra Engineer": "ultraengineer",
-        "Ultra Warden": "ultrawarden",
-        "Ultra Ezrajal": "ultraezrajal",
-        "Ultra Nulgath": "ultranulgath",
-        "Ultra Drago": "ultradrago",
-        "Ultra Darkon": "ultradarkon"
-    }
-    
-    return boss_embed_names.get(boss, boss.lower().replace(" ", ""))
+        # Persisted, so a restart in the meantime doesn't orphan the channel
+        # (the job waits for the transcript before deleting)
+        await interaction.client.jobs.delete_channel_later(
+            interaction.channel,
+            delay=config.CHANNEL_DELETE_DELAY,
+            reason=f"Ticket closed and deleted by {interaction.user}"
+        )
 
 
 def create_ticket_embed(
@@ -1161,7 +1098,7 @@ def create_ticket_embed(
     embed = discord.Embed(
         title=f"🎫 {category}",
         description=(
-            f"{config.CATEGORY_METADATA.get(category, {}).get('description', 'Ticket')}\n\n"
+            f"{registry.description(category)}\n\n"
             f"🔢 **Click 'Show Room Info' button below to see the room number and join commands!**"
         ),
         color=config.COLORS["PRIMARY"],
@@ -1174,14 +1111,14 @@ def create_ticket_embed(
     
     if selected_bosses:
         # Format boss names as MERGED (voidflibbi, ultradage)
-        formatted_bosses = [format_boss_name_for_embed(boss) for boss in selected_bosses]
+        formatted_bosses = [registry.embed_name(boss) for boss in selected_bosses]
         embed.add_field(
             name="📋 Selected Bosses",
             value=", ".join(formatted_bosses),  # Comma-separated merged names
             inline=False
         )
     
-    slots = config.HELPER_SLOTS.get(category, 3)
+    slots = registry.slots(category)
     helpers_text = ", ".join([f"<@{h}>" for h in helpers]) if helpers else "Waiting for helpers..."
     embed.add_field(
         name=f"👥 Helpers ({len(helpers)}/{slots})",
@@ -1189,81 +1126,204 @@ def create_ticket_embed(
         inline=False
     )
     
-    points = config.POINT_VALUES.get(category, 0)
+    points = registry.points(category)
     embed.add_field(name="💰 Points per Helper", value=f"**{points}**", inline=True)
     
     if concerns != "None":
         embed.add_field(name="📝 Concerns", value=concerns, inline=False)
-    
+
     return embed
 
 
+def get_selected_bosses(ticket: dict) -> List[str]:
+    """Decode a ticket's selected bosses (stored as JSON text in SQLite)"""
+    try:
+        selected_bosses_raw = ticket.get("selected_bosses", "[]")
+        if isinstance(selected_bosses_raw, str):
+            return json.loads(selected_bosses_raw)
+        return selected_bosses_raw or []
+    except:
+        return []
+
+
+def build_ticket_embed(ticket: dict) -> discord.Embed:
+    """Render the live ticket embed from a ticket row"""
+    return create_ticket_embed(
+        category=ticket["category"],
+        requestor_id=ticket["requestor_id"],
+        in_game_name=ticket.get("in_game_name", "N/A"),
+        concerns=ticket.get("concerns", "None"),
+        helpers=ticket["helpers"],
+        random_number=ticket["random_number"],
+        selected_bosses=get_selected_bosses(ticket),
+        selected_server=ticket.get("selected_server", "Unknown")
+    )
+
+
+def _embed_fingerprint(embed: discord.Embed) -> str:
+    """Stable representation of an embed, ignoring the render timestamp"""
+    data = embed.to_dict()
+    data.pop("timestamp", None)
+    return json.dumps(data, sort_keys=True)
+
+
+class TicketEmbedUpdater:
+    """Coalesces embed edits for one ticket.
+
+    Changes submitted within EMBED_UPDATE_DELAY are collapsed into a single
+    edit of the latest state, and edits that would not change the rendered
+    embed are skipped entirely."""
+    def __init__(self, bot, channel_id: int):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.pending = None  # (ticket snapshot, channel) waiting to be applied
+        self.last_sent = None  # fingerprint of the embed currently on Discord
+        self.message_id = None  # embed re-posted by this updater (newer than queued snapshots)
+        self.task = None
+
+    def submit(self, ticket: dict, channel):
+        """Queue the latest ticket state; only the newest one is ever sent"""
+        snapshot = dict(ticket)
+        snapshot["helpers"] = list(ticket["helpers"])
+        self.pending = (snapshot, channel)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._flush_later())
+
+    def mark_sent(self, embed: discord.Embed):
+        """Record an embed that was posted outside the updater (ticket creation)"""
+        self.last_sent = _embed_fingerprint(embed)
+
+    def cancel(self):
+        self.pending = None
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+    async def _flush_later(self):
+        await asyncio.sleep(EMBED_UPDATE_DELAY)
+        # State submitted while an edit is in flight is picked up by the next loop
+        while self.pending:
+            ticket, channel = self.pending
+            self.pending = None
+            try:
+                await self._apply(ticket, channel)
+            except Exception as e:
+                print(f"Failed to update embed: {e}")
+
+    async def _apply(self, ticket: dict, channel):
+        channel = channel or self.bot.get_channel(self.channel_id)
+        if not channel:
+            return
+
+        embed = build_ticket_embed(ticket)
+        fingerprint = _embed_fingerprint(embed)
+        if fingerprint == self.last_sent:
+            return
+
+        message_id = self.message_id or ticket.get("embed_message_id")
+        if message_id:
+            try:
+                await self.bot.rest.run(
+                    LANE_STATE,
+                    lambda: channel.get_partial_message(message_id).edit(embed=embed),
+                    bucket=("channel", channel.id)
+                )
+                self.last_sent = fingerprint
+                return
+            except discord.NotFound:
+                print(f"⚠️ Ticket embed {message_id} missing in {channel.name}, re-posting")
+
+        # Fallback: the embed message was deleted - post a fresh one with the buttons
+        ticket_msg = await self.bot.rest.run(
+            LANE_STATE,
+            lambda: channel.send(embed=embed, view=TicketActionView()),
+            bucket=("channel", channel.id)
+        )
+        self.last_sent = fingerprint
+        self.message_id = ticket_msg.id
+        try:
+            await self.bot.db.set_ticket_embed_message(self.channel_id, ticket_msg.id)
+        except Exception as e:
+            print(f"⚠️ Failed to save re-posted embed ID: {e}")
+
+
+def get_embed_updater(bot, channel_id: int) -> TicketEmbedUpdater:
+    """Get or create the embed updater for a ticket channel"""
+    if channel_id not in embed_updaters:
+        embed_updaters[channel_id] = TicketEmbedUpdater(bot, channel_id)
+    return embed_updaters[channel_id]
+
+
+def discard_embed_updater(channel_id: int):
+    """Drop pending embed edits for a ticket that is closing"""
+    updater = embed_updaters.pop(channel_id, None)
+    if updater:
+        updater.cancel()
+
+
+async def update_ticket_embed(bot, ticket: dict, channel=None):
+    """Schedule a ticket embed refresh.
+    Edits go through a partial message (no fetch) and bursts are coalesced
+    into one edit; a missing embed message is re-posted."""
+    get_embed_updater(bot, ticket["channel_id"]).submit(ticket, channel)
+
+
 def generate_join_commands(category: str, selected_bosses: List[str], room_number: int, server: str) -> str:
     """Generate /join commands based on selected bosses IN CORRECT ORDER"""
-    commands = []
-    
-    # Define correct order for each category
-    if category == "Daily 4-Man Express":
-        # Order: Dage, Tyndarius, Engineer, Warden, Ezrajal
-        boss_order = ["Ultra Dage", "Ultra Tyndarius", "Ultra Engineer", "Ultra Warden", "Ultra Ezrajal"]
-        for boss in boss_order:
-            if boss in selected_bosses:
-                # Ultra + word together
-                commands.append(f"```/join ultra{boss.replace('Ultra ', '').lower()}-{room_number}```")
-    
-    elif category == "Daily 7-Man Express":
-        # Order: Lich, Beast, Deimos, Flibbi, Bane, Xyfrag, Kathool, Astral
-        boss_order = ["Ultra Lich", "Ultra Beast", "Ultra Deimos", "Ultra Flibbi", "Ultra Bane", 
-                      "Ultra Xyfrag", "Ultra Kathool", "Ultra Astral"]
-        for boss in boss_order:
-            if boss in selected_bosses:
-                # Special cases
-                if boss == "Ultra Lich":
-                    commands.append(f"```/join frozenlair-{room_number}```")
-                elif boss == "Ultra Beast":
-                    commands.append(f"```/join sevencircleswar-{room_number}```")
-                elif boss == "Ultra Deimos":
-                    commands.append(f"```/join deimos-{room_number}```")
-                elif boss == "Ultra Flibbi":
-                    commands.append(f"```/join voidflibbi-{room_number}```")
-                elif boss == "Ultra Bane":
-                    commands.append(f"```/join voidnightbane-{room_number}```")
-                elif boss == "Ultra Xyfrag":
-                    commands.append(f"```/join voidxyfrag-{room_number}```")
-                elif boss == "Ultra Kathool":
-                    commands.append(f"```/join kathooldepths-{room_number}```")
-                elif boss == "Ultra Astral":
-                    commands.append(f"```/join astralshrine-{room_number}```")
-
-    
-    elif category == "Weekly Ultra Express":
-        # Order: Dage > Nulgath > Drago > Darkon > CDrakath
-        boss_order = ["Ultra Dage", "Ultra Nulgath", "Ultra Drago", "Ultra Darkon", "Ultra Champion Drakath"]
-        for boss in boss_order:
-            if boss in selected_bosses:
-                if boss == "Ultra Champion Drakath":
-                    commands.append(f"```/join championdrakath-{room_number}```")
-                else:
-                    # Ultra + word together
-                    commands.append(f"```/join ultra{boss.replace('Ultra ', '').lower()}-{room_number}```")
-    
-    elif category == "UltraSpeaker Express":
-        commands.append(f"```/join ultraspeaker-{room_number}```")
-    
-    elif category == "Ultra Gramiel Express":
-        commands.append(f"```/join ultragramiel-{room_number}```")
-    
-    elif category == "GrimChallenge Express":
-        commands.append(f"```/join grimchallenge-{room_number}```")
-    
-    elif category == "Daily Temple Express":
-        commands.append(f"```/join templeshrine-{room_number}```")
-    
-    return "\n".join(commands) if commands else ""
+    return registry.join_commands(category, selected_bosses, room_number)
+
+
+def _transcript_row(msg: discord.Message) -> tuple:
+    """Pull the plain data out of a message (cheap, stays on the event loop)"""
+    author = f"{msg.author.name}#{msg.author.discriminator}" if msg.author.discriminator != "0" else msg.author.name
+    embeds = [
+        (embed.title, embed.description, [(field.name, field.value) for field in embed.fields])
+        for embed in msg.embeds
+    ]
+    attachments = [attachment.url for attachment in msg.attachments]
+    return (msg.created_at, author, msg.content, embeds, attachments)
+
+
+def _write_transcript_batch(fp, rows: List[tuple]):
+    """Format a page of messages and append it to the transcript file (runs in a worker thread)"""
+    lines = []
+    for created_at, author, content, embeds, attachments in rows:
+        timestamp = created_at.strftime('%Y-%m-%d %H:%M:%S')
+        if not content:
+            content = "[Embed/Attachment]" if (embeds or attachments) else ""
+        lines.append(f"[{timestamp}] {author}: {content}")
+        
+        for title, description, fields in embeds:
+            lines.append(f"  └─ Embed: {title or '(no title)'}")
+            if description:
+                lines.append(f"     {description}")
+            for name, value in fields:
+                lines.append(f"     • {name}: {value}")
+        
+        for url in attachments:
+            lines.append(f"  └─ Attachment: {url}")
+    
+    text = "\n".join(lines) + "\n"
+    fp.write(text.encode('utf-8'))
+    return text
+
+
+def _gzip_transcript(fp):
+    """Compress the finished transcript into a new spooled file (runs in a worker thread)"""
+    fp.seek(0)
+    compressed = tempfile.SpooledTemporaryFile(max_size=config.TRANSCRIPT_SPOOL_MAX_MEMORY)
+    with gzip.GzipFile(fileobj=compressed, mode="wb") as gz:
+        shutil.copyfileobj(fp, gz)
+    fp.close()
+    return compressed
 
 
 async def generate_transcript(channel: discord.TextChannel, bot, ticket: dict, is_cancelled: bool = False):
-    """Generate transcript and save to transcript channel"""
+    """Stream the full channel history into a transcript and post it to the transcript channel.
+    
+    History is consumed page by page and written to a spooled temp file, so memory
+    stays flat however long the ticket is, and no messages are dropped. Formatting
+    and compression run in a worker thread; large transcripts are gzipped, and
+    split into parts if they are still over the guild's upload limit."""
     transcript_channel_id = config.CHANNEL_IDS.get("TRANSCRIPT")
     
     if not transcript_channel_id:
@@ -1273,64 +1333,121 @@ async def generate_transcript(channel: discord.TextChannel, bot, ticket: dict, i
     if not transcript_channel:
         return
     
-    messages = []
-    async for msg in channel.history(limit=500, oldest_first=True):
-        messages.append(msg)
-    
+    loop = asyncio.get_running_loop()
     status = "CANCELLED" if is_cancelled else "CLOSED"
     
-    transcript_lines = [
-        f"=== TRANSCRIPT FOR {channel.name.upper()} ===",
-        f"Status: {status}",
-        f"Category: {ticket['category']}",
-        f"Requestor: {ticket['requestor_id']}",
-        f"Room Number: {ticket['random_number']}",
-        f"Created: {channel.created_at.strftime('%Y-%m-%d %H:%M:%S UTC')}",
-        "=" * 50,
-        ""
-    ]
-    
-    for msg in messages:
-        timestamp = msg.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        author = f"{msg.author.name}#{msg.author.discriminator}" if msg.author.discriminator != "0" else msg.author.name
-        content = msg.content or "[Embed/Attachment]"
+    fp = tempfile.SpooledTemporaryFile(max_size=config.TRANSCRIPT_SPOOL_MAX_MEMORY)
+    try:
+        header = [
+            f"=== TRANSCRIPT FOR {channel.name.upper()} ===",
+            f"Status: {status}",
+            f"Category: {ticket['category']}",
+            f"Requestor: {ticket['requestor_id']}",
+            f"Room Number: {ticket['random_number']}",
+            f"Created: {channel.created_at.strftime('%Y-%m-%d %H:%M:%S UTC')}",
+            "=" * 50,
+            ""
+        ]
+        fp.write(("\n".join(header) + "\n").encode('utf-8'))
         
-        transcript_lines.append(f"[{timestamp}] {author}: {content}")
+        # Index metadata + each formatted page for /ticket_search (best effort)
+        search_index = getattr(bot, "search_index", None)
+        search_doc_id = None
+        if search_index:
+            try:
+                search_doc_id = await search_index.begin_ticket(channel, ticket, status.lower())
+            except Exception as e:
+                print(f"⚠️ Search indexing failed for {channel.name}: {e}")
         
-        if msg.embeds:
-            for embed in msg.embeds:
-                if embed.title:
-                    transcript_lines.append(f"  └─ Embed: {embed.title}")
-    
-    transcript_text = "\n".join(transcript_lines)
-    
-    file = discord.File(
-        io.BytesIO(transcript_text.encode('utf-8')),
-        filename=f"transcript-{channel.name}-{ticket['random_number']}.txt"
-    )
-    
-    title_status = "Cancelled" if is_cancelled else "Closed"
-    
-    embed = discord.Embed(
-        title=f"📄 Transcript: {channel.name} ({title_status})",
-        description=f"**Category:** {ticket['category']}\n**Room Number:** {ticket['random_number']}\n**Status:** {title_status}",
-        color=config.COLORS["DANGER"] if is_cancelled else config.COLORS["PRIMARY"],
-        timestamp=discord.utils.utcnow()
-    )
-    
-    await transcript_channel.send(embed=embed, file=file)
+        async def index_page(text: str):
+            nonlocal search_doc_id
+            if search_doc_id is None:
+                return
+            try:
+                await search_index.add_transcript_chunk(search_doc_id, text)
+            except Exception as e:
+                print(f"⚠️ Search indexing failed for {channel.name}: {e}")
+                search_doc_id = None
+        
+        # Format page N in a worker thread while page N+1 is being fetched
+        message_count = 0
+        batch = []
+        pending_write = None
+        async for msg in channel.history(limit=None, oldest_first=True):
+            batch.append(_transcript_row(msg))
+            if len(batch) >= TRANSCRIPT_PAGE_SIZE:
+                if pending_write:
+                    await index_page(await pending_write)
+                pending_write = loop.run_in_executor(None, _write_transcript_batch, fp, batch)
+                message_count += len(batch)
+                batch = []
+        
+        if pending_write:
+            await index_page(await pending_write)
+        if batch:
+            await index_page(await loop.run_in_executor(None, _write_transcript_batch, fp, batch))
+            message_count += len(batch)
+        
+        if search_doc_id is not None:
+            try:
+                await search_index.commit()
+            except Exception as e:
+                print(f"⚠️ Search index commit failed: {e}")
+        
+        filename = f"transcript-{channel.name}-{ticket['random_number']}.txt"
+        if fp.tell() > config.TRANSCRIPT_GZIP_THRESHOLD:
+            fp = await loop.run_in_executor(None, _gzip_transcript, fp)
+            filename += ".gz"
+        size = fp.tell()
+        fp.seek(0)
+        
+        # Still over the upload limit after gzip - split the bytes into parts
+        # (`cat` them back together) rather than fail with 413 on every retry
+        part_size = transcript_channel.guild.filesize_limit
+        parts = max(1, -(-size // part_size))
+        
+        title_status = "Cancelled" if is_cancelled else "Closed"
+        
+        embed = discord.Embed(
+            title=f"📄 Transcript: {channel.name} ({title_status})",
+            description=(
+                f"**Category:** {ticket['category']}\n"
+                f"**Room Number:** {ticket['random_number']}\n"
+                f"**Status:** {title_status}\n"
+                f"**Messages:** {message_count:,}"
+                + (f"\n**Parts:** {parts} (join with `cat` before opening)" if parts > 1 else "")
+            ),
+            color=config.COLORS["DANGER"] if is_cancelled else config.COLORS["PRIMARY"],
+            timestamp=discord.utils.utcnow()
+        )
+        
+        # Low-priority lane - uploads never hold up interaction/state traffic
+        for part in range(1, parts + 1):
+            if parts == 1:
+                file = discord.File(fp, filename=filename)
+            else:
+                data = await loop.run_in_executor(None, fp.read, part_size)
+                file = discord.File(io.BytesIO(data), filename=f"{filename}.part{part}of{parts}")
+            await bot.rest.run(
+                LANE_LOG,
+                lambda file=file, embed=(embed if part == 1 else None): transcript_channel.send(embed=embed, file=file),
+                bucket=("channel", transcript_channel.id)
+            )
+    finally:
+        fp.close()
 
 
 async def setup_tickets(bot):
     """Setup ticket commands"""
     
+    # Event-driven cleanup of pin notices (guarded - on_ready can run more than once)
+    if on_pin_notice not in bot.extra_events.get("on_message", []):
+        bot.add_listener(on_pin_notice, "on_message")
+    
     @bot.tree.command(name="panel", description="Post the ticket panel (Staff only)")
     async def panel(interaction: discord.Interaction):
         """Post ticket panel"""
-        member = interaction.user
-        is_staff = any(member.get_role(rid) for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF")] if rid)
-        
-        if not is_staff:
+        if not can(interaction.user, "post_panel"):
             await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
             return
         
@@ -1374,10 +1491,7 @@ async def setup_tickets(bot):
     @bot.tree.command(name="free_helper", description="Remove a helper from all phantom tickets (Admin only)")
     async def free_helper(interaction: discord.Interaction, user: discord.Member):
         """Free a helper stuck in phantom tickets"""
-        member = interaction.user
-        is_admin = any(member.get_role(rid) for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF")] if rid)
-        
-        if not is_admin:
+        if not can(interaction.user, "free_helper"):
             await interaction.response.send_message("❌ Only admins can use this command.", ephemeral=True)
             return
         
@@ -1389,7 +1503,7 @@ async def setup_tickets(bot):
         for ticket in all_tickets:
             if user.id in ticket["helpers"]:
                 # Check if channel exists
-                channel = interaction.guild.get_channel(ticket["channel_id"])
+                channel = interaction.guild.get_channel_or_thread(ticket["channel_id"])
                 if not channel:
                     # Phantom ticket - remove user
                     ticket["helpers"].remove(user.id)
@@ -1420,11 +1534,8 @@ async def setup_tickets(bot):
                 await interaction.response.send_message("❌ This command must be used in a ticket channel.", ephemeral=True)
                 return
             
-            member = interaction.user
-            is_staff = any(member.get_role(rid) for rid in [config.ROLE_IDS.get("ADMIN"), config.ROLE_IDS.get("STAFF"), config.ROLE_IDS.get("OFFICER")] if rid)
-            
             # Only staff/officer/admin can kick
-            if not is_staff:
+            if not can(interaction.user, "kick_helper"):
                 await interaction.response.send_message("❌ Only admins, staff, or officers can use this command.", ephemeral=True)
                 return
             
@@ -1435,45 +1546,20 @@ async def setup_tickets(bot):
             # Remove helper
             ticket["helpers"].remove(user.id)
             await bot.db.save_ticket(ticket)
+            bot.ticket_events.record(ticket, ticket_events.KICKED, user_id=user.id, actor_id=interaction.user.id)
+            bot.matchmaker.ticket_changed(ticket)
             
             # Remove permissions
             try:
-                await interaction.channel.set_permissions(user, overwrite=None)
+                await revoke_ticket_access(interaction.channel, user)
             except Exception as e:
                 print(f"Failed to remove permissions: {e}")
             
-            # Update embed
-            try:
-                selected_bosses_raw = ticket.get("selected_bosses", "[]")
-                if isinstance(selected_bosses_raw, str):
-                    selected_bosses = json.loads(selected_bosses_raw)
-                else:
-                    selected_bosses = selected_bosses_raw or []
-            except:
-                selected_bosses = []
-            
-            selected_server = ticket.get("selected_server", "Unknown")
-            
-            embed = create_ticket_embed(
-                category=ticket["category"],
-                requestor_id=ticket["requestor_id"],
-                in_game_name=ticket.get("in_game_name", "N/A"),
-                concerns=ticket.get("concerns", "None"),
-                helpers=ticket["helpers"],
-                random_number=ticket["random_number"],
-                selected_bosses=selected_bosses,
-                selected_server=selected_server
-            )
-            
-            # Update ticket message
-            try:
-                msg = await interaction.channel.fetch_message(ticket["embed_message_id"])
-                await msg.edit(embed=embed)
-            except Exception as e:
-                print(f"Failed to update embed: {e}")
+            # Update embed (edits in place, no fetch)
+            await update_ticket_embed(bot, ticket, interaction.channel)
             
             await interaction.response.send_message(f"✅ Kicked {user.mention} from the ticket.", ephemeral=False)
-            await interaction.channel.send(f"👢 {user.mention} was kicked from the ticket by {interaction.user.mention}.")
+            bot.rest.send(interaction.channel, f"👢 {user.mention} was kicked from the ticket by {interaction.user.mention}.")
         
         except Exception as e:
             print(f"❌ Error in kick_from_ticket: {e}")
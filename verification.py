@@ -5,7 +5,9 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import config
-import asyncio
+from perf import timed
+from capabilities import can
+from ticket_threads import thread_mode_enabled, create_ticket_thread
 
 
 class VerificationView(discord.ui.View):
@@ -45,45 +47,42 @@ class VerificationModal(discord.ui.Modal):
         )
         self.add_item(self.invited_by)
 
+    @timed("verification.submit")
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
         guild = interaction.guild
         category_id = config.CHANNEL_IDS.get("VERIFICATION_CATEGORY")
 
-        if not category_id:
+        if not category_id and not thread_mode_enabled("VERIFICATION"):
             await interaction.followup.send("❌ Verification category not configured.", ephemeral=True)
             return
 
-        category = guild.get_channel(category_id)
-        if not category:
-            await interaction.followup.send("❌ Verification category not found.", ephemeral=True)
-            return
-
         channel_name = f"verify-{interaction.user.name}".lower().replace(" ", "-")[:50]
 
         admin_role   = guild.get_role(config.ROLE_IDS.get("ADMIN"))
         staff_role   = guild.get_role(config.ROLE_IDS.get("STAFF"))
         officer_role = guild.get_role(config.ROLE_IDS.get("OFFICER"))
 
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-        }
-
-        if admin_role:
-            overwrites[admin_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        if staff_role:
-            overwrites[staff_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        if officer_role:
-            overwrites[officer_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+        overwrites = interaction.client.overwrite_templates.with_opener(guild, "verification", interaction.user)
 
         try:
-            channel = await category.create_text_channel(
-                name=channel_name,
-                overwrites=overwrites
-            )
+            if thread_mode_enabled("VERIFICATION"):
+                # Private thread - the staff role pings below add the reviewers
+                channel = await create_ticket_thread(guild, "VERIFICATION", channel_name, interaction.user)
+                if channel is None:
+                    await interaction.followup.send("❌ Verification thread parent channel not found.", ephemeral=True)
+                    return
+            else:
+                # Least-loaded verification category (overflow past the 50-channel cap)
+                async with interaction.client.category_allocator.place("VERIFICATION_CATEGORY", guild) as category:
+                    if not category:
+                        await interaction.followup.send("❌ Verification category not found or full.", ephemeral=True)
+                        return
+                    channel = await category.create_text_channel(
+                        name=channel_name,
+                        overwrites=overwrites
+                    )
         except Exception as e:
             await interaction.followup.send(f"❌ Failed to create ticket: {e}", ephemeral=True)
             return
@@ -136,15 +135,7 @@ class VerificationActionView(discord.ui.View):
         custom_id="close_verification"
     )
     async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        member = interaction.user
-
-        allowed_roles = [
-            config.ROLE_IDS.get("ADMIN"),
-            config.ROLE_IDS.get("STAFF"),
-            config.ROLE_IDS.get("OFFICER"),
-        ]
-
-        if not any(member.get_role(rid) for rid in allowed_roles if rid):
+        if not can(interaction.user, "close_verification"):
             await interaction.response.send_message(
                 "❌ Only staff can close verification tickets.",
                 ephemeral=True
@@ -153,16 +144,14 @@ class VerificationActionView(discord.ui.View):
 
         await interaction.response.send_message(
             f"✅ Verification closed by {interaction.user.mention}.\n"
-            "Channel will be deleted in 5 seconds."
+            f"Channel will be deleted in {config.CHANNEL_DELETE_DELAY} seconds."
         )
 
-        await asyncio.sleep(5)
-        try:
-            await interaction.channel.delete(
-                reason=f"Verification closed by {interaction.user}"
-            )
-        except:
-            pass
+        await interaction.client.jobs.delete_channel_later(
+            interaction.channel,
+            delay=config.CHANNEL_DELETE_DELAY,
+            reason=f"Verification closed by {interaction.user}"
+        )
 
 
 async def setup_verification(bot: commands.Bot):
@@ -173,15 +162,7 @@ async def setup_verification(bot: commands.Bot):
         description="Post the verification panel (Admin / Staff / Officer)"
     )
     async def verification_panel(interaction: discord.Interaction):
-        member = interaction.user
-
-        allowed_roles = [
-            config.ROLE_IDS.get("ADMIN"),
-            config.ROLE_IDS.get("STAFF"),
-            config.ROLE_IDS.get("OFFICER"),
-        ]
-
-        if not any(member.get_role(rid) for rid in allowed_roles if rid):
+        if not can(interaction.user, "post_verification_panel"):
             await interaction.response.send_message(
                 "❌ You don't have permission to use this command.",
                 ephemeral=True
@@ -1,17 +1,169 @@
 # webserver.py
-from flask import Flask
+# Health and metrics endpoints, served by aiohttp on the bot's own event loop
+
+from aiohttp import web
+import asyncio
+import math
 import os
-import threading
+import time
+import config
+import perf
+from background import pending_count
+
+STARTED_AT = time.time()
+
+_runner = None
+
+
+def _queue_depths(bot) -> dict:
+    from tickets import transcript_jobs
+
+    depths = {
+        "background_tasks": pending_count(),
+        "transcript_jobs": len(transcript_jobs),
+    }
+    rest = getattr(bot, "rest", None)
+    if rest:
+        for lane, stats in rest.snapshot()["lanes"].items():
+            depths[f"rest_{lane}"] = stats["depth"]
+    channel_pool = getattr(bot, "channel_pool", None)
+    if channel_pool:
+        depths["channel_pool_ready"] = len(channel_pool)
+    return depths
+
+
+async def _check_db(bot):
+    """(ok, error) - the ping is bounded so a hung backend fails the check"""
+    try:
+        await asyncio.wait_for(bot.db.ping(), timeout=config.HEALTH_DB_TIMEOUT)
+        return True, None
+    except Exception as e:
+        return False, str(e) or type(e).__name__
+
+
+def _latency(bot):
+    latency = bot.latency
+    return None if latency is None or math.isinf(latency) or math.isnan(latency) else latency
+
+
+def build_app(bot) -> web.Application:
+    async def home(request):
+        return web.Response(text="Bot is running!")
+
+    async def healthz(request):
+        """Liveness - the event loop answered and the client hasn't been closed"""
+        alive = not bot.is_closed()
+        return web.json_response(
+            {"status": "ok" if alive else "closed", "uptime": round(time.time() - STARTED_AT)},
+            status=200 if alive else 503
+        )
+
+    async def readyz(request):
+        """Readiness - gateway connected with sane latency, database reachable"""
+        latency = _latency(bot)
+        db_ok, db_error = await _check_db(bot)
+        checks = {
+            "gateway": bot.is_ready() and latency is not None,
+            "latency": latency is not None and latency < config.HEALTH_MAX_LATENCY,
+            "database": db_ok,
+        }
+        ready = all(checks.values())
+        body = {
+            "status": "ready" if ready else "not_ready",
+            "checks": checks,
+            "latency_ms": round(latency * 1000, 1) if latency is not None else None,
+            "database_backend": bot.db.backend,
+            "queues": _queue_depths(bot),
+        }
+        if db_error:
+            body["database_error"] = db_error
+        return web.json_response(body, status=200 if ready else 503)
 
-app = Flask("")
+    async def metrics(request):
+        return web.Response(text=render_metrics(bot), content_type="text/plain", charset="utf-8")
 
-@app.route("/")
-def home():
-    return "Bot is running!", 200
+    app = web.Application()
+    app.router.add_get("/", home)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/readyz", readyz)
+    app.router.add_get("/metrics", metrics)
+    return app
 
-def run():
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def render_metrics(bot) -> str:
+    """Prometheus text exposition of the bot's gauges, counters and histograms"""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{_label(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    latency = _latency(bot)
+    metric("bot_up", "gauge", "1 when the gateway is ready", [({}, int(bot.is_ready()))])
+    metric("bot_uptime_seconds", "gauge", "Seconds since the process started", [({}, round(time.time() - STARTED_AT, 1))])
+    metric("bot_gateway_latency_seconds", "gauge", "Gateway heartbeat latency",
+           [({}, latency if latency is not None else "NaN")])
+    metric("bot_guilds", "gauge", "Connected guilds", [({}, len(bot.guilds))])
+
+    metric("bot_queue_depth", "gauge", "Items waiting in internal queues",
+           [({"queue": name}, depth) for name, depth in _queue_depths(bot).items()])
+
+    rest = getattr(bot, "rest", None)
+    if rest:
+        snapshot = rest.snapshot()
+        metric("bot_rest_inflight", "gauge", "Queued REST calls currently running", [({}, snapshot["inflight"])])
+        for counter in ("submitted", "completed", "failed", "dropped", "delayed", "rate_limited"):
+            metric(f"bot_rest_{counter}_total", "counter", f"REST scheduler jobs {counter.replace('_', ' ')}",
+                   [({"lane": lane}, stats[counter]) for lane, stats in snapshot["lanes"].items()])
+
+    metric("bot_http_429_total", "counter", "429 responses logged by discord.py",
+           [({"route": route}, count) for route, count in perf.rate_limits.items()])
+
+    # Handler latency histograms (cumulative buckets, seconds)
+    lines.append("# HELP bot_handler_latency_seconds Interaction handler latency")
+    lines.append("# TYPE bot_handler_latency_seconds histogram")
+    for name, stats in sorted(perf.handlers.items()):
+        handler = _label(name)
+        cumulative = 0
+        for i, count in enumerate(stats.histogram):
+            cumulative += count
+            le = f"{perf.BUCKETS_MS[i] / 1000:g}" if i < len(perf.BUCKETS_MS) else "+Inf"
+            lines.append(f'bot_handler_latency_seconds_bucket{{handler="{handler}",le="{le}"}} {cumulative}')
+        lines.append(f'bot_handler_latency_seconds_sum{{handler="{handler}"}} {stats.total}')
+        lines.append(f'bot_handler_latency_seconds_count{{handler="{handler}"}} {stats.count}')
+
+    metric("bot_handler_db_seconds_total", "counter", "Handler time spent in database calls",
+           [({"handler": name}, stats.db) for name, stats in perf.handlers.items()])
+    metric("bot_handler_rest_seconds_total", "counter", "Handler time spent in Discord REST calls",
+           [({"handler": name}, stats.rest) for name, stats in perf.handlers.items()])
+    metric("bot_handler_errors_total", "counter", "Handler calls that raised",
+           [({"handler": name}, stats.errors) for name, stats in perf.handlers.items()])
+
+    return "\n".join(lines) + "\n"
+
+
+async def start(bot):
+    """Start serving on PORT (safe to call again)"""
+    global _runner
+    if _runner:
+        return
+    runner = web.AppRunner(build_app(bot), access_log=None)
+    await runner.setup()
     port = int(os.environ.get("PORT", 8080))
-    app.run(host="0.0.0.0", port=port)
+    await web.TCPSite(runner, host="0.0.0.0", port=port).start()
+    _runner = runner
+    print(f"✅ Webserver listening on port {port}")
+
 
-def start():
-    threading.Thread(target=run).start()
+async def stop():
+    global _runner
+    if _runner:
+        await _runner.cleanup()
+        _runner = None